@@ -3,17 +3,30 @@ EcoWatch ML Backend — Flask API
 Provides anomaly detection, consumption forecasting, and pattern classification.
 """
 
+import hmac
+import math
 import os
+import threading
 import time
 from functools import wraps
-from collections import defaultdict
-from flask import Flask, jsonify, request, abort
+from flask import Flask, Response, g, jsonify, request, abort
 from flask_cors import CORS
 import numpy as np
-from models.anomaly_detector import AnomalyDetector
-from models.forecaster import ConsumptionForecaster
-from models.pattern_classifier import PatternClassifier
-from data_generator import generate_historical_data, generate_realtime_stream
+from models.artifact_store import ArtifactStore
+from models.forecast_cache import ForecastCache
+from models.inference import INFERENCE_BACKENDS, OnnxEngine
+from models.online_detector import OnlineAnomalyDetector
+from models.schema import epoch_seconds
+from data_generator import ZONES, generate_realtime_stream
+from events import EventBroker
+from metrics import PROMETHEUS_CONTENT_TYPE, RequestMetrics, counter, gauge, histogram, render
+from models import instrumentation
+from ratelimit import RATE_LIMIT_BACKENDS, create_limiter
+from response_cache import ResponseCache
+from sensor_store import SensorStore, decode_binary_frame, decode_ndjson
+from serialization import MIMETYPES, RESPONSE_FORMATS, encode
+from snapshots import SnapshotScheduler
+from waveform import HARMONICS, WAVEFORM_MAGIC, analyze, decode_waveform_frame
 
 app = Flask(__name__)
 
@@ -23,33 +36,45 @@ ALLOWED_ORIGINS = os.environ.get(
     'http://localhost:5173,http://localhost:4173,https://*.vercel.app'
 ).split(',')
 
-CORS(app, origins=ALLOWED_ORIGINS, methods=['GET'], max_age=3600)
+CORS(app, origins=ALLOWED_ORIGINS, methods=['GET', 'POST'], max_age=3600)
 
-# ─── SECURITY: Rate limiting (in-memory, per-IP) ───
-_rate_store: dict = defaultdict(list)
+# ─── SECURITY: Cap request bodies (sensor ingestion batches) ───
+app.config['MAX_CONTENT_LENGTH'] = 8 * 1024 * 1024
+
+# ─── SECURITY: Rate limiting (token bucket per IP, see ratelimit.py) ───
 RATE_LIMIT = 60      # max requests
 RATE_WINDOW = 60     # per 60 seconds
 
+# Per-route latency / status / rate-limit counters for /api/metrics
+request_metrics = RequestMetrics()
+
 
 def rate_limit(f):
     """Simple IP-based rate limiter."""
     @wraps(f)
     def wrapper(*args, **kwargs):
-        ip = request.remote_addr or 'unknown'
-        now = time.time()
+        rejected = _rate_limited(_limiter, request.remote_addr or 'unknown', RATE_LIMIT)
+        return rejected if rejected is not None else f(*args, **kwargs)
+    return wrapper
 
-        # Clean old entries
-        _rate_store[ip] = [t for t in _rate_store[ip] if now - t < RATE_WINDOW]
 
-        if len(_rate_store[ip]) >= RATE_LIMIT:
-            return jsonify({
-                'error': 'Rate limit exceeded',
-                'message': f'Max {RATE_LIMIT} requests per {RATE_WINDOW}s',
-            }), 429
+def _rate_limited(limiter, key: str, limit: int):
+    """A 429 response if ``key`` is over its limit, else None."""
+    allowed, retry_after = limiter.allow(key)
+    if allowed:
+        return None
+    request_metrics.rate_limited(_route())
+    response = jsonify({
+        'error': 'Rate limit exceeded',
+        'message': f'Max {limit} requests per {RATE_WINDOW}s',
+    })
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response, 429
 
-        _rate_store[ip].append(now)
-        return f(*args, **kwargs)
-    return wrapper
+
+def _route() -> str:
+    """Route template of the current request (bounded label cardinality for metrics)."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
 
 
 # ─── SECURITY: Input validation helpers ───
@@ -69,24 +94,180 @@ def validate_string(value: str, allowed: list[str], default: str) -> str:
     return default
 
 
-VALID_ZONES = [
-    'all', 'campus', 'Hostel A - Floor 1', 'Hostel A - Floor 2',
-    'Hostel B - Floor 1', 'Lab - Electronics', 'Lab - Computer Sci',
-    'Main Building', 'Gym',
-]
-VALID_TYPES = ['energy', 'water']
+# Shared across worker processes with RATE_LIMIT_BACKEND=sqlite
+_limiter = create_limiter(
+    validate_string(os.environ.get('RATE_LIMIT_BACKEND', 'memory').lower(), RATE_LIMIT_BACKENDS, 'memory'),
+    RATE_LIMIT, RATE_WINDOW,
+    path=os.environ.get('RATE_LIMIT_DB') or None,
+    max_keys=validate_int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'), 100, 10_000_000, 100_000),
+)
 
+# ─── Inference backend: 'sklearn' (default) or 'onnx' (no sklearn on the serving path) ───
+INFERENCE_BACKEND = validate_string(os.environ.get('INFERENCE_BACKEND', 'sklearn').lower(), INFERENCE_BACKENDS, 'sklearn')
+ORT_INTRA_OP_THREADS = validate_int(os.environ.get('ORT_INTRA_OP_THREADS', '1'), 1, 64, 1)
+# Per-zone models are loaded on first use and kept in an LRU of this size (per model)
+ZONE_CACHE_BYTES = validate_int(os.environ.get('MODEL_ZONE_CACHE_MB', '256'), 1, 1_000_000, 256) * 2**20
 
-# ─── Initialize models ───
-anomaly_detector = AnomalyDetector()
-forecaster = ConsumptionForecaster()
-pattern_classifier = PatternClassifier()
 
-# ─── Generate and fit on startup ───
-historical = generate_historical_data(days=90)
-anomaly_detector.fit(historical)
-forecaster.fit(historical)
-pattern_classifier.fit(historical)
+# ─── Load models (trained offline with `python train.py`) ───
+def _load_models() -> tuple[dict, dict, str]:
+    """Load the configured artifact version, training in-process only as a fallback."""
+    store = ArtifactStore()
+    try:
+        models, manifest = store.load(
+            os.environ.get('MODEL_VERSION') or None,
+            estimators=INFERENCE_BACKEND == 'sklearn',
+            lazy_zones=True,
+            zone_budget_bytes=ZONE_CACHE_BYTES,
+        )
+    except FileNotFoundError:
+        if os.environ.get('REQUIRE_ARTIFACTS', 'false').lower() == 'true':
+            raise
+        print(f"⚠️  No model artifacts in {store.root} — training on startup (run `python train.py`)")
+        from train import train_models
+        models, metadata = train_models(days=90)
+        if INFERENCE_BACKEND != 'sklearn':
+            print(f"⚠️  {INFERENCE_BACKEND} backend needs exported artifacts — serving with sklearn")
+        return models, {'version': 'untracked', **metadata}, 'sklearn'
+
+    # A preloading pre-fork server opens the sessions in each worker instead (gunicorn.conf.py)
+    if INFERENCE_BACKEND == 'onnx' and os.environ.get('PREFORK_PRELOAD') != 'true':
+        attach_onnx_engine(models, manifest)
+
+    return models, manifest, INFERENCE_BACKEND
+
+
+def attach_onnx_engine(models: dict, manifest: dict):
+    """Route the models' inference through onnxruntime sessions (per process: they do not survive fork)."""
+    engine = OnnxEngine.from_manifest(ArtifactStore().version_dir(manifest['version']), manifest,
+                                      ORT_INTRA_OP_THREADS, ZONE_CACHE_BYTES)
+    models['anomaly_detector'].engine = engine
+    models['forecaster'].engine = engine
+    models['pattern_classifier'].engine = engine
+
+
+_models, MODEL_MANIFEST, ACTIVE_BACKEND = _load_models()
+anomaly_detector = _models['anomaly_detector']
+forecaster = _models['forecaster']
+pattern_classifier = _models['pattern_classifier']
+forecaster.cache = ForecastCache(max_size=validate_int(os.environ.get('FORECAST_CACHE_SIZE', '256'), 1, 100_000, 256))
+
+# ─── Zones: the campus defaults (stable sensor zone codes) plus every zone in the artifact ───
+SENSOR_ZONES = ZONES + [z for z in MODEL_MANIFEST.get('zones', []) if z not in ZONES]
+VALID_ZONES = ['all', 'campus', *SENSOR_ZONES]
+VALID_TYPES = ['energy', 'water']
+BATCH_MAX_WINDOWS = validate_int(os.environ.get('ANOMALY_BATCH_MAX_WINDOWS', '200'), 1, 10_000, 200)
+
+# ─── Live sensor readings (POST /api/ingest) ───
+# Sensor state lives in this process, so multi-worker servers disable ingestion (see gunicorn.conf.py)
+INGEST_ENABLED = os.environ.get('INGEST_ENABLED', 'true').lower() == 'true'
+INGEST_TOKEN = os.environ.get('INGEST_TOKEN', '')
+# Gateways post often, so ingestion has its own per-client budget (requests per RATE_WINDOW)
+# and a cap on readings per request, below the MAX_CONTENT_LENGTH body cap
+INGEST_RATE_LIMIT = validate_int(os.environ.get('INGEST_RATE_LIMIT', '600'), 1, 1_000_000, 600)
+INGEST_MAX_READINGS = validate_int(os.environ.get('INGEST_MAX_READINGS', '200000'), 1, 10_000_000, 200_000)
+_ingest_limiter = create_limiter(
+    validate_string(os.environ.get('RATE_LIMIT_BACKEND', 'memory').lower(), RATE_LIMIT_BACKENDS, 'memory'),
+    INGEST_RATE_LIMIT, RATE_WINDOW,
+    path=os.environ.get('RATE_LIMIT_DB') or None,
+    max_keys=validate_int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'), 100, 10_000_000, 100_000),
+)
+sensor_store = SensorStore(
+    SENSOR_ZONES,
+    capacity_hours=validate_int(os.environ.get('SENSOR_BUFFER_HOURS', '336'), 24, 24 * 366, 336),
+)
+# Raw sample blocks (see waveform.py) are analysed against the local mains frequency
+MAINS_HZ = validate_int(os.environ.get('MAINS_FREQUENCY_HZ', '50'), 40, 70, 50)
+
+# Score each sensor hour once as it closes, and the hour in progress (projected to a full hour)
+# at most every ONLINE_PARTIAL_INTERVAL_SECONDS as readings arrive; clients poll
+# /api/anomalies/stream or receive pushes over /api/stream (ASGI mode, see asgi.py)
+online_detector = OnlineAnomalyDetector(anomaly_detector, SENSOR_ZONES)
+ONLINE_PARTIAL_INTERVAL = validate_int(os.environ.get('ONLINE_PARTIAL_INTERVAL_SECONDS', '60'), 0, 3600, 60)
+# Running statistics start from the last ONLINE_SEED_DAYS of the history store, when one is configured
+HISTORY_DIR = os.environ.get('HISTORY_DIR', '')
+if HISTORY_DIR and os.path.isdir(HISTORY_DIR):
+    from history_store import HistoryStore
+    _seed_days = validate_int(os.environ.get('ONLINE_SEED_DAYS', '28'), 1, 3660, 28)
+    online_detector.seed(HistoryStore(HISTORY_DIR).window(
+        start=int(time.time()) + sensor_store.utc_offset_s - _seed_days * 86400))   # local wall-clock epoch
+    print(f"  ✅ Online detector seeded with {online_detector.seeded} hours from {HISTORY_DIR}")
+broker = EventBroker(
+    max_queue=validate_int(os.environ.get('STREAM_QUEUE_SIZE', '100'), 1, 10_000, 100),
+    max_clients=validate_int(os.environ.get('STREAM_MAX_CLIENTS', '100'), 1, 10_000, 100),
+)
+
+
+# Default views (per zone) are precomputed in the background and served from the latest
+# snapshot; 0 disables the scheduler and every request computes inline (see snapshots.py)
+SNAPSHOT_INTERVAL = validate_int(os.environ.get('SNAPSHOT_INTERVAL_SECONDS', '300'), 0, 86_400, 300)
+snapshots = SnapshotScheduler(
+    interval=SNAPSHOT_INTERVAL,
+    workers=validate_int(os.environ.get('SNAPSHOT_WORKERS', '4'), 1, 64, 4),
+)
+# Per-zone views are precomputed for the first N zones; the rest compute on request.
+# The savings analysis covers the same first N zones of the forecaster.
+SNAPSHOT_MAX_ZONES = validate_int(os.environ.get('SNAPSHOT_MAX_ZONES', '50'), 0, 100_000, 50)
+
+
+def _on_hour_closed(frame):
+    emitted = online_detector.observe(frame)
+    if emitted:
+        broker.publish('anomalies', {'anomalies': emitted, 'stats': online_detector.stats()})
+    snapshots.trigger()
+
+
+sensor_store.subscribe(_on_hour_closed)
+
+_partial_lock = threading.Lock()
+_partial_scored_at = [0.0]
+
+
+def _score_current_hour(now: float):
+    """Provisionally score the hour in progress, at most every ONLINE_PARTIAL_INTERVAL seconds."""
+    if not ONLINE_PARTIAL_INTERVAL or now - _partial_scored_at[0] < ONLINE_PARTIAL_INTERVAL:
+        return
+    if not _partial_lock.acquire(blocking=False):   # another request is already scoring it
+        return
+    try:
+        _partial_scored_at[0] = now
+        fraction = (now + sensor_store.utc_offset_s) % 3600 / 3600
+        emitted = online_detector.observe_partial(
+            sensor_store.window(hours=1, now=now, include_current=True), fraction)
+        if emitted:
+            broker.publish('anomalies', {'anomalies': emitted, 'stats': online_detector.stats()})
+    finally:
+        _partial_lock.release()
+
+# Read-only endpoints are computed once per model version, snapshot generation and time bucket
+# (ETag/304, pre-compressed)
+response_cache = ResponseCache(
+    version=lambda: f"{MODEL_MANIFEST['version']}/{ACTIVE_BACKEND}/{snapshots.generation}",
+    max_entries=validate_int(os.environ.get('RESPONSE_CACHE_SIZE', '256'), 1, 100_000, 256),
+    keep_headers=('X-Snapshot-At',),
+)
+SENSOR_HOUR = {'ttl': 3600, 'offset': sensor_store.utc_offset_s}   # changes when a sensor hour closes
+
+
+# ─── Response formats: ?format=json|columnar|msgpack|arrow on the bulk endpoints ───
+def respond(payload: dict, fmt: str):
+    """Serialize a view's payload in the negotiated response format (see serialization.py)."""
+    if fmt == 'json':
+        return jsonify(payload)
+    try:
+        return Response(encode(payload, fmt), mimetype=MIMETYPES[fmt])
+    except ImportError:
+        abort(406, description=f"Response format '{fmt}' is not available on this server")
+
+
+def from_snapshot(name: str):
+    """JSON response for the latest snapshot of a view, or None if there is none yet."""
+    snapshot = snapshots.get(name) if SNAPSHOT_INTERVAL else None
+    if snapshot is None:
+        return None
+    response = jsonify(snapshot.value)
+    response.headers['X-Snapshot-At'] = f'{snapshot.computed_at:.3f}'
+    return response
 
 
 # ─── SECURITY: Global error handler — don't leak stack traces ───
@@ -100,80 +281,217 @@ def handle_error(e):
     }), code
 
 
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    """Per-route latency and status counts for /api/metrics."""
+    start = g.get('request_start')
+    if start is not None:
+        request_metrics.observe(_route(), request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+
 @app.after_request
 def add_security_headers(response):
     """Add security headers to every response."""
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-Frame-Options'] = 'DENY'
     response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate'
-    response.headers['Content-Type'] = 'application/json'
+    # Snapshot-served views report how old the snapshot is
+    if 'X-Snapshot-At' in response.headers:
+        response.headers['X-Snapshot-Age'] = f"{max(0.0, time.time() - float(response.headers['X-Snapshot-At'])):.1f}"
+    # Cacheable endpoints set their own policy (see response_cache.py)
+    response.headers.setdefault('Cache-Control', 'no-store, no-cache, must-revalidate')
+    # Binary formats are opt-in via ?format= (see serialization.py) and /api/metrics is
+    # Prometheus text; everything else is JSON
+    if response.mimetype not in MIMETYPES.values() and response.mimetype != 'text/plain':
+        response.headers['Content-Type'] = 'application/json'
     return response
 
 
 @app.route('/api/health', methods=['GET'])
 @rate_limit
 def health():
-    return jsonify({'status': 'ok', 'models_loaded': True})
+    return jsonify({
+        'status': 'ok',
+        'models_loaded': True,
+        'artifact_version': MODEL_MANIFEST['version'],
+        'trained_at': MODEL_MANIFEST.get('created_at'),
+        'inference_backend': ACTIVE_BACKEND,
+        'forecast_cache': forecaster.cache.stats(),
+        'stream': broker.stats(),
+        'response_cache': response_cache.stats(),
+        'snapshots': snapshots.stats(),
+        'zone_registry': _zone_registries(),
+    })
 
 
 @app.route('/api/anomalies', methods=['GET'])
 @rate_limit
+@response_cache.cached(**SENSOR_HOUR)
 def detect_anomalies():
     """Detect anomalies in recent consumption data."""
     zone = validate_string(request.args.get('zone', 'all'), VALID_ZONES, 'all')
     hours = validate_int(request.args.get('hours', '72'), 1, 168, 72)  # max 7 days
+    limit = validate_int(request.args.get('limit', '20'), 1, 10_000, 20)
+    fmt = validate_string(request.args.get('format', 'json'), RESPONSE_FORMATS, 'json')
+
+    if (hours, limit, fmt) == (72, 20, 'json'):
+        response = from_snapshot(f'anomalies/{zone}')
+        if response is not None:
+            return response
+
+    recent, source = _recent_window(hours)
+    return respond(_anomaly_report(recent, source, zone, limit, columnar=fmt != 'json'), fmt)
+
+
+@app.route('/api/anomalies/batch', methods=['POST'])
+@rate_limit
+def detect_anomalies_batch():
+    """
+    Anomalies for many (zone, start, end) windows, scored together in one model call.
+
+    Body: {"windows": [{"zone": "Gym", "start": "2026-10-16 08:00:00", "end": ...}, ...],
+    "hours": 72, "limit": 20}. start / end are local times or epoch seconds (end
+    exclusive); a window without them covers the whole ``hours`` of recent data.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('windows'), list) or not body['windows']:
+        abort(400, description="Expected a JSON object with a non-empty 'windows' list")
+    if len(body['windows']) > BATCH_MAX_WINDOWS:
+        abort(400, description=f'At most {BATCH_MAX_WINDOWS} windows per request')
+    hours = validate_int(body.get('hours', 72), 1, 168, 72)  # max 7 days
+    limit = validate_int(body.get('limit', 20), 1, 10_000, 20)
+
+    windows = []
+    for w in body['windows']:
+        if not isinstance(w, dict) or w.get('zone', 'all') not in VALID_ZONES:
+            abort(400, description=f'Invalid window: {w!r}')
+        windows.append((w.get('zone', 'all'), _parse_time(w.get('start')), _parse_time(w.get('end'))))
+
+    recent, source = _recent_window(hours)
+    reports = anomaly_detector.detect_batch(recent, windows, top_n=limit)
+    return jsonify({
+        'windows': [{'zone': w.get('zone', 'all'), 'start': w.get('start'), 'end': w.get('end'), **report}
+                    for w, report in zip(body['windows'], reports)],
+        'windowCount': len(reports),
+        'totalDataPoints': len(recent),
+        'dataSource': source,
+    })
 
-    recent = generate_realtime_stream(hours=hours)
-    results = anomaly_detector.detect(recent, zone=zone)
-    return jsonify(results)
+
+def _parse_time(value) -> int | None:
+    """Epoch seconds from a local 'YYYY-MM-DD HH:MM:SS' string or a number (None passes through)."""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return int(value)
+        return int(epoch_seconds(np.datetime64(str(value).replace(' ', 'T'), 's')))
+    except (TypeError, ValueError, OverflowError):
+        abort(400, description=f'Invalid time: {value!r}')
+
+
+@app.route('/api/anomalies/stream', methods=['GET'])
+@rate_limit
+def anomaly_stream():
+    """Anomalies emitted since sequence number `since` (incremental polling)."""
+    since = validate_int(request.args.get('since', '0'), 0, 2**63 - 1, 0)
+    limit = validate_int(request.args.get('limit', '100'), 1, 1000, 100)
+
+    events = online_detector.events(since=since, limit=limit)
+    stats = online_detector.stats()
+    return jsonify({
+        'events': events,
+        # A since beyond lastSeq means the server restarted; resync to the current sequence
+        'nextSince': events[-1]['seq'] if events else min(since, stats['lastSeq']),
+        'stats': stats,
+    })
 
 
 @app.route('/api/forecast', methods=['GET'])
 @rate_limit
+@response_cache.cached(ttl=3600)
 def forecast():
     """Forecast consumption for the next N hours."""
     zone = validate_string(request.args.get('zone', 'campus'), VALID_ZONES, 'campus')
     hours = validate_int(request.args.get('hours', '48'), 1, 168, 48)  # max 7 days
     resource = validate_string(request.args.get('type', 'energy'), VALID_TYPES, 'energy')
+    fmt = validate_string(request.args.get('format', 'json'), RESPONSE_FORMATS, 'json')
+
+    if (hours, resource, fmt) == (48, 'energy', 'json'):
+        response = from_snapshot(f'forecast/{zone}')
+        if response is not None:
+            return response
 
-    prediction = forecaster.predict(zone=zone, hours=hours, resource_type=resource)
-    return jsonify(prediction)
+    prediction = forecaster.predict(zone=zone, hours=hours, resource_type=resource, columnar=fmt != 'json')
+    return respond(prediction, fmt)
 
 
 @app.route('/api/patterns', methods=['GET'])
 @rate_limit
+@response_cache.cached(**SENSOR_HOUR, max_age=300)
 def classify_patterns():
-    """Classify consumption patterns across zones."""
-    results = pattern_classifier.classify_all()
-    return jsonify(results)
+    """Classify consumption patterns across zones (as trained, or over the last `days` days)."""
+    if 'days' not in request.args:
+        return from_snapshot('patterns') or jsonify(pattern_classifier.classify_all())
+
+    days = validate_int(request.args.get('days'), 1, 14, 7)
+    if days == 7:
+        response = from_snapshot('patterns/7d')
+        if response is not None:
+            return response
+    return jsonify(_window_patterns(_recent_window(days * 24), days))
 
 
 @app.route('/api/recommendations', methods=['GET'])
 @rate_limit
+@response_cache.cached(**SENSOR_HOUR)
 def get_recommendations():
     """Get ML-driven recommendations for energy savings."""
     zone = validate_string(request.args.get('zone', 'all'), VALID_ZONES, 'all')
 
-    anomalies = anomaly_detector.detect(generate_realtime_stream(hours=48), zone=zone)
+    response = from_snapshot(f'recommendations/{zone}')
+    if response is not None:
+        return response
+
+    anomalies = anomaly_detector.detect(_recent_window(48)[0], zone=zone)
     patterns = pattern_classifier.classify_all()
     forecasts = forecaster.predict(zone='campus', hours=24, resource_type='energy')
-
-    recommendations = _generate_recommendations(anomalies, patterns, forecasts)
-    return jsonify({'recommendations': recommendations})
+    return jsonify(_recommendations_payload(anomalies, patterns, forecasts))
 
 
 @app.route('/api/savings-potential', methods=['GET'])
 @rate_limit
+@response_cache.cached(ttl=3600)
 def savings_potential():
     """Calculate potential savings based on ML analysis."""
-    zones = [
-        'Hostel A - Floor 1', 'Hostel A - Floor 2', 'Hostel B - Floor 1',
-        'Lab - Electronics', 'Lab - Computer Sci', 'Main Building', 'Gym',
-    ]
+    return from_snapshot('savings') or jsonify(_savings_payload())
+
+
+# ─── View payloads: computed per request, or ahead of time as snapshots ───
+def _anomaly_report(recent, source: str, zone: str, limit: int = 20, columnar: bool = False) -> dict:
+    results = anomaly_detector.detect(recent, zone=zone, top_n=limit, columnar=columnar)
+    results['dataSource'] = source
+    return results
+
+
+def _window_patterns(window, days: int) -> dict:
+    recent, source = window
+    return {**pattern_classifier.classify(recent), 'windowDays': days, 'dataSource': source}
+
 
+def _recommendations_payload(anomalies: dict, patterns: dict, forecasts: dict) -> dict:
+    return {'recommendations': _generate_recommendations(anomalies, patterns, forecasts)}
+
+
+def _savings_payload() -> dict:
     savings = []
-    for zone in zones:
+    for zone in forecaster.zones[:SNAPSHOT_MAX_ZONES]:
         forecast_result = forecaster.predict(zone=zone, hours=24, resource_type='energy')
         baseline_avg = np.mean([p['baseline'] for p in forecast_result['predictions']])
         predicted_avg = np.mean([p['predicted'] for p in forecast_result['predictions']])
@@ -191,14 +509,182 @@ def savings_potential():
     total_savings = sum(s['savingsPotential'] for s in savings)
     total_co2 = sum(s['co2Reduction'] for s in savings)
 
-    return jsonify({
+    return {
         'zones': savings,
         'totalSavings': round(total_savings, 0),
         'totalCO2Reduction': round(total_co2, 1),
         'analysisTimestamp': '2026-02-23T17:26:00+05:30',
+    }
+
+
+@app.route('/api/ingest', methods=['GET'])
+@rate_limit
+def ingest_info():
+    """Describe the ingestion formats and zone codes for device gateways."""
+    return jsonify({
+        'enabled': INGEST_ENABLED,
+        'zones': sensor_store.zones,
+        'formats': ['application/x-ndjson', 'application/octet-stream'],
+        'waveform': {'magic': WAVEFORM_MAGIC.decode(), 'mainsHz': MAINS_HZ, 'harmonics': HARMONICS},
+        'store': sensor_store.stats(),
+        'onlineDetector': online_detector.stats(),
     })
 
 
+@app.route('/api/ingest', methods=['POST'])
+def ingest_readings():
+    """Bulk-ingest meter readings as NDJSON or a binary frame, or raw sample blocks (see waveform.py)."""
+    if not INGEST_ENABLED:
+        abort(403, description='Ingestion is disabled on this server (INGEST_ENABLED=false)')
+    # SECURITY: devices authenticate with a shared token; without one, only loopback may ingest
+    if INGEST_TOKEN:
+        if not hmac.compare_digest(request.headers.get('X-Ingest-Token', ''), INGEST_TOKEN):
+            abort(401)
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+
+    # Keyed per client address: gateways sharing the token do not share one budget
+    rejected = _rate_limited(_ingest_limiter, f"ingest:{request.remote_addr or 'unknown'}", INGEST_RATE_LIMIT)
+    if rejected is not None:
+        return rejected
+
+    body = request.get_data(cache=False)     # bounded by MAX_CONTENT_LENGTH (413 beyond it)
+    quality = {}
+    try:
+        if request.mimetype == 'application/octet-stream' and body[:4] == WAVEFORM_MAGIC:
+            readings, quality = _waveform_readings(*decode_waveform_frame(body))
+        elif request.mimetype == 'application/octet-stream':
+            readings = decode_binary_frame(body)
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            readings = decode_ndjson(body, sensor_store)
+        else:
+            abort(415)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    received = len(readings[0])
+    if received > INGEST_MAX_READINGS:
+        abort(413, description=f'At most {INGEST_MAX_READINGS} readings per request')
+    now = time.time()
+    accepted = sensor_store.ingest(*readings, now=now, **quality)
+    if accepted:
+        _score_current_hour(now)
+    return jsonify({'received': received, 'accepted': accepted, 'rejected': received - accepted})
+
+
+def _waveform_readings(blocks, sample_rate):
+    """Analyse raw sample blocks into (zone, ts, vrms, irms, power) readings plus power-quality columns."""
+    result = analyze(blocks, sample_rate, mains_hz=MAINS_HZ)
+    # The current transformer's orientation is not known here, so power is taken as a magnitude
+    readings = (blocks['zone'], blocks['ts'], result['vrms'], result['irms'], np.abs(result['real_power']))
+    return readings, {'power_factor': np.abs(result['power_factor']), 'current_thd': result['current_thd']}
+
+
+# ─── Metrics (Prometheus text format; per worker process) ───
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+
+@app.route('/api/metrics', methods=['GET'])
+@rate_limit
+def metrics():
+    """Request, model timing and cache metrics for Prometheus to scrape."""
+    # SECURITY: with METRICS_TOKEN set, scrapers must send it as a bearer token
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}'):
+        abort(401)
+    return Response(render(_metric_families()), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _zone_registries() -> dict:
+    """Stats of every lazily loaded per-zone registry, by owner."""
+    owners = {'forecaster': forecaster, 'anomaly_detector': anomaly_detector,
+              'onnx_sessions': getattr(forecaster, 'engine', None)}
+    return {name: owner.zone_registry.stats() for name, owner in owners.items()
+            if getattr(owner, 'zone_registry', None) is not None}
+
+
+def _metric_families() -> list[dict]:
+    forecast_cache = forecaster.cache.stats()
+    responses = response_cache.stats()
+    stream = broker.stats()
+    training = MODEL_MANIFEST.get('training', {}).get('seconds', {})
+    precomputed = snapshots.stats()
+    registries = _zone_registries()
+
+    return request_metrics.families() + [
+        histogram('ecowatch_model_stage_duration_seconds',
+                  'Model work by stage (features, inference, build, fit, ...).',
+                  {(('model', m), ('stage', st)): snap for (m, st), snap in instrumentation.snapshot().items()}),
+        gauge('ecowatch_model_training_seconds', 'Training time of the served artifact, per model.',
+              [({'model': name}, seconds) for name, seconds in sorted(training.items())]),
+        gauge('ecowatch_model_info', 'Served model artifact.',
+              [({'version': MODEL_MANIFEST['version'], 'backend': ACTIVE_BACKEND}, 1)]),
+        counter('ecowatch_forecast_cache_hits_total', 'Forecast cache hits.', [({}, forecast_cache['hits'])]),
+        counter('ecowatch_forecast_cache_misses_total', 'Forecast cache misses.', [({}, forecast_cache['misses'])]),
+        counter('ecowatch_forecast_cache_evictions_total', 'Forecast cache LRU evictions.',
+                [({}, forecast_cache['evictions'])]),
+        gauge('ecowatch_forecast_cache_entries', 'Cached forecasts.', [({}, forecast_cache['size'])]),
+        counter('ecowatch_response_cache_hits_total', 'Response cache hits.', [({}, responses['hits'])]),
+        counter('ecowatch_response_cache_misses_total', 'Response cache misses.', [({}, responses['misses'])]),
+        counter('ecowatch_response_cache_not_modified_total', 'Revalidations answered with 304.',
+                [({}, responses['notModified'])]),
+        gauge('ecowatch_response_cache_entries', 'Cached responses.', [({}, responses['size'])]),
+        gauge('ecowatch_response_cache_bytes', 'Bytes held by cached response bodies.', [({}, responses['bytes'])]),
+        gauge('ecowatch_rate_limit_tracked_keys', 'Client buckets held by the rate limiter.', [({}, len(_limiter))]),
+        gauge('ecowatch_snapshot_oldest_age_seconds', 'Age of the oldest served snapshot.',
+              [({}, precomputed['oldestAgeSeconds'] or 0.0)]),
+        gauge('ecowatch_snapshot_refresh_seconds', 'Duration of the last snapshot refresh.',
+              [({}, precomputed['lastRefreshSeconds'])]),
+        counter('ecowatch_snapshot_refreshes_total', 'Snapshot refreshes.', [({}, precomputed['refreshes'])]),
+        gauge('ecowatch_snapshot_failing_jobs', 'Snapshot jobs whose last run failed.',
+              [({}, len(precomputed['errors']))]),
+        counter('ecowatch_zone_model_loads_total', 'Per-zone models loaded from the artifact on first use.',
+                [({'owner': name}, r['loads']) for name, r in registries.items()]),
+        counter('ecowatch_zone_model_evictions_total', 'Per-zone models evicted by the memory budget.',
+                [({'owner': name}, r['evictions']) for name, r in registries.items()]),
+        gauge('ecowatch_zone_model_resident', 'Per-zone models held in memory.',
+              [({'owner': name}, r['resident']) for name, r in registries.items()]),
+        gauge('ecowatch_zone_model_resident_bytes', 'Estimated bytes of resident per-zone models.',
+              [({'owner': name}, r['residentBytes']) for name, r in registries.items()]),
+        gauge('ecowatch_stream_clients', 'Connected /api/stream subscribers.', [({}, stream['clients'])]),
+        counter('ecowatch_stream_events_published_total', 'Events published to /api/stream.',
+                [({}, stream['published'])]),
+        counter('ecowatch_online_detector_observations_total', 'Sensor hours scored by the online detector.',
+                [({}, online_detector.observations)]),
+    ]
+
+
+_published: dict = {}
+
+
+def refresh_stream():
+    """Compute the pushed views once and publish the ones that changed (called periodically by asgi.py)."""
+    # Forecasts are cached per hour, so a new object means a new forecast
+    forecast = forecaster.predict(zone='campus', hours=48, resource_type='energy')
+    if forecast is not _published.get('forecast'):
+        _published['forecast'] = forecast
+        broker.publish('forecast', forecast)
+
+    patterns = pattern_classifier.classify_all()
+    classes = {p['zone']: p['classification'] for p in patterns['patterns']}
+    if classes != _published.get('patterns'):
+        _published['patterns'] = classes
+        broker.publish('patterns', patterns)
+
+    # The default GET /api/anomalies report, so dashboards need not poll it
+    report = _anomaly_report(*_recent_window(72), 'all')
+    if report != _published.get('anomalyReport'):
+        _published['anomalyReport'] = report
+        broker.publish('anomalyReport', report)
+
+
+def _recent_window(hours: int):
+    """Latest hourly readings from the sensor store, or a simulated stream if none arrived."""
+    window = sensor_store.window(hours=hours)
+    if window.empty:
+        return generate_realtime_stream(hours=hours), 'simulated'
+    return window, 'sensors'
+
+
 def _generate_recommendations(anomalies, patterns, forecasts):
     """Generate smart recommendations from ML model outputs."""
     recs = []
@@ -256,12 +742,41 @@ def _generate_recommendations(anomalies, patterns, forecasts):
     return recs
 
 
+def _register_snapshot_jobs():
+    """
+    One job per model call behind the default views. Each window is read once per
+    refresh and shared by every job that needs it; independent jobs run concurrently.
+    """
+    snapshots.add('window/72h', lambda: _recent_window(72))
+    snapshots.add('window/48h', lambda: _recent_window(48))
+    snapshots.add('window/7d', lambda: _recent_window(7 * 24))
+    snapshots.add('patterns', pattern_classifier.classify_all)
+    snapshots.add('patterns/7d', lambda window: _window_patterns(window, 7), needs=('window/7d',))
+    snapshots.add('forecast/campus/24h', lambda: forecaster.predict(zone='campus', hours=24, resource_type='energy'))
+    snapshots.add('savings', _savings_payload)
+
+    for zone in VALID_ZONES[:2 + SNAPSHOT_MAX_ZONES]:
+        snapshots.add(f'anomalies/{zone}', lambda window, zone=zone: _anomaly_report(*window, zone),
+                      needs=('window/72h',))
+        snapshots.add(f'forecast/{zone}', lambda zone=zone: forecaster.predict(zone=zone, hours=48))
+        snapshots.add(f'anomalies/{zone}/48h', lambda window, zone=zone: anomaly_detector.detect(window[0], zone=zone),
+                      needs=('window/48h',))
+        snapshots.add(f'recommendations/{zone}', _recommendations_payload,
+                      needs=(f'anomalies/{zone}/48h', 'patterns', 'forecast/campus/24h'))
+
+
+_register_snapshot_jobs()
+# A preloading pre-fork server starts the scheduler in each worker after fork (gunicorn.conf.py)
+if SNAPSHOT_INTERVAL and os.environ.get('PREFORK_PRELOAD') != 'true':
+    snapshots.start()
+
+
 if __name__ == '__main__':
     # SECURITY: debug=False in production, controlled via env var
     debug_mode = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
 
     print("🚀 EcoWatch ML Backend starting...")
-    print("📊 Models trained on 90 days of historical data")
+    print(f"📊 Serving model artifact version {MODEL_MANIFEST['version']} ({ACTIVE_BACKEND} backend)")
     print(f"🔒 CORS origins: {ALLOWED_ORIGINS}")
     print(f"🔒 Rate limit: {RATE_LIMIT} req/{RATE_WINDOW}s per IP")
     print(f"🔒 Debug mode: {debug_mode}")
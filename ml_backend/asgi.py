@@ -0,0 +1,144 @@
+"""
+ASGI entry point: the Flask API plus a server-sent events stream.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+GET /api/stream pushes new anomalies, the refreshed anomaly report, forecast
+updates and pattern changes to every subscribed dashboard as they are computed (see events.py), instead
+of each client polling the compute endpoints. All other paths are served by
+the Flask app in app.py on a thread pool. Run a single worker process: the
+broker and sensor store live in process memory.
+"""
+
+import asyncio
+import fnmatch
+import json
+import os
+from collections import defaultdict
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import ALLOWED_ORIGINS, app, broker, refresh_stream, validate_int
+from events import format_sse
+
+HEARTBEAT_SECONDS = validate_int(os.environ.get('STREAM_HEARTBEAT_SECONDS', '15'), 1, 300, 15)
+REFRESH_SECONDS = validate_int(os.environ.get('STREAM_REFRESH_SECONDS', '60'), 1, 3600, 60)
+MAX_STREAMS_PER_IP = validate_int(os.environ.get('STREAM_MAX_PER_IP', '5'), 1, 1000, 5)
+
+wsgi_application = WsgiToAsgi(app)
+_streams_per_ip: dict = defaultdict(int)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+    elif scope['type'] == 'http' and scope['path'] == '/api/stream':
+        await _stream(scope, receive, send)
+    else:
+        await wsgi_application(scope, receive, send)
+
+
+async def _lifespan(receive, send):
+    refresher = None
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            broker.bind(asyncio.get_running_loop())
+            refresher = asyncio.create_task(_refresh_loop())
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if refresher is not None:
+                refresher.cancel()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _refresh_loop():
+    """Recompute the pushed views once per interval, whatever the number of clients."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_stream)
+        except Exception as e:
+            print(f"⚠️  Stream refresh failed: {e}")
+        await asyncio.sleep(REFRESH_SECONDS)
+
+
+async def _stream(scope, receive, send):
+    """text/event-stream of broker events, with heartbeats while idle."""
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+    ip = (scope.get('client') or ('unknown', 0))[0]
+
+    if scope['method'] != 'GET':
+        await _send_json(send, 405, {'error': 'Method not allowed', 'status': 405})
+        return
+    # SECURITY: per-IP connection cap (rate limiting for long-lived requests)
+    if _streams_per_ip[ip] >= MAX_STREAMS_PER_IP:
+        await _send_json(send, 429, {'error': 'Too many streams', 'status': 429})
+        return
+    subscriber = broker.subscribe()
+    if subscriber is None:
+        await _send_json(send, 503, {'error': 'Stream capacity reached', 'status': 503})
+        return
+
+    _streams_per_ip[ip] += 1
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    get = None
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': _cors_headers(headers.get('origin')) + [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),    # no proxy buffering
+                (b'x-content-type-options', b'nosniff'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+
+        while True:
+            if get is None:
+                get = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait({get, disconnect}, timeout=HEARTBEAT_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                break
+            if get in done:
+                event, get = get.result(), None
+                if event is None:   # dropped by the broker for falling behind
+                    break
+                body = format_sse(event)
+            else:
+                body = b': heartbeat\n\n'
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        broker.unsubscribe(subscriber)
+        _streams_per_ip[ip] -= 1
+        if not _streams_per_ip[ip]:
+            del _streams_per_ip[ip]
+        for task in (get, disconnect):
+            if task is not None:
+                task.cancel()
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def _cors_headers(origin: str | None) -> list[tuple[bytes, bytes]]:
+    """Same origin allowlist as the Flask CORS config ('*' wildcards allowed)."""
+    if origin and any(fnmatch.fnmatchcase(origin, allowed) for allowed in ALLOWED_ORIGINS):
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+
+async def _send_json(send, status: int, payload: dict):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'x-content-type-options', b'nosniff')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(payload).encode()})
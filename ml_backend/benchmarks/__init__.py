@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the EcoWatch ML backend.
+Run from the ml_backend directory, e.g. ``python -m benchmarks.bench_data_generator``.
+"""
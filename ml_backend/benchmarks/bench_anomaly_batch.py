@@ -0,0 +1,90 @@
+"""
+Benchmark for batch anomaly scoring (AnomalyDetector.detect_batch, POST /api/anomalies/batch).
+
+A dashboard with one panel per zone used to call ``detect`` once per zone,
+each a separate model invocation; this is kept below as the reference. The
+batch path scores every panel's window in one concatenated model call and
+splits the reports back per window. Every report is checked to be equal to
+its ``detect`` counterpart.
+
+The API comparison issues one uncached GET /api/anomalies per campus zone
+(each regenerating the simulated stream and rescoring it) versus one POST
+/api/anomalies/batch for the same panels.
+
+Usage:
+    python -m benchmarks.bench_anomaly_batch [--hours 72] [--zones 7 50 150]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data, generate_realtime_stream
+from models.anomaly_detector import AnomalyDetector
+
+
+def legacy_panels(detector: AnomalyDetector, window, zones: list[str]) -> list[dict]:
+    """One detect call (one model invocation) per zone panel."""
+    return [detector.detect(window, zone=zone) for zone in zones]
+
+
+def _best(fn, runs: int = 5) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_models(hours: int, zone_counts: list[int]):
+    print(f"{'zones':>7}{'per-zone detect':>18}{'detect_batch':>15}{'speedup':>9}")
+    for n in zone_counts:
+        zones = _zones(n)
+        detector = AnomalyDetector()
+        detector.fit(generate_historical_data(days=30, zones=zones, rng=np.random.default_rng(42)))
+        window = generate_realtime_stream(hours=hours, zones=zones, rng=np.random.default_rng(7))
+        windows = [(zone, None, None) for zone in zones]
+
+        assert detector.detect_batch(window, windows) == legacy_panels(detector, window, zones)
+        legacy_s = _best(lambda: legacy_panels(detector, window, zones))
+        batch_s = _best(lambda: detector.detect_batch(window, windows))
+        print(f"{n:>7}{legacy_s * 1e3:>16.1f}ms{batch_s * 1e3:>13.1f}ms{legacy_s / batch_s:>8.1f}x")
+
+
+def bench_api(hours: int):
+    import app as api
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the endpoints, not the limiter
+    client = api.app.test_client()
+    zones = api.ZONES
+
+    def per_zone():
+        api.response_cache.invalidate()
+        for zone in zones:
+            assert client.get(f'/api/anomalies?zone={zone}&hours={hours}&limit=19').status_code == 200
+
+    body = {'windows': [{'zone': zone} for zone in zones], 'hours': hours, 'limit': 19}
+
+    def batch():
+        assert client.post('/api/anomalies/batch', json=body).status_code == 200
+
+    legacy_s, batch_s = _best(per_zone), _best(batch)
+    print(f"\n{len(zones)} zone panels over the API: {legacy_s * 1e3:.1f}ms in {len(zones)} GETs, "
+          f"{batch_s * 1e3:.1f}ms in one POST ({legacy_s / batch_s:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=int, default=72)
+    parser.add_argument('--zones', type=int, nargs='+', default=[7, 50, 150])
+    args = parser.parse_args()
+
+    bench_models(args.hours, args.zones)
+    bench_api(args.hours)
+    print("\n  ✅ batch reports identical to per-zone detect")
+
+
+if __name__ == '__main__':
+    main()
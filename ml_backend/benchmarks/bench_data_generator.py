@@ -0,0 +1,65 @@
+"""
+Benchmark for the vectorized synthetic data generator.
+
+Usage:
+    python -m benchmarks.bench_data_generator [--days 365] [--zones 500] [--seed 42]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+from data_generator import ZONES, generate_historical_data, generate_realtime_stream
+
+
+def _zones(n: int) -> list[str]:
+    """The real campus zones followed by synthetic ones to reach ``n``."""
+    extra = [f'Zone {i:04d}' for i in range(max(0, n - len(ZONES)))]
+    return (ZONES + extra)[:n]
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--zones', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Reproducibility: same seed → identical frames
+    end = datetime(2026, 1, 1)
+    a = generate_historical_data(days=7, rng=np.random.default_rng(args.seed), end=end)
+    b = generate_historical_data(days=7, rng=np.random.default_rng(args.seed), end=end)
+    assert np.array_equal(a['energy_kwh'].values, b['energy_kwh'].values), 'seeded runs differ'
+
+    cases = [
+        ('historical', 90, len(ZONES)),
+        ('historical', args.days, args.zones),
+    ]
+    print(f"{'case':<12}{'days':>6}{'zones':>7}{'rows':>12}{'seconds':>10}{'rows/s':>14}")
+    for name, days, n_zones in cases:
+        zones = _zones(n_zones)
+        rng = np.random.default_rng(args.seed)
+        elapsed = _time(lambda: generate_historical_data(days=days, zones=zones, rng=rng), repeat=1 if days * n_zones > 10_000 else 3)
+        rows = days * 24 * n_zones
+        print(f"{name:<12}{days:>6}{n_zones:>7}{rows:>12,}{elapsed:>10.3f}{rows / elapsed:>14,.0f}")
+
+    for hours in (72, 168):
+        rng = np.random.default_rng(args.seed)
+        elapsed = _time(lambda: generate_realtime_stream(hours=hours, rng=rng))
+        rows = hours * len(ZONES)
+        print(f"{'realtime':<12}{hours / 24:>6.0f}{len(ZONES):>7}{rows:>12,}{elapsed:>10.4f}{rows / elapsed:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark for batched ConsumptionForecaster.predict.
+
+Compares the batched path (one feature matrix per horizon, one model call
+per zone) against the previous per-hour × per-zone loop, which is kept
+below as a reference implementation, and reports the cached lookup cost.
+
+Usage:
+    python -m benchmarks.bench_forecaster [--repeat 5]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from data_generator import generate_historical_data
+from models.forecaster import ConsumptionForecaster
+
+
+def _single_feature(hour: int, dow: int) -> np.ndarray:
+    """Features for a single prediction, as the original loop built them."""
+    return np.array([[
+        np.sin(2 * np.pi * hour / 24),
+        np.cos(2 * np.pi * hour / 24),
+        np.sin(2 * np.pi * dow / 7),
+        np.cos(2 * np.pi * dow / 7),
+        float(dow >= 5),
+    ]])
+
+
+def legacy_predict(forecaster: ConsumptionForecaster, zone: str = 'campus', hours: int = 48,
+                   resource_type: str = 'energy') -> dict:
+    """The original loop: one _single_feature + predict call per hour per zone."""
+    now = datetime.now()
+    predictions = []
+    target_zones = forecaster.zones if zone == 'campus' else [zone]
+
+    for h in range(hours):
+        future_time = now + timedelta(hours=h)
+        hour = future_time.hour
+        dow = future_time.weekday()
+        total_predicted = 0
+        total_baseline = 0
+
+        for z in target_zones:
+            baseline_map = forecaster._baselines.get(z, {})
+            zone_pred = forecaster._predict_zone(z, _single_feature(hour, dow))
+            pred = max(0.5, float(zone_pred[0])) if zone_pred is not None else 10.0
+            total_predicted += pred
+            total_baseline += baseline_map.get(hour, pred)
+
+        total_predicted *= 1 + np.random.normal(0, 0.03)
+        if resource_type == 'water':
+            total_predicted *= 0.02
+            total_baseline *= 0.02
+
+        predictions.append({
+            'hour': hour,
+            'timestamp': future_time.strftime('%Y-%m-%d %H:%M'),
+            'predicted': round(float(total_predicted), 2),
+            'baseline': round(float(total_baseline), 2),
+            'lowerBound': round(float(total_predicted * 0.85), 2),
+            'upperBound': round(float(total_predicted * 1.15), 2),
+        })
+
+    return {'predictions': predictions}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    forecaster = ConsumptionForecaster()
+    forecaster.fit(generate_historical_data(days=90, rng=np.random.default_rng(42)))
+
+    # Same output: seed the global RNG identically for both paths
+    for zone in ('campus', 'Gym'):
+        np.random.seed(0)
+        batched = forecaster._predict(zone, 168, 'energy')['predictions']
+        np.random.seed(0)
+        looped = legacy_predict(forecaster, zone=zone, hours=168)['predictions']
+        for b, l in zip(batched, looped):
+            assert b['hour'] == l['hour'] and b['timestamp'] == l['timestamp']
+            assert abs(b['predicted'] - l['predicted']) <= 0.011 and abs(b['baseline'] - l['baseline']) <= 0.011
+
+    print(f"{'zone':<10}{'hours':>6}{'loop ms':>11}{'batched ms':>12}{'speedup':>9}{'cached µs':>11}")
+    for zone in ('campus', 'Gym'):
+        for hours in (48, 168):
+            loop = _best(lambda: legacy_predict(forecaster, zone=zone, hours=hours), args.repeat)
+            batched = _best(lambda: forecaster._predict(zone, hours, 'energy'), args.repeat)
+            forecaster.predict(zone=zone, hours=hours)
+            cached = _best(lambda: forecaster.predict(zone=zone, hours=hours), args.repeat)
+            print(f"{zone:<10}{hours:>6}{loop * 1000:>11.2f}{batched * 1000:>12.2f}{loop / batched:>8.0f}x"
+                  f"{cached * 1e6:>11.1f}")
+    print(f"cache: {forecaster.cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
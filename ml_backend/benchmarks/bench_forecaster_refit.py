@@ -0,0 +1,63 @@
+"""
+Benchmark for incremental ConsumptionForecaster training.
+
+Fits on a long history, then folds in one new day at a time: a full refit
+over all rows versus partial_fit from per-zone sufficient statistics.
+Checks that both give the same forecasts and baselines.
+
+Usage:
+    python -m benchmarks.bench_forecaster_refit [--days 365] [--zones 50] [--new-days 7]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data
+from models.forecaster import ConsumptionForecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--zones', type=int, default=50)
+    parser.add_argument('--new-days', type=int, default=7)
+    args = parser.parse_args()
+
+    zones = _zones(args.zones)
+    df = generate_historical_data(days=args.days + args.new_days, zones=zones, rng=np.random.default_rng(42))
+    days = df['timestamp'] // 86400
+    day_values = np.sort(days.unique())
+    history = df[days < day_values[args.days]]
+
+    full = ConsumptionForecaster()
+    incremental = ConsumptionForecaster()
+    incremental.fit(history)
+
+    full_s = partial_s = 0.0
+    for day in day_values[args.days:]:
+        t0 = time.perf_counter()
+        incremental.partial_fit(df[days == day])
+        partial_s += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        full.fit(df[days <= day])
+        full_s += time.perf_counter() - t0
+
+    X = full._feature_matrix(np.arange(168) % 24, np.arange(168) // 24 % 7)
+    max_diff = max(np.abs(full._models[z].predict(X) - incremental._models[z].predict(X)).max() for z in full.zones)
+    baseline_diff = max(abs(full._baselines[z][h] - incremental._baselines[z][h])
+                        for z in full.zones for h in full._baselines[z])
+    assert max_diff < 1e-6 and baseline_diff < 1e-9, (max_diff, baseline_diff)
+
+    print(f"\n{args.days} days history, {len(zones)} zones, {args.new_days} daily updates")
+    print(f"{'path':<24}{'s/update':>12}")
+    print(f"{'full refit':<24}{full_s / args.new_days:>12.4f}")
+    print(f"{'partial_fit':<24}{partial_s / args.new_days:>12.4f}")
+    print(f"speedup: {full_s / partial_s:.1f}x   max forecast diff: {max_diff:.2e}   max baseline diff: {baseline_diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
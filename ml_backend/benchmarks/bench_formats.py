@@ -0,0 +1,77 @@
+"""
+Benchmark for the bulk response formats (see serialization.py).
+
+Builds a large anomaly report and a week-long forecast, then times turning
+model output into response bytes: today's per-row dicts through Flask's
+jsonify against the columnar payload encoded as JSON, MessagePack and
+Arrow IPC. Sizes are reported raw and gzipped (what the response cache
+stores).
+
+Usage:
+    python -m benchmarks.bench_formats [--hours 168] [--zones 150] [--top 10000]
+"""
+
+import argparse
+import gzip
+
+import numpy as np
+
+import app as api
+from benchmarks.bench_data_generator import _time, _zones
+from data_generator import generate_historical_data, generate_realtime_stream
+from models.anomaly_detector import AnomalyDetector
+from serialization import encode
+
+FORMATS = ['columnar', 'msgpack', 'arrow']
+
+
+def _jsonify(payload: dict) -> bytes:
+    with api.app.app_context():
+        return api.jsonify(payload).get_data()
+
+
+def _report(label: str, build, rows: int):
+    print(f"\n{label} ({rows:,} rows)")
+    print(f"{'format':<22}{'build+encode ms':>16}{'bytes':>12}{'gzip':>10}")
+    baseline = None
+    for fmt in ['json'] + FORMATS:
+        if fmt == 'json':
+            run = lambda: _jsonify(build(False))
+        else:
+            run = lambda fmt=fmt: encode(build(True), fmt)
+        try:
+            body = run()
+        except ImportError as e:
+            print(f"{fmt:<22}{'skipped (' + e.name + ' not installed)':>38}")
+            continue
+        elapsed = _time(run)
+        baseline = baseline or elapsed
+        name = 'json (row dicts)' if fmt == 'json' else fmt
+        print(f"{name:<22}{elapsed * 1e3:>10.2f} ({baseline / elapsed:3.1f}x)"
+              f"{len(body):>12,}{len(gzip.compress(body, 6)):>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=int, default=168)
+    parser.add_argument('--zones', type=int, default=150)
+    parser.add_argument('--top', type=int, default=10_000)
+    args = parser.parse_args()
+
+    zones = _zones(args.zones)
+    rng = np.random.default_rng(42)
+    detector = AnomalyDetector(contamination=0.2)
+    detector.fit(generate_historical_data(days=30, zones=zones, rng=rng))
+
+    window = generate_realtime_stream(hours=args.hours, zones=zones, rng=rng)
+    predictions, scores = detector._score(detector._extract_features(window))
+    top = min(args.top, int((predictions == -1).sum()))
+    _report('anomalies', lambda columnar: detector._summarize(window, predictions, scores, top, columnar), top)
+
+    forecaster = api.forecaster
+    _report('forecast, campus', lambda columnar: forecaster._predict('campus', args.hours, 'energy', columnar),
+            args.hours)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark for sensor ingestion into the per-zone ring-buffer store.
+
+Simulates many EnergyMonitor devices reporting once per second and times
+decode + ingest for NDJSON and binary frames, both directly and through
+the Flask test client, on a single core.
+
+Usage:
+    python -m benchmarks.bench_ingest [--devices 200] [--seconds 600] [--batch 10000]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from data_generator import ZONES
+from sensor_store import READING_DTYPE, SensorStore, decode_binary_frame, decode_ndjson, encode_binary_frame
+
+
+def simulate_readings(devices: int, seconds: int, start: int, rng: np.random.Generator) -> np.ndarray:
+    """One reading per device per second, devices spread across the campus zones."""
+    n = devices * seconds
+    records = np.empty(n, dtype=READING_DTYPE)
+    records['device'] = np.tile(np.arange(devices), seconds)
+    records['zone'] = records['device'] % len(ZONES)
+    records['ts'] = start + np.repeat(np.arange(seconds), devices)
+    records['vrms'] = rng.normal(230, 2, n)
+    records['irms'] = np.abs(rng.normal(1.5, 0.5, n))
+    records['power'] = records['vrms'] * records['irms']
+    return records
+
+
+def to_ndjson(records: np.ndarray) -> bytes:
+    return '\n'.join(json.dumps({
+        'zone': ZONES[r['zone']], 'device': f"esp32-{r['device']:03d}", 'ts': int(r['ts']),
+        'vrms': round(float(r['vrms']), 2), 'irms': round(float(r['irms']), 3), 'power': round(float(r['power']), 2),
+    }) for r in records).encode()
+
+
+def _run(label: str, batches: list[bytes], ingest) -> None:
+    total = 0
+    t0 = time.perf_counter()
+    for body in batches:
+        total += ingest(body)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<28}{total:>12,}{elapsed:>10.3f}{total / elapsed:>16,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--seconds', type=int, default=600)
+    parser.add_argument('--batch', type=int, default=10_000)
+    args = parser.parse_args()
+
+    start = int(time.time()) - args.seconds
+    records = simulate_readings(args.devices, args.seconds, start, np.random.default_rng(42))
+    chunks = [records[i:i + args.batch] for i in range(0, len(records), args.batch)]
+    frames = [encode_binary_frame(c) for c in chunks]
+    ndjson = [to_ndjson(c) for c in chunks]
+
+    print(f"{'path':<28}{'readings':>12}{'seconds':>10}{'readings/s':>16}")
+
+    store = SensorStore(ZONES)
+    _run('binary (direct)', frames, lambda b: store.ingest(*decode_binary_frame(b)))
+    store = SensorStore(ZONES)
+    _run('ndjson (direct)', ndjson, lambda b: store.ingest(*decode_ndjson(b, store)))
+
+    import app
+    client = app.app.test_client()
+    _run('binary (POST /api/ingest)', frames, lambda b: client.post(
+        '/api/ingest', data=b, content_type='application/octet-stream').json['accepted'])
+    _run('ndjson (POST /api/ingest)', ndjson, lambda b: client.post(
+        '/api/ingest', data=b, content_type='application/x-ndjson').json['accepted'])
+
+    print(f"store: {app.sensor_store.stats()}")
+
+
+if __name__ == '__main__':
+    main()
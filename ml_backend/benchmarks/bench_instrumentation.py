@@ -0,0 +1,81 @@
+"""
+Benchmark for the metrics instrumentation overhead.
+
+Times a single stage hook and a request record on their own, then detect()
+and an uncached forecast with the model hooks enabled and disabled
+(interleaved runs, median), and a full request through the Flask test
+client with the request hooks, so the overhead can be read as a share of
+real work.
+
+Usage:
+    python -m benchmarks.bench_instrumentation [--repeat 200]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import app as api
+from benchmarks.suite import _model, _window
+from models import instrumentation
+
+
+def _per_call(fn, n: int = 100_000) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def _on_off(fn, repeat: int) -> tuple[float, float]:
+    """Median seconds per call with hooks on and off, alternating to cancel drift."""
+    on, off = [], []
+    for _ in range(repeat):
+        for enabled, times in ((True, on), (False, off)):
+            instrumentation.enabled = enabled
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    instrumentation.enabled = True
+    return statistics.median(on), statistics.median(off)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    def empty_stage():
+        with instrumentation.stage('bench', 'empty'):
+            pass
+
+    stage_s = _per_call(empty_stage)
+    record_s = _per_call(lambda: api.request_metrics.observe('/bench', 'GET', 200, 0.001))
+    print(f"stage hook:       {stage_s * 1e6:8.2f} µs per stage")
+    print(f"request record:   {record_s * 1e6:8.2f} µs per request")
+
+    detector, window = _model('anomaly', 7), _window(72, 7)
+    forecaster = _model('forecaster', 7)
+    np.random.seed(0)
+
+    # Measured on/off difference is within run-to-run noise; 'hook cost' is stages × per-stage cost
+    print(f"\n{'call':<28}{'hooks on':>12}{'hooks off':>12}{'measured':>10}{'hook cost':>11}")
+    for label, fn, stages in [
+        ('detect (72h × 7 zones)', lambda: detector.detect(window), 3),
+        ('forecast (48h, campus)', lambda: forecaster._predict('campus', 48, 'energy'), 3),
+    ]:
+        on, off = _on_off(fn, args.repeat)
+        print(f"{label:<28}{on * 1e3:>10.3f}ms{off * 1e3:>10.3f}ms{(on - off) / off:>+10.2%}"
+              f"{stages * stage_s / off:>+11.3%}")
+
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the hooks, not the limiter
+    client = api.app.test_client()
+    request_s = _per_call(lambda: client.get('/api/health'), n=args.repeat * 10)
+    print(f"\nGET /api/health:  {request_s * 1e6:8.1f} µs per request; "
+          f"timing + record is {(record_s + stage_s) / request_s:.2%} of it")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for the compiled IsolationForest scorer (models/isolation_forest.py).
+
+Scores batches of 1 to 1M scaled feature rows with the previous path —
+``IsolationForest.predict`` followed by ``decision_function``, kept below as
+a reference — and with ``CompiledForest.score``, single-threaded and with
+the detector's thread count (used from PARALLEL_MIN_ROWS rows). Every batch
+is checked for exactly equal labels and scores.
+
+Usage:
+    python -m benchmarks.bench_isolation_forest [--max-rows 1000000] [--threads N]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data
+from models.anomaly_detector import AnomalyDetector
+from models.isolation_forest import PARALLEL_MIN_ROWS
+
+
+def legacy_score(detector: AnomalyDetector, scaled: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The previous scoring path: two passes over every tree."""
+    return detector.model.predict(scaled), detector.model.decision_function(scaled)
+
+
+def _best(fn, budget: float = 1.0) -> float:
+    """Best time of up to 20 runs within ~budget seconds (at least one)."""
+    best, spent, runs = float('inf'), 0.0, 0
+    while runs < 20 and (runs == 0 or spent + best <= budget):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-rows', type=int, default=1_000_000)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    detector = AnomalyDetector()
+    detector.fit(generate_historical_data(days=30, rng=np.random.default_rng(42)))
+    forest = detector.compiled_forest()
+
+    # Feature rows from a large campus, scaled as the detector scales them
+    zones = max(1, args.max_rows // (24 * 365) + 1)
+    df = generate_historical_data(days=365, zones=_zones(zones), rng=np.random.default_rng(7))
+    rows = detector.scaler.transform(detector._extract_features(df))[:args.max_rows]
+    print(f"{len(forest.value):,} nodes in {len(forest.roots)} trees (depth {forest.depth}); "
+          f"{args.threads} threads from {PARALLEL_MIN_ROWS:,} rows")
+
+    print(f"\n{'rows':>9}{'sklearn':>12}{'compiled':>12}{'threaded':>12}{'speedup':>9}{'rows/s':>14}")
+    n = 1
+    while n <= len(rows):
+        X = rows[:n]
+        labels, scores = forest.score(X, threads=args.threads)
+        expected_labels, expected_scores = legacy_score(detector, X)
+        assert np.array_equal(labels, expected_labels) and np.array_equal(scores, expected_scores), n
+
+        budget = 1.0 if n < 100_000 else 0.0
+        legacy_s = _best(lambda: legacy_score(detector, X), budget)
+        compiled_s = _best(lambda: forest.score(X), budget)
+        threaded_s = _best(lambda: forest.score(X, threads=args.threads), budget) \
+            if args.threads > 1 and n >= PARALLEL_MIN_ROWS else compiled_s
+        fastest = min(compiled_s, threaded_s)
+        print(f"{n:>9,}{legacy_s * 1e3:>10.2f}ms{compiled_s * 1e3:>10.2f}ms{threaded_s * 1e3:>10.2f}ms"
+              f"{legacy_s / fastest:>8.1f}x{n / fastest:>14,.0f}")
+        n *= 10
+    print("\n  ✅ labels and scores identical to sklearn at every batch size")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for streaming anomaly scoring (OnlineAnomalyDetector).
+
+Replays a stream hour by hour: each closed zone-hour aggregate is scored
+once and folded into the per-zone running statistics, versus rescoring the
+trailing 72-hour window with AnomalyDetector.detect on every poll. Also
+times provisional scoring of the in-progress hour (once per hour here; the
+API does it at most every ONLINE_PARTIAL_INTERVAL_SECONDS), checks the
+running moments against a batch mean/std and reports the memory held per
+zone. Costs are per zone-hour row, not per raw sensor reading: the sensor
+store folds readings into these rows.
+
+Usage:
+    python -m benchmarks.bench_online_detector [--zones 150] [--hours 168]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data, generate_realtime_stream
+from models.anomaly_detector import AnomalyDetector
+from models.online_detector import OnlineAnomalyDetector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--zones', type=int, default=150)
+    parser.add_argument('--hours', type=int, default=168)
+    parser.add_argument('--window', type=int, default=72, help='hours rescored per poll by the batch path')
+    args = parser.parse_args()
+
+    zones = _zones(args.zones)
+    rng = np.random.default_rng(42)
+    detector = AnomalyDetector()
+    detector.fit(generate_historical_data(days=14, zones=zones, rng=rng))
+    detector.model.set_params(n_jobs=1)
+
+    stream = generate_realtime_stream(hours=args.hours, zones=zones, rng=rng)
+    hours = [frame for _, frame in stream.groupby('timestamp', sort=True)]
+
+    online = OnlineAnomalyDetector(detector, zones)
+    t0 = time.perf_counter()
+    emitted = sum(len(online.observe(frame)) for frame in hours)
+    online_s = time.perf_counter() - t0
+
+    # Running-statistics update alone (the IsolationForest call dominates the online path)
+    stats_only = OnlineAnomalyDetector(detector, zones)
+    codes = [np.array([stats_only._zone_index[z] for z in frame['zone']]) for frame in hours]
+    t0 = time.perf_counter()
+    for frame, code in zip(hours, codes):
+        stats_only._merge(code, frame['hour'].to_numpy(), frame['energy_kwh'].to_numpy())
+    stats_s = time.perf_counter() - t0
+
+    # Provisional scoring of each hour half-way through (no statistics update)
+    partial = OnlineAnomalyDetector(detector, zones)
+    halves = [frame.assign(energy_kwh=frame['energy_kwh'] / 2) for frame in hours]
+    t0 = time.perf_counter()
+    provisional = sum(len(partial.observe_partial(frame, 0.5)) for frame in halves)
+    partial_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(len(hours)):
+        start = hours[max(0, i - args.window + 1)]['timestamp'].iloc[0]
+        detector.detect(stream[(stream['timestamp'] >= start) & (stream['timestamp'] <= hours[i]['timestamp'].iloc[0])])
+    batch_s = time.perf_counter() - t0
+
+    # Running moments must match a batch computation over everything observed
+    first_zone = stream[stream['zone'] == zones[0]]
+    stats = online.zone_stats(zones[0])
+    for hour, group in first_zone.groupby('hour'):
+        values = group['energy_kwh'].to_numpy()
+        assert stats[hour]['count'] == len(values)
+        assert np.isclose(stats[hour]['mean'], values.mean())
+        if len(values) > 1:
+            assert np.isclose(stats[hour]['std'], values.std(ddof=1))
+
+    rows = len(stream)
+    print(f"{'path':<36}{'seconds':>10}{'µs/zone-hour':>14}")
+    print(f"{'running stats update only':<36}{stats_s:>10.3f}{stats_s / rows * 1e6:>14.1f}")
+    print(f"{'online (score once per hour)':<36}{online_s:>10.3f}{online_s / rows * 1e6:>14.1f}")
+    print(f"{'provisional (in-progress hour)':<36}{partial_s:>10.3f}{partial_s / rows * 1e6:>14.1f}")
+    print(f"{f'batch detect ({args.window}h per poll)':<36}{batch_s:>10.3f}{batch_s / rows * 1e6:>14.1f}")
+    print(f"speedup: {batch_s / online_s:.1f}x   anomalies emitted: {emitted} ({provisional} provisionally)")
+    print(f"state: {online.stats()['bytesPerZone']} bytes per zone ({online.stats()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for the PatternClassifier feature engine.
+
+Computes the eight zone features for many zones with the previous
+per-zone extraction (partition by zone, then one function call per zone;
+kept below as a reference) and with the single grouped pass, checks they
+agree, then times reclassifying a 7-day window of every zone against the
+fitted clusters (the weekly drift check) versus refitting on it.
+
+Usage:
+    python -m benchmarks.bench_pattern_classifier [--zones 500] [--days 90]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data
+from models.pattern_classifier import FEATURES, PatternClassifier
+from models.zone_data import map_zones
+
+
+def legacy_zone_features(cols: dict) -> dict:
+    """The previous per-zone extraction, called once per zone."""
+    energy = np.asarray(cols['energy_kwh'], dtype=np.float64)
+    hours = np.asarray(cols['hour'], dtype=np.intp)
+    dows = np.asarray(cols['day_of_week'])
+
+    counts = np.bincount(hours, minlength=24)
+    hourly_avg = np.sort(np.bincount(hours, weights=energy, minlength=24)[counts > 0] / counts[counts > 0])
+
+    peak_hours = hourly_avg[-6:].mean()
+    off_peak_hours = hourly_avg[:6].mean()
+
+    weekend_mask = dows >= 5
+    weekday = energy[~weekend_mask].mean() if (~weekend_mask).any() else np.nan
+    weekend = energy[weekend_mask].mean() if weekend_mask.any() else np.nan
+
+    mean = energy.mean()
+    std = energy.std(ddof=1) if len(energy) > 1 else np.nan
+    return {
+        'avg_consumption': mean,
+        'std_consumption': std,
+        'cv': std / max(mean, 0.1),
+        'peak_trough_ratio': peak_hours / max(off_peak_hours, 0.1),
+        'off_peak_ratio': off_peak_hours / max(peak_hours, 0.1),
+        'weekend_reduction': 1 - (weekend / max(weekday, 0.1)),
+        'max_spike': energy.max() / max(mean, 0.1),
+        'q95': np.quantile(energy, 0.95),
+    }
+
+
+def _best(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--zones', type=int, default=500)
+    parser.add_argument('--days', type=int, default=90)
+    args = parser.parse_args()
+
+    df = generate_historical_data(days=args.days, zones=_zones(args.zones), rng=np.random.default_rng(42))
+    print(f"{len(df):,} rows, {args.zones} zones")
+
+    legacy = pd.DataFrame([f for _, f in map_zones(legacy_zone_features, df, workers=1)])
+    zones, X = PatternClassifier.zone_features(df)
+    np.testing.assert_allclose(X, legacy[list(FEATURES)].to_numpy(), rtol=1e-9, equal_nan=True)
+
+    legacy_s = _best(lambda: map_zones(legacy_zone_features, df, workers=1))
+    grouped_s = _best(lambda: PatternClassifier.zone_features(df))
+    print(f"\n{'zone features':<30}{'seconds':>10}")
+    print(f"{'per zone (legacy)':<30}{legacy_s:>10.3f}")
+    print(f"{'one grouped pass':<30}{grouped_s:>10.3f}  ({legacy_s / grouped_s:.1f}x)")
+
+    classifier = PatternClassifier()
+    classifier.fit(df)
+    week = df[df['timestamp'].to_numpy() >= df['timestamp'].max() - 7 * 86400]
+    classify_s = _best(lambda: classifier.classify(week))
+    refit_s = _best(lambda: PatternClassifier().fit(week))
+    report = classifier.classify(week)
+    print(f"\n{'last 7 days, every zone':<30}{'seconds':>10}")
+    print(f"{'classify (fitted clusters)':<30}{classify_s:>10.3f}")
+    print(f"{'refit on the window':<30}{refit_s:>10.3f}")
+    print(f"zones whose class changed: {report['changedCount']} of {len(report['patterns'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark for pre-forked serving with shared model memory (gunicorn.conf.py).
+
+Starts gunicorn with 1, 4 and 16 workers, once loading the app in every
+worker (PRELOAD_MODELS=false, one copy of the models per worker) and once
+preloading it in the master so workers share it copy-on-write. For each run
+it drives uncached anomaly requests (model scoring on a 72h window) from
+concurrent clients and reports per-worker memory from /proc — RSS, PSS
+(shared pages split between the processes mapping them) and USS (pages only
+that worker holds) — plus total PSS and requests per second.
+
+Needs gunicorn (``pip install gunicorn``) and Linux.
+
+Usage:
+    MODEL_ARTIFACT_DIR=... python -m benchmarks.bench_prefork [--workers 1 4 16] [--seconds 10] [--clients 8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve_app():
+    """WSGI app for gunicorn (``benchmarks.bench_prefork:serve_app()``), without the per-IP rate limit."""
+    import app as api
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the workers, not the limiter
+    return api.app
+
+
+def _memory_kib(pid: int) -> dict:
+    """Rss, Pss and USS (private clean + dirty) of a process, in KiB."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'uss': fields['Private_Clean'] + fields['Private_Dirty']}
+
+
+def _children(pid: int) -> list[int]:
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def _client(args) -> int:
+    """Issue requests until the deadline; each has a distinct limit so none is a response-cache hit."""
+    base, client, deadline = args
+    done, i = 0, 0
+    while time.time() < deadline:
+        i += 1
+        limit = 21 + (client * 7919 + i) % 9979
+        done += _get(f'{base}/api/anomalies?hours=72&limit={limit}')
+    return done
+
+
+def _run(workers: int, preload: bool, seconds: float, clients: int) -> dict:
+    port = _free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = {**os.environ, 'WEB_CONCURRENCY': str(workers), 'PRELOAD_MODELS': str(preload).lower(),
+           'BIND': f'127.0.0.1:{port}', 'SNAPSHOT_INTERVAL_SECONDS': '0',
+           'INGEST_ENABLED': 'false'}    # required for more than one worker (gunicorn.conf.py)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning',
+         'benchmarks.bench_prefork:serve_app()'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        started = time.time()
+        while not _get(f'{base}/api/health'):
+            if server.poll() is not None or time.time() - started > 600:
+                raise RuntimeError(f'gunicorn did not start ({workers} workers, preload={preload})')
+            time.sleep(0.2)
+        while len(_children(server.pid)) < workers:
+            time.sleep(0.2)
+
+        # Every worker serves a few requests first, so its memory includes what serving touches
+        with multiprocessing.Pool(clients) as pool:
+            pool.map(_client, [(base, c, time.time() + 1 + workers * 0.2) for c in range(clients)])
+            t0 = time.time()
+            done = sum(pool.map(_client, [(base, c, t0 + seconds) for c in range(clients)]))
+            elapsed = time.time() - t0
+
+        worker_mem = [_memory_kib(pid) for pid in _children(server.pid)]
+        master = _memory_kib(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    return {
+        'rss': statistics.mean(m['rss'] for m in worker_mem) / 1024,
+        'pss': statistics.mean(m['pss'] for m in worker_mem) / 1024,
+        'uss': statistics.mean(m['uss'] for m in worker_mem) / 1024,
+        'total_pss': (master['pss'] + sum(m['pss'] for m in worker_mem)) / 1024,
+        'rps': done / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.seconds:g}s per run")
+    print(f"{'mode':<10}{'workers':>8}{'RSS/worker':>13}{'PSS/worker':>13}{'USS/worker':>13}"
+          f"{'total PSS':>12}{'req/s':>9}")
+    for workers in args.workers:
+        for label, preload in (('per-worker', False), ('shared', True)):
+            r = _run(workers, preload, args.seconds, args.clients)
+            print(f"{label:<10}{workers:>8}{r['rss']:>10.1f}MiB{r['pss']:>10.1f}MiB{r['uss']:>10.1f}MiB"
+                  f"{r['total_pss']:>9.1f}MiB{r['rps']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Microbenchmark for the rate_limit decorator.
+
+Times a decorated no-op view against the bare view inside a request
+context, for each limiter backend, with one client and with many distinct
+client IPs (key churn and LRU eviction).
+
+Usage:
+    python -m benchmarks.bench_ratelimit [--calls 200000] [--clients 50000]
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+import app as api
+from ratelimit import MemoryLimiter, SQLiteLimiter
+
+
+class _RotatingClients:
+    """Limiter wrapper that charges a different client IP on each call."""
+
+    def __init__(self, limiter, clients: int):
+        self.limiter = limiter
+        self._ips = itertools.cycle([f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(clients)])
+
+    def allow(self, key: str):
+        return self.limiter.allow(next(self._ips))
+
+
+def _per_call_us(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--clients', type=int, default=50_000)
+    args = parser.parse_args()
+
+    def view():
+        return None
+
+    limited = api.rate_limit(view)
+    db_path = os.path.join(tempfile.mkdtemp(), 'ratelimit.sqlite3')
+    backends = {
+        # Limits high enough that every call is allowed; max_keys forces eviction with many clients
+        'memory': lambda: MemoryLimiter(10**9, 1, max_keys=args.clients // 2),
+        'sqlite': lambda: SQLiteLimiter(db_path, 10**9, 1, max_keys=args.clients // 2),
+    }
+
+    print(f"{'backend':<10}{'clients':>10}{'µs/call':>10}{'overhead µs':>14}{'keys held':>12}")
+    with api.app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        bare = _per_call_us(view, args.calls)
+        for name, make in backends.items():
+            calls = args.calls if name == 'memory' else args.calls // 10
+            for clients in (1, args.clients):
+                limiter = make()
+                api._limiter = limiter if clients == 1 else _RotatingClients(limiter, clients)
+                total = _per_call_us(limited, calls)
+                print(f"{name:<10}{clients:>10,}{total:>10.2f}{total - bare:>14.2f}{len(limiter):>12,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for the read-only endpoints' response cache.
+
+Replays a dashboard load against the Flask test client: the first
+(uncached) request, a repeat load served from the cache, and a browser
+revalidation answered with 304, reporting time and bytes on the wire.
+
+Usage:
+    python -m benchmarks.bench_response_cache [--repeat 200]
+"""
+
+import argparse
+import time
+
+import app as api
+
+DASHBOARD = [
+    '/api/anomalies?zone=all&hours=72',
+    '/api/forecast?zone=campus&hours=48&type=energy',
+    '/api/patterns',
+    '/api/recommendations?zone=all',
+    '/api/savings-potential',
+]
+
+
+def _load(client, headers_for) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    size = sum(len(client.get(url, headers=headers_for(url)).data) for url in DASHBOARD)
+    return time.perf_counter() - t0, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the endpoints, not the limiter
+    client = api.app.test_client()
+    gzip_only = {'Accept-Encoding': 'gzip'}
+
+    api.response_cache.invalidate()
+    cold, cold_bytes = _load(client, lambda url: {})
+    etags = {url: client.get(url).headers['ETag'] for url in DASHBOARD}
+
+    print(f"{'dashboard load (5 endpoints)':<34}{'ms':>10}{'bytes':>10}")
+    print(f"{'first load (computed)':<34}{cold * 1e3:>10.2f}{cold_bytes:>10,}")
+    for label, headers_for in [
+        ('repeat, identity', lambda url: {}),
+        ('repeat, gzip', lambda url: gzip_only),
+        ('repeat, br/gzip', lambda url: {'Accept-Encoding': 'br, gzip'}),
+        ('revalidate (304)', lambda url: {'If-None-Match': etags[url]}),
+    ]:
+        total, size = 0.0, 0
+        for _ in range(args.repeat):
+            elapsed, size = _load(client, headers_for)
+            total += elapsed
+        print(f"{label:<34}{total / args.repeat * 1e3:>10.2f}{size:>10,}")
+
+    print(f"cache: {api.response_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
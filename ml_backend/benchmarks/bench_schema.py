@@ -0,0 +1,105 @@
+"""
+Benchmark for the compact reading-frame layout (models/schema.py).
+
+Generates a historical dataset and fits all three models on it, once in
+the compact layout and once converted to the previous layout (object zone
+strings, int64 calendar columns, float64 readings, datetime64 timestamps
+and a separate is_weekend column). Each run is a fresh child process so
+peak RSS is measured per layout; the frame's own size and the fit time
+are reported too. Both layouts go through the current model code, so the
+difference is the layout alone.
+
+Usage:
+    python -m benchmarks.bench_schema [--days 365] [--zones 200]
+"""
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+LAYOUTS = ('previous', 'compact')
+
+
+def previous_layout(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame as the generator built it before the compact schema."""
+    dows = df['day_of_week'].to_numpy(np.int64)
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(df['timestamp'].to_numpy(), unit='s'),
+        'zone': df['zone'].to_numpy(dtype=object),
+        'hour': df['hour'].to_numpy(np.int64),
+        'day_of_week': dows,
+        'energy_kwh': df['energy_kwh'].to_numpy(np.float64),
+        'water_kl': df['water_kl'].to_numpy(np.float64),
+        'is_weekend': dows >= 5,
+        'month': df['month'].to_numpy(np.int64),
+        'is_anomaly': df['is_anomaly'].to_numpy(),
+    })
+
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux reports KiB
+
+
+def _child(layout: str, days: int, zones: int):
+    from benchmarks.bench_data_generator import _zones
+    from data_generator import generate_historical_data
+    from models.anomaly_detector import AnomalyDetector
+    from models.forecaster import ConsumptionForecaster
+    from models.pattern_classifier import PatternClassifier
+
+    df = generate_historical_data(days=days, zones=_zones(zones), rng=np.random.default_rng(42))
+    if layout == 'previous':
+        df = previous_layout(df)
+        gc.collect()
+
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    t0 = time.perf_counter()
+    for model in (AnomalyDetector(), ConsumptionForecaster(), PatternClassifier()):
+        model.fit(df)
+    fit_s = time.perf_counter() - t0
+
+    print(json.dumps({'rows': len(df), 'frame_mib': frame_bytes / 2**20, 'fit_s': fit_s,
+                      'peak_rss_mib': _peak_rss_mib()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--zones', type=int, default=200)
+    parser.add_argument('--child', choices=LAYOUTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.days, args.zones)
+        return
+
+    results = {}
+    for layout in LAYOUTS:
+        out = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_schema', '--child', layout,
+             '--days', str(args.days), '--zones', str(args.zones)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[layout] = json.loads(out.strip().splitlines()[-1])
+
+    rows = results['compact']['rows']
+    print(f"{rows:,} rows ({args.days} days × {args.zones} zones)")
+    print(f"{'layout':<10}{'frame':>12}{'bytes/row':>11}{'peak RSS':>12}{'fit (3 models)':>16}")
+    for layout, r in results.items():
+        print(f"{layout:<10}{r['frame_mib']:>9.1f}MiB{r['frame_mib'] * 2**20 / rows:>11.1f}"
+              f"{r['peak_rss_mib']:>9.1f}MiB{r['fit_s']:>15.2f}s")
+    before, after = results['previous'], results['compact']
+    print(f"\ncompact vs previous: frame {after['frame_mib'] / before['frame_mib']:.2f}x, "
+          f"peak RSS {after['peak_rss_mib'] / before['peak_rss_mib']:.2f}x, "
+          f"fit {after['fit_s'] / before['fit_s']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for snapshot-served endpoints.
+
+Times the default dashboard views through the Flask test client computed
+inline per request (the previous behaviour) versus served from the latest
+background snapshot, with the response cache cleared before each request
+so only the view itself is measured. Also times one full snapshot refresh
+on one worker thread and on several.
+
+Usage:
+    python -m benchmarks.bench_snapshots [--repeat 20] [--workers 1 4]
+"""
+
+import argparse
+import statistics
+import time
+
+import app as api
+
+VIEWS = [
+    '/api/anomalies?zone=all',
+    '/api/forecast?zone=campus',
+    '/api/patterns',
+    '/api/recommendations?zone=all',
+    '/api/savings-potential',
+]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the endpoints, not the limiter
+    api.snapshots.stop()
+    client = api.app.test_client()
+
+    print(f"{'snapshot refresh':<34}{'ms':>10}")
+    for workers in args.workers:
+        api.snapshots.workers = workers
+        refresh = _median_ms(api.snapshots.refresh, max(3, args.repeat // 5))
+        print(f"{f'{len(api.snapshots._jobs)} jobs, {workers} worker(s)':<34}{refresh:>10.1f}")
+
+    def get(url):
+        def run():
+            api.response_cache.invalidate()
+            api.forecaster.cache.clear()
+            assert client.get(url).status_code == 200
+        return run
+
+    print(f"\n{'view':<34}{'inline ms':>10}{'snapshot ms':>13}")
+    for url in VIEWS:
+        api.SNAPSHOT_INTERVAL = 0
+        inline = _median_ms(get(url), args.repeat)
+        api.SNAPSHOT_INTERVAL = 1
+        served = _median_ms(get(url), args.repeat)
+        print(f"{url:<34}{inline:>10.2f}{served:>13.2f}  ({inline / served:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
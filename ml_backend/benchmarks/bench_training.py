@@ -0,0 +1,66 @@
+"""
+Benchmark for per-zone model training.
+
+Times ConsumptionForecaster.fit and PatternClassifier.fit on many zones:
+the previous boolean-mask-per-zone loop (kept below as a reference) versus
+the group-once partition, on one and on several worker processes.
+
+Usage:
+    python -m benchmarks.bench_training [--zones 500] [--days 90] [--workers 1 4]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from benchmarks.bench_pattern_classifier import legacy_zone_features
+from data_generator import generate_historical_data
+from models.forecaster import ConsumptionForecaster
+from models.pattern_classifier import PatternClassifier
+
+
+def legacy_fit(forecaster: ConsumptionForecaster, classifier: PatternClassifier, df):
+    """The original scan: one boolean mask over the full frame per zone, fitted in-process."""
+    for zone in df['zone'].unique():
+        zone_df = df[df['zone'] == zone]
+        cols = {name: zone_df[name].to_numpy() for name in ('hour', 'day_of_week', 'energy_kwh')}
+        forecaster._models[zone] = ConsumptionForecaster._fit_zone(cols, forecaster.DEGREE, forecaster.ALPHA)[0]
+        legacy_zone_features(cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--zones', type=int, default=500)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    df = generate_historical_data(days=args.days, zones=_zones(args.zones), rng=np.random.default_rng(42))
+    print(f"{len(df):,} rows, {args.zones} zones, {os.cpu_count()} CPUs")
+    print(f"{'path':<28}{'seconds':>10}")
+
+    t0 = time.perf_counter()
+    legacy_fit(ConsumptionForecaster(), PatternClassifier(), df)
+    print(f"{'mask per zone (legacy)':<28}{time.perf_counter() - t0:>10.2f}")
+
+    X = ConsumptionForecaster._feature_matrix(np.arange(24), np.zeros(24))
+    reference = None
+    for workers in dict.fromkeys(args.workers):
+        forecaster, classifier = ConsumptionForecaster(), PatternClassifier()
+        t0 = time.perf_counter()
+        forecaster.fit(df, workers=workers)
+        classifier.fit(df)
+        print(f"{f'group once, {workers} worker(s)':<28}{time.perf_counter() - t0:>10.2f}")
+
+        # Same models whatever the worker count
+        predictions = np.array([forecaster._models[z].predict(X) for z in forecaster.zones])
+        if reference is None:
+            reference = predictions
+        assert np.array_equal(predictions, reference)
+
+
+if __name__ == '__main__':
+    main()
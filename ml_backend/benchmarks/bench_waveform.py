@@ -0,0 +1,187 @@
+"""
+Replay benchmark for raw-waveform ingestion (waveform.py).
+
+Streams EnergyMonitor sample blocks — synthetic (many devices with mixed
+linear and non-linear loads, mains frequency drift and a ~4.8 kHz burst
+rate) or recorded in a waveform frame file — through the pipeline and
+reports samples processed per second (per channel) for:
+
+* a per-block loop with a full FFT per channel (the straightforward port of
+  the sketch's maths; kept below as a reference)
+* batched analysis of decoded frames
+* decode + analysis + folding into the sensor store's hourly aggregates
+* POST /api/ingest through the Flask test client, or a live server (--url)
+
+Synthetic blocks are checked against their known power factor and THD.
+
+Usage:
+    python -m benchmarks.bench_waveform [--devices 200] [--blocks 100] [--samples 500]
+    python -m benchmarks.bench_waveform --save frames.eww      # record the synthetic frame
+    python -m benchmarks.bench_waveform --input frames.eww [--url http://127.0.0.1:5000]
+"""
+
+import argparse
+import time
+import urllib.request
+
+import numpy as np
+
+from data_generator import ZONES
+from sensor_store import SensorStore
+from waveform import (MAINS_HZ, analyze, block_dtype, decode_waveform_frame,
+                      encode_waveform_frame)
+
+V_SCALE = 3.3 / 4095 * 312      # ZMPT101B channel calibration of the EnergyMonitor sketch
+I_SCALE = 0.01                  # ±20 A current transformer over the 12-bit ADC
+CHUNK = 4096
+
+
+def synthesize_blocks(devices: int, per_device: int, samples: int, sample_rate: float,
+                      start: int, rng: np.random.Generator) -> tuple[np.ndarray, dict]:
+    """Sample blocks (one per device per second) and their true power factor / current THD."""
+    n = devices * per_device
+    blocks = np.empty(n, dtype=block_dtype(samples))
+    device = np.tile(np.arange(devices), per_device)
+    blocks['device'] = device
+    blocks['zone'] = device % len(ZONES)
+    blocks['ts'] = start + np.repeat(np.arange(per_device), devices)
+    blocks['v_scale'] = V_SCALE
+    blocks['i_scale'] = I_SCALE
+
+    # Per device: load current, displacement angle, and whether the load is non-linear (3rd/5th harmonics)
+    irms = rng.uniform(0.5, 8.0, devices)[device]
+    lag = np.arccos(rng.uniform(0.7, 1.0, devices))[device]
+    distortion = np.where(rng.random(devices) < 0.5, 1.0, 0.0)[device]
+    current_orders = {1: 1.0, 3: 0.2 * distortion, 5: 0.1 * distortion}
+    voltage_orders = {1: 1.0, 3: 0.03, 5: 0.02}
+    f0 = rng.uniform(49.9, 50.1, n)
+    phase0 = rng.uniform(0, 2 * np.pi, n)
+
+    # Per-order RMS (voltage harmonics in phase with the fundamental, current ones lag by k·angle)
+    v_rms = {k: 230.0 * a for k, a in voltage_orders.items()}
+    i_rms = {k: irms * a for k, a in current_orders.items()}
+    real = sum(v_rms[k] * i_rms[k] * np.cos(k * lag) for k in voltage_orders)
+    apparent = np.sqrt(sum(v ** 2 for v in v_rms.values())) * np.sqrt(sum(i ** 2 for i in i_rms.values()))
+    truth = {
+        'power_factor': real / apparent,
+        'displacement_pf': np.cos(lag),
+        'current_thd': np.hypot(i_rms[3], i_rms[5]) / i_rms[1],
+    }
+
+    t = np.arange(samples) / sample_rate
+    for s in range(0, n, CHUNK):
+        rows = slice(s, s + CHUNK)
+        angle = 2 * np.pi * f0[rows, None] * t + phase0[rows, None]
+        v = sum(np.sqrt(2) * v_rms[k] * np.sin(k * angle) for k in voltage_orders)
+        i = sum(np.sqrt(2) * np.asarray(i_rms[k])[rows, None] * np.sin(k * (angle - lag[rows, None]))
+                for k in current_orders)
+        noise = rng.normal(0, 1.0, (2,) + v.shape)            # ~1 count of ADC noise
+        blocks['voltage'][rows] = np.clip(np.rint(2048 + v / V_SCALE + noise[0]), 0, 4095)
+        blocks['current'][rows] = np.clip(np.rint(2048 + i / I_SCALE + noise[1]), 0, 4095)
+    return blocks, truth
+
+
+def reference_analyze(blocks: np.ndarray, sample_rate: float) -> dict[str, np.ndarray]:
+    """Per-block loop: offset removal, RMS and a full rfft per channel, harmonics at the nearest bin."""
+    samples = blocks.dtype['voltage'].shape[0]
+    bins = np.rint(np.arange(1, 16) * MAINS_HZ * samples / sample_rate).astype(int)
+    out = {name: np.empty(len(blocks)) for name in ('vrms', 'irms', 'real_power', 'power_factor', 'current_thd')}
+    for n, block in enumerate(blocks):
+        v = (block['voltage'] - block['voltage'].mean()) * block['v_scale']
+        i = (block['current'] - block['current'].mean()) * block['i_scale']
+        vrms, irms = np.sqrt(np.mean(v * v)), np.sqrt(np.mean(i * i))
+        real = np.mean(v * i)
+        spectrum = np.abs(np.fft.rfft(i))[bins[bins < samples // 2 + 1]]
+        out['vrms'][n], out['irms'][n], out['real_power'][n] = vrms, irms, real
+        out['power_factor'][n] = real / (vrms * irms)
+        out['current_thd'][n] = np.sqrt(np.sum(spectrum[1:] ** 2)) / spectrum[0]
+    return out
+
+
+def _check(result: dict, truth: dict):
+    """Batched results agree with the synthetic ground truth."""
+    for name, tolerance in (('power_factor', 0.01), ('displacement_pf', 0.01), ('current_thd', 0.01)):
+        error = np.abs(result[name] - truth[name])
+        assert error.max() < tolerance, f'{name}: max error {error.max():.4f}'
+        print(f"  ✅ {name:<16} max abs error {error.max():.4f}")
+
+
+def _run(label: str, frames: list[bytes], samples: int, process) -> None:
+    blocks = 0
+    t0 = time.perf_counter()
+    for body in frames:
+        blocks += process(body)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<32}{blocks:>10,}{elapsed:>10.3f}{blocks * samples / elapsed:>16,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--blocks', type=int, default=100, help='blocks per device (one per second)')
+    parser.add_argument('--samples', type=int, default=500, help='samples per block and channel')
+    parser.add_argument('--sample-rate', type=float, default=4807.7)
+    parser.add_argument('--batch', type=int, default=2000, help='blocks per POSTed frame')
+    parser.add_argument('--reference-blocks', type=int, default=2000)
+    parser.add_argument('--input', help='replay a recorded waveform frame file')
+    parser.add_argument('--save', help='write the synthetic blocks as a waveform frame file')
+    parser.add_argument('--url', help='also stream to a running server, e.g. http://127.0.0.1:5000')
+    parser.add_argument('--token', default='', help='X-Ingest-Token for --url')
+    args = parser.parse_args()
+
+    truth = None
+    if args.input:
+        with open(args.input, 'rb') as f:
+            blocks, sample_rate = decode_waveform_frame(f.read())
+    else:
+        sample_rate = args.sample_rate
+        start = int(time.time()) - args.blocks
+        blocks, truth = synthesize_blocks(args.devices, args.blocks, args.samples, sample_rate,
+                                          start, np.random.default_rng(42))
+        if args.save:
+            with open(args.save, 'wb') as f:
+                f.write(encode_waveform_frame(blocks, sample_rate))
+            print(f"saved {len(blocks):,} blocks to {args.save}")
+
+    samples = blocks.dtype['voltage'].shape[0]
+    frames = [encode_waveform_frame(blocks[i:i + args.batch], sample_rate)
+              for i in range(0, len(blocks), args.batch)]
+    print(f"{len(blocks):,} blocks × {samples} samples at {sample_rate:g} Hz, {len(frames)} frames")
+
+    if truth is not None:
+        _check(analyze(blocks, sample_rate), truth)
+
+    print(f"\n{'path':<32}{'blocks':>10}{'seconds':>10}{'samples/s':>16}")
+    reference = blocks[:args.reference_blocks]
+    _run('per block, full FFT (reference)', [encode_waveform_frame(reference, sample_rate)], samples,
+         lambda b: len(reference_analyze(*decode_waveform_frame(b))['vrms']))
+    _run('batched analysis', frames, samples, lambda b: len(analyze(*decode_waveform_frame(b))['vrms']))
+
+    store = SensorStore(ZONES)
+
+    def fold(body: bytes) -> int:
+        decoded, rate = decode_waveform_frame(body)
+        result = analyze(decoded, rate)
+        return store.ingest(decoded['zone'], decoded['ts'], result['vrms'], result['irms'],
+                            np.abs(result['real_power']), power_factor=np.abs(result['power_factor']),
+                            current_thd=result['current_thd'])
+    _run('decode + analysis + ingest', frames, samples, fold)
+
+    import app
+    client = app.app.test_client()
+    _run('POST /api/ingest (test client)', frames, samples, lambda b: client.post(
+        '/api/ingest', data=b, content_type='application/octet-stream').json['accepted'])
+    if args.url:
+        def post(body: bytes) -> int:
+            req = urllib.request.Request(f"{args.url.rstrip('/')}/api/ingest", data=body, headers={
+                'Content-Type': 'application/octet-stream', 'X-Ingest-Token': args.token})
+            with urllib.request.urlopen(req) as response:
+                return len(decode_waveform_frame(body)[0]) if response.status == 200 else 0
+        _run(f'POST {args.url}', frames, samples, post)
+
+    window = app.sensor_store.window(hours=1, include_current=True)
+    print(f"\ncurrent hour: {window[['zone', 'energy_kwh', 'power_factor', 'current_thd']].head(4).to_string(index=False)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark for lazily loaded per-zone models.
+
+Saves a forecaster with many zones (the 7 fitted campus zones repeated
+under new names) to a temporary artifact store, then compares loading it
+eagerly (every zone up front) with loading it lazily through the
+ZoneRegistry: startup time and memory, the latency of a forecast for a cold
+zone (loaded on that request) versus a warm one, and loads/evictions when
+the memory budget holds only a fraction of the zones.
+
+Usage:
+    python -m benchmarks.bench_zone_registry [--zones 2000] [--budget-mb 1]
+"""
+
+import argparse
+import gc
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.suite import _model
+from models.artifact_store import ArtifactStore
+from models.forecaster import ConsumptionForecaster
+
+
+def _build(zones: int) -> ConsumptionForecaster:
+    fitted = _model('forecaster', 7)
+    forecaster = ConsumptionForecaster()
+    for i in range(zones):
+        source = fitted.zones[i % len(fitted.zones)]
+        zone = f'Zone {i:05d}'
+        forecaster._models[zone] = fitted._models[source]
+        forecaster._baselines[zone] = fitted._baselines[source]
+        forecaster._stats[zone] = fitted._stats[source]
+    return forecaster
+
+
+def _load(store: ArtifactStore, lazy: bool, budget: int):
+    models, _ = store.load(lazy_zones=lazy, zone_budget_bytes=budget)
+    return models['forecaster']
+
+
+def _startup(store: ArtifactStore, lazy: bool, budget: int) -> tuple[float, float]:
+    """(seconds, MiB retained) to load the artifact; memory is measured on a second, traced load."""
+    t0 = time.perf_counter()
+    _load(store, lazy, budget)
+    seconds = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    forecaster = _load(store, lazy, budget)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del forecaster
+    return seconds, retained / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--zones', type=int, default=2000)
+    parser.add_argument('--budget-mb', type=float, default=1.0, help='small budget for the eviction run')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = ArtifactStore(root)
+        store.save({'forecaster': _build(args.zones)})
+        np.random.seed(0)
+
+        print(f"{args.zones} zones")
+        print(f"{'load':<10}{'startup':>12}{'memory':>12}")
+        for label, lazy in (('eager', False), ('lazy', True)):
+            seconds, mib = _startup(store, lazy, 256 * 2**20)
+            print(f"{label:<10}{seconds * 1e3:>10.1f}ms{mib:>10.2f}MiB")
+
+        # Each request forecasts a zone not seen before (cold), then the same zone again (warm)
+        forecaster = _load(store, True, 256 * 2**20)
+        zones = forecaster.zones[:args.requests]
+        cold, warm = [], []
+        for zone in zones:
+            for times in (cold, warm):
+                t0 = time.perf_counter()
+                forecaster._predict(zone, 48, 'energy')
+                times.append(time.perf_counter() - t0)
+        print(f"\nforecast (48h, one zone), median of {len(zones)}:")
+        print(f"  cold zone: {statistics.median(cold) * 1e3:8.3f}ms   (loaded on this request)")
+        print(f"  warm zone: {statistics.median(warm) * 1e3:8.3f}ms")
+
+        # Round-robin over every zone with a budget far below the total
+        budget = int(args.budget_mb * 2**20)
+        forecaster = _load(store, True, budget)
+        t0 = time.perf_counter()
+        for _ in range(2):
+            for zone in forecaster.zones:
+                forecaster._predict_zone(zone, np.zeros((1, 5)))
+        elapsed = time.perf_counter() - t0
+        stats = forecaster.zone_registry.stats()
+        print(f"\nbudget {args.budget_mb:g} MiB, 2 passes over {args.zones} zones in {elapsed:.2f}s:")
+        print(f"  loads {stats['loads']}, evictions {stats['evictions']}, hits {stats['hits']}, "
+              f"resident {stats['resident']} zones / {stats['residentBytes'] / 2**20:.2f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Reproducible benchmark suite for the ML backend.
+
+Covers synthetic data generation, each model's training and inference
+entry points, and every /api/* route through the Flask test client. Cases
+sweep days, zones and forecast horizon, so the report doubles as scaling
+curves (with the fitted exponent, time ∝ n^k, per swept parameter).
+
+    python -m benchmarks.suite run [--quick] [--filter fit.] [--output results.json]
+    python -m benchmarks.suite compare benchmarks/baseline.json [results.json] [--threshold 0.25]
+
+``compare`` runs the suite (or reads a saved run) and exits non-zero when
+a hot-path case (inference and API routes) is slower than the baseline by
+more than the threshold. Refresh the stored baseline on the reference
+machine with ``run --output benchmarks/baseline.json``.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.bench_data_generator import _zones
+from data_generator import generate_historical_data, generate_realtime_stream
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+END = datetime(2026, 1, 5)          # fixed dataset end, so every run sees the same data
+NOISE_FLOOR_MS = 0.5                # changes smaller than this are never regressions
+
+CASES: list[dict] = []
+
+
+def case(group: str, grid: list[dict], hot: bool = False):
+    """Register a benchmark: ``setup(**params)`` returns the zero-arg callable to time."""
+    def decorator(setup):
+        CASES.append({'name': setup.__name__.replace('_', '.', 1), 'group': group, 'grid': grid,
+                      'hot': hot, 'setup': setup})
+        return setup
+    return decorator
+
+
+def _sweep(**axes) -> list[dict]:
+    """One curve per axis: vary it while the others stay at their first value."""
+    base = {name: values[0] for name, values in axes.items()}
+    grid = [dict(base)]
+    for name, values in axes.items():
+        grid += [{**base, name: v} for v in values[1:]]
+    return grid
+
+
+def _data(days: int, zones: int):
+    return generate_historical_data(days=days, zones=_zones(zones), rng=np.random.default_rng(42), end=END)
+
+
+def _window(hours: int, zones: int):
+    return generate_realtime_stream(hours=hours, zones=_zones(zones), rng=np.random.default_rng(7), end=END)
+
+
+_fitted: dict = {}
+
+
+def _model(kind: str, zones: int):
+    """Models trained once per zone count on 30 days of data, shared by the inference cases."""
+    key = (kind, zones)
+    if key not in _fitted:
+        from models.anomaly_detector import AnomalyDetector
+        from models.forecaster import ConsumptionForecaster
+        from models.pattern_classifier import PatternClassifier
+
+        model = {'anomaly': AnomalyDetector, 'forecaster': ConsumptionForecaster,
+                 'patterns': PatternClassifier}[kind]()
+        model.fit(_data(30, zones))
+        _fitted[key] = model
+    return _fitted[key]
+
+
+# ─── Data generation ───
+@case('generate', _sweep(days=[30, 90, 365], zones=[7, 50, 200]))
+def generate_historical(days, zones):
+    return lambda: _data(days, zones)
+
+
+@case('generate', _sweep(hours=[72, 168, 720], zones=[7, 50, 200]))
+def generate_realtime(hours, zones):
+    return lambda: _window(hours, zones)
+
+
+# ─── Training ───
+@case('train', _sweep(days=[30, 90, 180], zones=[7, 50, 150]))
+def fit_anomaly(days, zones):
+    from models.anomaly_detector import AnomalyDetector
+    df = _data(days, zones)
+    return lambda: AnomalyDetector().fit(df)
+
+
+@case('train', _sweep(days=[30, 90, 180], zones=[7, 50, 150]))
+def fit_forecaster(days, zones):
+    from models.forecaster import ConsumptionForecaster
+    df = _data(days, zones)
+    return lambda: ConsumptionForecaster().fit(df, workers=1)
+
+
+@case('train', _sweep(days=[30, 90, 180], zones=[7, 50, 150]))
+def fit_patterns(days, zones):
+    from models.pattern_classifier import PatternClassifier
+    df = _data(days, zones)
+    return lambda: PatternClassifier().fit(df)
+
+
+# ─── Inference ───
+@case('inference', _sweep(hours=[72, 168, 720], zones=[7, 50, 150]), hot=True)
+def detect(hours, zones):
+    detector, window = _model('anomaly', zones), _window(hours, zones)
+    return lambda: detector.detect(window)
+
+
+@case('inference', _sweep(hours=[72, 168], zones=[7, 50, 150]), hot=True)
+def detect_batch(hours, zones):
+    """One window per zone (a dashboard's zone panels) scored in one model call."""
+    detector, window = _model('anomaly', zones), _window(hours, zones)
+    windows = [(zone, None, None) for zone in _zones(zones)]
+    return lambda: detector.detect_batch(window, windows)
+
+
+@case('inference', _sweep(horizon=[24, 48, 168], zones=[7, 50, 150]), hot=True)
+def predict(horizon, zones):
+    forecaster = _model('forecaster', zones)
+    return lambda: forecaster._predict('campus', horizon, 'energy')    # uncached
+
+
+@case('inference', _sweep(zones=[7, 50, 150]), hot=True)
+def classify_patterns(zones):
+    return _model('patterns', zones).classify_all
+
+
+# ─── API routes (Flask test client, response caches cleared per request; default views from snapshots) ───
+API_ROUTES = {
+    'health': '/api/health',
+    'anomalies': '/api/anomalies?zone=all&hours=72',
+    'anomalies.stream': '/api/anomalies/stream?since=0',
+    'forecast': '/api/forecast?zone=campus&type=energy&hours={horizon}',
+    'patterns': '/api/patterns',
+    'recommendations': '/api/recommendations?zone=all',
+    'savings': '/api/savings-potential',
+    'ingest.info': '/api/ingest',
+}
+
+
+def _client():
+    import app as api
+    api._limiter = api.create_limiter('memory', 10**9, 1)   # measure the endpoints, not the limiter
+    if api.SNAPSHOT_INTERVAL:
+        api.snapshots.stop()          # serve one fixed snapshot; no refreshes during timing
+        if api.snapshots.generation == 0:
+            api.snapshots.refresh()
+    return api, api.app.test_client()
+
+
+def _get(api, client, url: str):
+    def run():
+        api.response_cache.invalidate()
+        api.forecaster.cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200, f'{url}: {response.status_code}'
+    return run
+
+
+@case('api', [{'route': name} for name in API_ROUTES if name != 'forecast'], hot=True)
+def api_get(route):
+    api, client = _client()
+    return _get(api, client, API_ROUTES[route])
+
+
+@case('api', _sweep(horizon=[24, 48, 168]), hot=True)
+def api_forecast(horizon):
+    api, client = _client()
+    return _get(api, client, API_ROUTES['forecast'].format(horizon=horizon))
+
+
+@case('api', [{'records': 1000}, {'records': 10_000}], hot=True)
+def api_ingest(records):
+    from sensor_store import READING_DTYPE, encode_binary_frame
+
+    api, client = _client()
+    api.INGEST_TOKEN = ''                 # test client requests come from loopback
+    frame = np.zeros(records, dtype=READING_DTYPE)
+    frame['zone'] = np.arange(records) % len(api.sensor_store.zones)
+    frame['device'] = np.arange(records) % 200
+    frame['ts'] = int(time.time()) - 60
+    frame['vrms'], frame['irms'], frame['power'] = 230.0, 1.5, 345.0
+    body = encode_binary_frame(frame)
+
+    def run():
+        response = client.post('/api/ingest', data=body, content_type='application/octet-stream')
+        assert response.status_code == 200, response.status_code
+    return run
+
+
+@case('api', [{'windows': 7}, {'windows': 50}], hot=True)
+def api_anomalies_batch(windows):
+    api, client = _client()
+    body = {'windows': [{'zone': zone} for zone in (api.SENSOR_ZONES * windows)[:windows]]}
+
+    def run():
+        response = client.post('/api/anomalies/batch', json=body)
+        assert response.status_code == 200, response.status_code
+    return run
+
+
+@case('api', [{'cache': 'warm'}], hot=True)
+def api_dashboard(cache):
+    """The five dashboard calls answered from the response cache."""
+    api, client = _client()
+    urls = [API_ROUTES[name].format(horizon=48) for name in
+            ('anomalies', 'forecast', 'patterns', 'recommendations', 'savings')]
+    for url in urls:
+        client.get(url)
+    return lambda: [client.get(url) for url in urls]
+
+
+# ─── Runner ───
+def case_id(name: str, params: dict) -> str:
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def measure(fn, budget: float, min_runs: int = 3, max_runs: int = 50) -> dict:
+    """Time ``fn`` after one warm-up call: at least ``min_runs`` runs, more while within ``budget`` seconds."""
+    fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_runs or (len(times) < max_runs and time.perf_counter() - start < budget):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        'median_ms': round(statistics.median(times) * 1e3, 4),
+        'min_ms': round(min(times) * 1e3, 4),
+        'runs': len(times),
+    }
+
+
+def run_suite(quick: bool = False, pattern: str | None = None, only: set | None = None) -> dict:
+    budget = 0.2 if quick else 1.0
+    results = {}
+    for spec in CASES:
+        for params in spec['grid']:
+            cid = case_id(spec['name'], params)
+            if (pattern and pattern not in cid) or (only is not None and cid not in only):
+                continue
+            stats = measure(spec['setup'](**params), budget, min_runs=2 if quick else 3)
+            results[cid] = {'group': spec['group'], 'case': spec['name'], 'hot': spec['hot'],
+                            'params': params, **stats}
+            print(f"  {cid:<52}{stats['median_ms']:>12.3f} ms  (n={stats['runs']})", flush=True)
+    return {'meta': _meta(quick), 'results': results}
+
+
+def _meta(quick: bool) -> dict:
+    import pandas
+    import sklearn
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': f'{platform.system()} {platform.machine()}',
+        'cpus': os.cpu_count(),
+        'quick': quick,
+    }
+
+
+def print_curves(results: dict):
+    """Per case and swept parameter: time at each point and the log-log slope."""
+    print("\nScaling curves")
+    curves: dict = {}
+    for cid, r in results.items():
+        for axis, value in r['params'].items():
+            if not isinstance(value, (int, float)):
+                continue
+            fixed = tuple((k, v) for k, v in r['params'].items() if k != axis)
+            curves.setdefault((r['case'], axis, fixed), []).append((value, r['median_ms']))
+    for (name, axis, fixed), points in curves.items():
+        if len(points) < 2:
+            continue
+        points.sort()
+        (x0, t0), (x1, t1) = points[0], points[-1]
+        slope = math.log(t1 / t0) / math.log(x1 / x0) if x1 != x0 and t0 > 0 and t1 > 0 else float('nan')
+        series = '  '.join(f'{x}:{t:.1f}' for x, t in points)
+        print(f"  {name:<22}{axis:<9}{series:<44}ms  ~n^{slope:.2f}")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print the comparison table; returns the hot-path cases that regressed."""
+    if baseline['meta'].get('machine') != current['meta'].get('machine') or \
+            baseline['meta'].get('cpus') != current['meta'].get('cpus'):
+        print(f"⚠️  Baseline from {baseline['meta'].get('machine')} / {baseline['meta'].get('cpus')} CPUs "
+              f"— timings may not be comparable")
+
+    failed = []
+    print(f"\n{'case':<52}{'baseline':>11}{'current':>11}{'change':>9}")
+    for cid, base in baseline['results'].items():
+        cur = current['results'].get(cid)
+        if cur is None:
+            print(f"{cid:<52}{base['median_ms']:>11.3f}{'—':>11}{'missing':>9}")
+            continue
+        change = cur['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        regressed = change > threshold and cur['median_ms'] - base['median_ms'] > NOISE_FLOOR_MS
+        status = ''
+        if regressed:
+            status = '  ❌ regression' if base['hot'] else '  ⚠️  slower'
+            if base['hot']:
+                failed.append(cid)
+        print(f"{cid:<52}{base['median_ms']:>11.3f}{cur['median_ms']:>11.3f}{change:>+9.0%}{status}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = commands.add_parser('run', help='run the suite and print scaling curves')
+    run_cmd.add_argument('--output', help='write results as JSON (e.g. benchmarks/baseline.json)')
+
+    compare_cmd = commands.add_parser('compare', help='compare against a baseline; exit 1 on hot-path regressions')
+    compare_cmd.add_argument('baseline', nargs='?', default=BASELINE_PATH)
+    compare_cmd.add_argument('current', nargs='?', help='saved results (default: run the suite now)')
+    compare_cmd.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown (0.25 = +25%%)')
+
+    for sub in (run_cmd, compare_cmd):
+        sub.add_argument('--quick', action='store_true', help='shorter timing budget per case')
+        sub.add_argument('--filter', dest='pattern', help='only cases whose id contains this string')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        current = run_suite(args.quick, args.pattern)
+        print_curves(current['results'])
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=1)
+                f.write('\n')
+            print(f"\n  ✅ Results written to {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.quick, args.pattern, only=set(baseline['results']))
+    if args.pattern:
+        baseline['results'] = {k: v for k, v in baseline['results'].items() if args.pattern in k}
+
+    failed = compare(baseline, current, args.threshold)
+    if failed:
+        print(f"\n❌ {len(failed)} hot-path regression(s) beyond +{args.threshold:.0%}: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\n  ✅ No hot-path regressions beyond +{args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ import pandas as pd
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
 import onnx
+from onnx import TensorProto, helper
 import onnxruntime as ort
 from sklearn.pipeline import Pipeline
 
@@ -12,19 +13,98 @@ from sklearn.pipeline import Pipeline
 from models.anomaly_detector import AnomalyDetector
 from models.forecaster import ConsumptionForecaster
 from models.pattern_classifier import PatternClassifier
-from data_generator import generate_historical_data
+from models.inference import OnnxEngine, check_parity
+from data_generator import generate_historical_data, generate_realtime_stream
+
+def isolation_forest_to_onnx(detector):
+    """
+    Build a compact ONNX graph for scaler + IsolationForest.
+
+    skl2onnx emits ~5000 nodes for a 200-tree forest (one TreeEnsembleRegressor
+    plus path-length arithmetic per tree), which takes onnxruntime ~25s to load.
+    Here every leaf stores its full path length (depth + c(n_samples) - 1), so
+    the whole forest is a single TreeEnsembleRegressor summing over trees,
+    followed by sklearn's score formula.
+    """
+    from sklearn.ensemble._iforest import _average_path_length
+
+    forest = detector.model
+    scaler = detector.scaler
+
+    tree_ids, node_ids, feature_ids, thresholds, modes, true_ids, false_ids = [], [], [], [], [], [], []
+    leaf_tree_ids, leaf_node_ids, leaf_weights = [], [], []
+    for t, (estimator, features) in enumerate(zip(forest.estimators_, forest.estimators_features_)):
+        tree = estimator.tree_
+        path_lengths = forest._decision_path_lengths[t] + forest._average_path_length_per_tree[t] - 1.0
+        for n in range(tree.node_count):
+            tree_ids.append(t)
+            node_ids.append(n)
+            if tree.children_left[n] == -1:
+                feature_ids.append(0)
+                thresholds.append(0.0)
+                modes.append("LEAF")
+                true_ids.append(0)
+                false_ids.append(0)
+                leaf_tree_ids.append(t)
+                leaf_node_ids.append(n)
+                leaf_weights.append(float(path_lengths[n]))
+            else:
+                # Trees see a feature subset; map back to input columns
+                feature_ids.append(int(features[tree.feature[n]]))
+                thresholds.append(float(tree.threshold[n]))
+                modes.append("BRANCH_LEQ")
+                true_ids.append(int(tree.children_left[n]))
+                false_ids.append(int(tree.children_right[n]))
+
+    denominator = len(forest.estimators_) * float(_average_path_length([forest._max_samples])[0])
+
+    nodes = [
+        helper.make_node("Scaler", ["float_input"], ["scaled"], domain="ai.onnx.ml",
+                         offset=scaler.mean_.astype(np.float32).tolist(),
+                         scale=(1.0 / scaler.scale_).astype(np.float32).tolist()),
+        helper.make_node("TreeEnsembleRegressor", ["scaled"], ["path_length"], domain="ai.onnx.ml",
+                         n_targets=1, aggregate_function="SUM", post_transform="NONE",
+                         nodes_treeids=tree_ids, nodes_nodeids=node_ids, nodes_featureids=feature_ids,
+                         nodes_values=thresholds, nodes_modes=modes,
+                         nodes_truenodeids=true_ids, nodes_falsenodeids=false_ids,
+                         nodes_missing_value_tracks_true=[0] * len(node_ids),
+                         nodes_hitrates=[1.0] * len(node_ids),
+                         target_treeids=leaf_tree_ids, target_nodeids=leaf_node_ids,
+                         target_ids=[0] * len(leaf_node_ids), target_weights=leaf_weights),
+        # decision_function = -2 ** (-path_length / denominator) - offset_
+        helper.make_node("Div", ["path_length", "denominator"], ["normalized"]),
+        helper.make_node("Neg", ["normalized"], ["exponent"]),
+        helper.make_node("Pow", ["two", "exponent"], ["anomaly_score"]),
+        helper.make_node("Add", ["anomaly_score", "offset"], ["negated"]),
+        helper.make_node("Neg", ["negated"], ["scores"]),
+        helper.make_node("Less", ["scores", "zero"], ["is_outlier"]),
+        helper.make_node("Where", ["is_outlier", "minus_one", "one"], ["label"]),
+    ]
+    initializers = [
+        helper.make_tensor("denominator", TensorProto.FLOAT, [], [denominator]),
+        helper.make_tensor("two", TensorProto.FLOAT, [], [2.0]),
+        helper.make_tensor("offset", TensorProto.FLOAT, [], [float(forest.offset_)]),
+        helper.make_tensor("zero", TensorProto.FLOAT, [], [0.0]),
+        helper.make_tensor("minus_one", TensorProto.INT64, [], [-1]),
+        helper.make_tensor("one", TensorProto.INT64, [], [1]),
+    ]
+    graph = helper.make_graph(
+        nodes, "isolation_forest",
+        # Input has 4 features: hour_sin, hour_cos, is_weekend, energy_kwh
+        [helper.make_tensor_value_info("float_input", TensorProto.FLOAT, [None, 4])],
+        [helper.make_tensor_value_info("label", TensorProto.INT64, [None, 1]),
+         helper.make_tensor_value_info("scores", TensorProto.FLOAT, [None, 1])],
+        initializers,
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13), helper.make_opsetid("ai.onnx.ml", 3)], ir_version=8,
+    )
+    onnx.checker.check_model(model)
+    return model
 
 def convert_anomaly_detector(detector, output_path):
     print("Converting AnomalyDetector...")
-    # AnomalyDetector uses scaler + model separately. Let's wrap them in a Pipeline for ONNX export.
-    pipeline = Pipeline([
-        ('scaler', detector.scaler),
-        ('model', detector.model)
-    ])
-    
-    # Input has 4 features: hour_sin, hour_cos, is_weekend, energy_kwh
-    initial_type = [('float_input', FloatTensorType([None, 4]))]
-    onx = convert_sklearn(pipeline, initial_types=initial_type, target_opset={'': 12, 'ai.onnx.ml': 3})
+    onx = isolation_forest_to_onnx(detector)
     
     with open(output_path, "wb") as f:
         f.write(onx.SerializeToString())
@@ -36,9 +116,11 @@ def convert_forecaster(forecaster, output_path_prefix):
     # or loop through all. The requirement says "convert every supported model".
     # Since they are the same architecture, I'll convert each trained zone model.
     
-    for zone, pipeline in forecaster._models.items():
-        zone_slug = zone.replace(' ', '_').replace('-', '_').lower()
-        output_path = f"{output_path_prefix}/forecaster_{zone_slug}.onnx"
+    # Files are named by the zone's index, as in the artifact store's zone files:
+    # zone names may slug alike or contain path separators
+    output_paths = {}
+    for i, (zone, pipeline) in enumerate(forecaster._models.items()):
+        output_path = f"{output_path_prefix}/forecaster_{i:05d}.onnx"
         
         # Input has 5 features: sin_hour, cos_hour, sin_dow, cos_dow, is_weekend
         initial_type = [('float_input', FloatTensorType([None, 5]))]
@@ -46,8 +128,11 @@ def convert_forecaster(forecaster, output_path_prefix):
         
         with open(output_path, "wb") as f:
             f.write(onx.SerializeToString())
+        output_paths[zone] = output_path
         print(f"  ✅ Saved to {output_path}")
 
+    return output_paths
+
 def convert_pattern_classifier(classifier, output_path):
     print("Converting PatternClassifier...")
     # PatternClassifier uses scaler + model (KMeans).
@@ -56,7 +141,7 @@ def convert_pattern_classifier(classifier, output_path):
         ('model', classifier.model)
     ])
     
-    # Input has 8 features from _extract_zone_features
+    # Input has the 8 features of PatternClassifier.zone_features
     initial_type = [('float_input', FloatTensorType([None, 8]))]
     onx = convert_sklearn(pipeline, initial_types=initial_type, target_opset={'': 12, 'ai.onnx.ml': 3})
     
@@ -78,6 +163,33 @@ def validate_onnx(model_path, input_shape):
     outputs = sess.run(None, {input_name: dummy_input})
     print(f"  ✅ Validation successful. Output shapes: {[o.shape for o in outputs]}")
 
+def export_onnx(models, version_dir):
+    """
+    Artifact-store exporter: write ONNX graphs into <version_dir>/onnx and
+    parity-check them against the sklearn models. Returns the manifest section.
+    """
+    onnx_dir = os.path.join(version_dir, "onnx")
+    os.makedirs(onnx_dir, exist_ok=True)
+
+    convert_anomaly_detector(models["anomaly_detector"], os.path.join(onnx_dir, "anomaly_detector.onnx"))
+    forecaster_paths = convert_forecaster(models["forecaster"], onnx_dir)
+    convert_pattern_classifier(models["pattern_classifier"], os.path.join(onnx_dir, "pattern_classifier.onnx"))
+
+    files = {
+        "anomaly_detector": "onnx/anomaly_detector.onnx",
+        "forecaster": {zone: os.path.relpath(path, version_dir) for zone, path in forecaster_paths.items()},
+        "pattern_classifier": "onnx/pattern_classifier.onnx",
+    }
+
+    engine = OnnxEngine.from_manifest(version_dir, {"onnx": files})
+    sample = generate_realtime_stream(hours=168, rng=np.random.default_rng(0))
+    parity = check_parity(models["anomaly_detector"], models["forecaster"], engine, sample)
+    print(f"  {'✅' if parity['passed'] else '❌'} Parity vs sklearn: {parity}")
+    if not parity["passed"]:
+        raise ValueError(f"ONNX export failed parity check: {parity}")
+
+    return {"onnx": {**files, "parity": parity}}
+
 if __name__ == "__main__":
     # Create output directory
     os.makedirs("onnx_models", exist_ok=True)
@@ -98,14 +210,14 @@ if __name__ == "__main__":
     # 2. Convert to ONNX
     print("\nStep 2: Converting to ONNX...")
     convert_anomaly_detector(detector, "onnx_models/anomaly_detector.onnx")
-    convert_forecaster(forecaster, "onnx_models")
+    forecaster_paths = convert_forecaster(forecaster, "onnx_models")
     convert_pattern_classifier(classifier, "onnx_models/pattern_classifier.onnx")
     
     # 3. Validate
     print("\nStep 3: Validating ONNX models...")
     validate_onnx("onnx_models/anomaly_detector.onnx", 4)
     # Validate one forecaster
-    validate_onnx("onnx_models/forecaster_main_building.onnx", 5)
+    validate_onnx(forecaster_paths["Main Building"], 5)
     validate_onnx("onnx_models/pattern_classifier.onnx", 8)
     
     print("\n🚀 All models converted and validated successfully!")
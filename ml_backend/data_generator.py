@@ -1,12 +1,18 @@
 """
 Synthetic data generator for training ML models.
 Simulates realistic campus energy & water patterns.
+
+All consumption is computed as a single (days × hours × zones) tensor with
+NumPy array operations. Pass a seeded ``np.random.Generator`` for
+reproducible datasets. Frames use the compact layout of models/schema.py.
 """
 
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from models.schema import calendar, reading_frame
+
 ZONES = [
     'Hostel A - Floor 1', 'Hostel A - Floor 2', 'Hostel B - Floor 1',
     'Lab - Electronics', 'Lab - Computer Sci', 'Main Building', 'Gym',
@@ -23,98 +29,158 @@ ZONE_PROFILES = {
     'Gym':                {'base': 4.0, 'peak_mult': 2.5, 'peak_hours': (6, 21),  'noise': 0.20},
 }
 
-
-def _hourly_consumption(zone: str, hour: int, day_of_week: int) -> float:
-    """Generate realistic consumption for a given zone/hour/day."""
-    profile = ZONE_PROFILES.get(zone, {'base': 5.0, 'peak_mult': 2.0, 'peak_hours': (8, 18), 'noise': 0.15})
-    base = profile['base']
-    peak_start, peak_end = profile['peak_hours']
-
-    # Peak hours multiplier
-    if peak_start <= hour <= peak_end:
-        value = base * profile['peak_mult']
-        # Bell curve within peak hours
-        mid = (peak_start + peak_end) / 2
-        spread = (peak_end - peak_start) / 2
-        bell = np.exp(-0.5 * ((hour - mid) / spread) ** 2)
-        value = base + (value - base) * bell
-    else:
-        value = base * (0.3 + 0.2 * np.random.random())
-
-    # Weekend reduction for labs and main building
-    if day_of_week >= 5 and zone in ('Lab - Electronics', 'Lab - Computer Sci', 'Main Building'):
-        value *= 0.35
-
-    # Weekend increase for hostels
-    if day_of_week >= 5 and 'Hostel' in zone:
-        value *= 1.15
+DEFAULT_PROFILE = {'base': 5.0, 'peak_mult': 2.0, 'peak_hours': (8, 18), 'noise': 0.15}
+
+# Zones that close down at the weekend vs. zones that get busier
+WEEKEND_QUIET_ZONES = ('Lab - Electronics', 'Lab - Computer Sci', 'Main Building')
+
+
+def _profile_arrays(zones: list[str]) -> dict[str, np.ndarray]:
+    """Stack the per-zone profile parameters into arrays of shape (zones,)."""
+    profiles = [ZONE_PROFILES.get(z, DEFAULT_PROFILE) for z in zones]
+    weekend_factor = [
+        0.35 if z in WEEKEND_QUIET_ZONES else 1.15 if 'Hostel' in z else 1.0
+        for z in zones
+    ]
+    return {
+        'base': np.array([p['base'] for p in profiles], dtype=float),
+        'peak_mult': np.array([p['peak_mult'] for p in profiles], dtype=float),
+        'peak_start': np.array([p['peak_hours'][0] for p in profiles], dtype=float),
+        'peak_end': np.array([p['peak_hours'][1] for p in profiles], dtype=float),
+        'noise': np.array([p['noise'] for p in profiles], dtype=float),
+        'weekend_factor': np.array(weekend_factor, dtype=float),
+    }
+
+
+def _consumption_grid(hours: np.ndarray, day_of_week: np.ndarray, zones: list[str],
+                      rng: np.random.Generator) -> np.ndarray:
+    """
+    Generate realistic consumption for every (timestep, zone) pair.
+
+    ``hours`` and ``day_of_week`` are 1-D arrays of length T; the result has
+    shape (T, len(zones)). Full-size temporaries are updated in place, so at
+    most three (T, zones) arrays are alive at once.
+    """
+    p = _profile_arrays(zones)
+    hour = hours.astype(float)[:, None]
+    weekend = (day_of_week >= 5)[:, None]
+    shape = (len(hours), len(zones))
+
+    # Bell curve within peak hours, random idle load outside them
+    mid = (p['peak_start'] + p['peak_end']) / 2
+    spread = (p['peak_end'] - p['peak_start']) / 2
+    peak_value = (hour - mid) / spread
+    np.square(peak_value, out=peak_value)
+    peak_value *= -0.5
+    np.exp(peak_value, out=peak_value)
+    peak_value *= p['base'] * p['peak_mult'] - p['base']
+    peak_value += p['base']
+
+    value = rng.random(shape)       # off-peak load
+    value *= 0.2
+    value += 0.3
+    value *= p['base']
+
+    in_peak = (hour >= p['peak_start']) & (hour <= p['peak_end'])
+    np.copyto(value, peak_value, where=in_peak)
+    del peak_value
+
+    # Weekend reduction for labs and main building, increase for hostels
+    np.multiply(value, p['weekend_factor'], out=value, where=weekend)
 
     # Add noise
-    noise = np.random.normal(0, profile['noise'] * value)
-    return max(0.1, value + noise)
-
-
-def generate_historical_data(days: int = 90) -> pd.DataFrame:
-    """Generate historical consumption data for all zones."""
-    rows = []
-    start = datetime.now() - timedelta(days=days)
-
-    for day_offset in range(days):
-        current_date = start + timedelta(days=day_offset)
-        day_of_week = current_date.weekday()
-
-        for hour in range(24):
-            for zone in ZONES:
-                energy = _hourly_consumption(zone, hour, day_of_week)
-                water = energy * 0.02 * (1 + 0.3 * np.random.random())  # roughly correlated
-
-                rows.append({
-                    'timestamp': current_date.replace(hour=hour, minute=0),
-                    'zone': zone,
-                    'hour': hour,
-                    'day_of_week': day_of_week,
-                    'energy_kwh': round(energy, 2),
-                    'water_kl': round(water, 3),
-                    'is_weekend': day_of_week >= 5,
-                    'month': current_date.month,
-                })
+    noise = rng.normal(0.0, 1.0, shape)
+    noise *= p['noise'] * value
+    value += noise
+    return np.maximum(value, 0.1, out=value)
 
-    # Inject some anomalies (~2% of data points)
-    df = pd.DataFrame(rows)
-    anomaly_mask = np.random.random(len(df)) < 0.02
-    df.loc[anomaly_mask, 'energy_kwh'] *= np.random.uniform(2.0, 4.0, anomaly_mask.sum())
-    df['is_anomaly'] = anomaly_mask
 
-    return df
+def _hourly_consumption(zone: str, hour: int, day_of_week: int,
+                        rng: np.random.Generator | None = None) -> float:
+    """Generate realistic consumption for a given zone/hour/day."""
+    rng = rng if rng is not None else np.random.default_rng()
+    grid = _consumption_grid(np.array([hour]), np.array([day_of_week]), [zone], rng)
+    return float(grid[0, 0])
+
+
+def _water_from_energy(energy: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Water usage roughly correlated with energy usage."""
+    factor = rng.random(energy.shape)
+    factor *= 0.3
+    factor += 1
+    water = energy * 0.02
+    water *= factor
+    return water
+
+
+def _build_frame(epoch: np.ndarray, energy: np.ndarray, water: np.ndarray,
+                 zones: list[str], month: bool = False, **columns) -> pd.DataFrame:
+    """Flatten (T, zones) grids into the long row-per-reading layout."""
+    n_steps, n_zones = energy.shape
+    # Calendar columns are computed once per timestep, then repeated per zone
+    parts = calendar(epoch)
+    return reading_frame(
+        np.repeat(epoch, n_zones),
+        np.tile(np.arange(n_zones, dtype=np.int16 if n_zones < 2**15 else np.int32), n_steps),
+        zones,
+        hour=np.repeat(parts['hour'], n_zones),
+        day_of_week=np.repeat(parts['day_of_week'], n_zones),
+        **({'month': np.repeat(parts['month'], n_zones)} if month else {}),
+        energy_kwh=energy.ravel(),
+        water_kl=np.round(water.ravel(), 3, out=water.ravel()),
+        **columns,
+    )
+
+
+def generate_historical_data(days: int = 90, zones: list[str] | None = None,
+                             rng: np.random.Generator | None = None,
+                             end: datetime | None = None) -> pd.DataFrame:
+    """
+    Generate historical consumption data for all zones.
+
+    Rows are ordered by day, then hour, then zone. Pass ``rng`` (e.g.
+    ``np.random.default_rng(42)``) and ``end`` for a reproducible dataset.
+    """
+    zones = list(zones) if zones is not None else ZONES
+    rng = rng if rng is not None else np.random.default_rng()
+    end = end if end is not None else datetime.now()
+
+    start = (end - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    epoch = (np.datetime64(start, 's') + np.arange(days * 24) * 3600).astype(np.int64)
+    parts = calendar(epoch)
+
+    energy = _consumption_grid(parts['hour'], parts['day_of_week'], zones, rng)
+    water = _water_from_energy(energy, rng)
 
+    # Inject some anomalies (~2% of data points)
+    np.round(energy, 2, out=energy)
+    flat = energy.reshape(-1)
+    anomaly_mask = rng.random(flat.size) < 0.02
+    flat[anomaly_mask] *= rng.uniform(2.0, 4.0, anomaly_mask.sum())
 
-def generate_realtime_stream(hours: int = 72) -> pd.DataFrame:
-    """Generate recent realtime data for anomaly detection."""
-    rows = []
-    start = datetime.now() - timedelta(hours=hours)
+    return _build_frame(epoch, energy, water, zones, month=True, is_anomaly=anomaly_mask)
 
-    for h in range(hours):
-        ts = start + timedelta(hours=h)
-        day_of_week = ts.weekday()
 
-        for zone in ZONES:
-            energy = _hourly_consumption(zone, ts.hour, day_of_week)
-            water = energy * 0.02 * (1 + 0.3 * np.random.random())
+def generate_realtime_stream(hours: int = 72, zones: list[str] | None = None,
+                             rng: np.random.Generator | None = None,
+                             end: datetime | None = None) -> pd.DataFrame:
+    """Generate recent realtime data for anomaly detection."""
+    zones = list(zones) if zones is not None else ZONES
+    rng = rng if rng is not None else np.random.default_rng()
+    end = end if end is not None else datetime.now()
 
-            rows.append({
-                'timestamp': ts,
-                'zone': zone,
-                'hour': ts.hour,
-                'day_of_week': day_of_week,
-                'energy_kwh': round(energy, 2),
-                'water_kl': round(water, 3),
-            })
+    start = np.datetime64(end - timedelta(hours=hours), 's')
+    epoch = (start + np.arange(hours) * 3600).astype(np.int64)
+    parts = calendar(epoch)
 
-    df = pd.DataFrame(rows)
+    energy = _consumption_grid(parts['hour'], parts['day_of_week'], zones, rng)
+    water = _water_from_energy(energy, rng)
 
     # Inject 3-5 anomalies
-    n_anomalies = np.random.randint(3, 6)
-    anomaly_indices = np.random.choice(len(df), n_anomalies, replace=False)
-    df.loc[anomaly_indices, 'energy_kwh'] *= np.random.uniform(2.5, 5.0, n_anomalies)
+    np.round(energy, 2, out=energy)
+    flat = energy.reshape(-1)
+    n_anomalies = min(int(rng.integers(3, 6)), flat.size)
+    anomaly_indices = rng.choice(flat.size, n_anomalies, replace=False)
+    flat[anomaly_indices] *= rng.uniform(2.5, 5.0, n_anomalies)
 
-    return df
+    return _build_frame(epoch, energy, water, zones)
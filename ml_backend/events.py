@@ -0,0 +1,103 @@
+"""
+Fan-out of computed results to streaming dashboard clients.
+
+Producers (sensor ingestion, the periodic refresh in asgi.py) publish each
+result once; every subscribed client gets it through its own bounded queue.
+A client that stops reading loses its oldest queued events rather than
+holding memory or slowing producers, and is disconnected once it has
+dropped too many.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+
+
+class Subscriber:
+    def __init__(self, max_queue: int):
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.after_id = 0    # events up to this id were replayed on subscribe
+        self.connected_at = time.time()
+
+
+class EventBroker:
+    def __init__(self, max_queue: int = 100, max_dropped: int = 1000, max_clients: int = 100):
+        self.max_queue = max_queue
+        self.max_dropped = max_dropped
+        self.max_clients = max_clients
+        self._subscribers: set[Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ids = itertools.count(1)
+        self._latest: dict[str, dict] = {}   # last event per type, replayed to new clients
+        self._lock = threading.Lock()
+
+        self.published = 0
+        self.disconnected_slow = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the event loop that serves the streaming clients."""
+        self._loop = loop
+
+    def publish(self, event_type: str, data: dict):
+        """Queue an event for every client; safe to call from any thread."""
+        with self._lock:
+            event = {'id': next(self._ids), 'event': event_type, 'data': data}
+            self._latest[event_type] = event
+            self.published += 1
+
+        loop = self._loop
+        if loop is not None and self._subscribers and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, event)
+
+    def subscribe(self) -> Subscriber | None:
+        """Register a client (on the event loop); None if the client limit is reached."""
+        if len(self._subscribers) >= self.max_clients:
+            return None
+        subscriber = Subscriber(self.max_queue)
+        with self._lock:
+            snapshot = sorted(self._latest.values(), key=lambda e: e['id'])
+        for event in snapshot[-self.max_queue:]:
+            subscriber.queue.put_nowait(event)
+            subscriber.after_id = event['id']
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            'clients': len(self._subscribers),
+            'published': self.published,
+            'queued': sum(s.queue.qsize() for s in list(self._subscribers)),
+            'dropped': sum(s.dropped for s in list(self._subscribers)),
+            'disconnectedSlow': self.disconnected_slow,
+        }
+
+    def _fan_out(self, event: dict):
+        # Runs on the event loop thread
+        for subscriber in list(self._subscribers):
+            if event['id'] <= subscriber.after_id:
+                continue
+            if subscriber.queue.full():
+                subscriber.queue.get_nowait()
+                subscriber.dropped += 1
+                if subscriber.dropped > self.max_dropped:
+                    # Too slow to keep up: the stream handler sees None and closes
+                    self.unsubscribe(subscriber)
+                    self.disconnected_slow += 1
+                    subscriber.queue.put_nowait(None)
+                    continue
+            subscriber.queue.put_nowait(event)
+
+
+def format_sse(event: dict) -> bytes:
+    """Encode an event as a text/event-stream message."""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event['data'], separators=(',', ':'), default=str)}\n\n"
+    ).encode()
@@ -0,0 +1,91 @@
+"""
+Pre-forked serving with shared model memory.
+
+    gunicorn -c gunicorn.conf.py app:app                               # live ingestion, 1 worker
+    INGEST_ENABLED=false WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app:app
+
+The master imports app.py once (``preload_app``): the interpreter, the
+libraries and every loaded model — the IsolationForest trees and their
+compiled node arrays, the per-zone forecasters (warmed up to
+MODEL_ZONE_CACHE_MB before forking) and the KMeans centres — then freezes
+the heap (``gc.freeze()``) and forks the workers. Workers map those pages
+copy-on-write instead of each loading its own copy, and since the
+collector never writes to the frozen objects the pages stay shared;
+per-worker memory is what a worker allocates itself (responses, caches,
+its sensor store).
+
+onnxruntime sessions do not survive fork, so with INFERENCE_BACKEND=onnx
+each worker opens its own after forking.
+
+Each worker gets ``WORKER_THREADS`` threads for BLAS / OpenMP, onnxruntime
+and sklearn's ``n_jobs`` — by default the cores divided by the workers, so N
+workers do not each start a pool as wide as the machine. Set the worker
+count through WEB_CONCURRENCY (not ``-w``) so the budget is computed from it.
+
+Live state is per process: each worker has its own sensor store, online
+detector, response cache and snapshots. A reading posted to /api/ingest
+reaches one worker only, so the anomaly, recommendation and stream
+endpoints would answer differently depending on the worker. With live
+ingestion (the default) the server therefore runs a single worker —
+a larger WEB_CONCURRENCY is clamped to 1 with a warning — and
+WORKER_THREADS still parallelises inference. INGEST_ENABLED=false
+(model-only serving on generated or history data) allows several workers
+and defaults to 4. Use RATE_LIMIT_BACKEND=sqlite to share rate limits
+between workers.
+PRELOAD_MODELS=false loads the app in every worker instead (for comparison).
+"""
+
+import gc
+import os
+import sys
+
+INGEST_ENABLED = os.environ.get('INGEST_ENABLED', 'true').lower() == 'true'
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = max(1, int(os.environ.get('WEB_CONCURRENCY') or ('1' if INGEST_ENABLED else '4')))
+preload_app = os.environ.get('PRELOAD_MODELS', 'true').lower() == 'true'
+timeout = 120
+
+if workers > 1 and INGEST_ENABLED:
+    print(f"gunicorn.conf.py: WEB_CONCURRENCY={workers} ignored with INGEST_ENABLED=true (each worker would "
+          f"keep its own live sensor state); running 1 worker. Set INGEST_ENABLED=false for multi-worker "
+          f"serving.", file=sys.stderr)
+    workers = 1
+
+WORKER_THREADS = max(1, int(os.environ.get('WORKER_THREADS') or (os.cpu_count() or 1) // workers))
+
+# Read when numpy / onnxruntime start, i.e. in the master while it preloads
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'ORT_INTRA_OP_THREADS'):
+    os.environ.setdefault(_var, str(WORKER_THREADS))
+# Threads do not survive fork: app.py leaves the snapshot scheduler to post_fork
+os.environ['PREFORK_PRELOAD'] = str(preload_app).lower()
+
+
+def when_ready(server):
+    """Warm the per-zone registries and compiled forest, then freeze the heap so forked workers keep sharing it."""
+    if preload_app:
+        import app
+        for model in (app.forecaster, app.anomaly_detector):
+            if getattr(model, 'zone_registry', None) is not None:
+                model.zone_registry.warm()
+        if app.ACTIVE_BACKEND == 'sklearn':
+            app.anomaly_detector.compiled_forest()
+        gc.collect()
+        gc.freeze()
+        server.log.info(f"Preloaded models {app.MODEL_MANIFEST['version']}; "
+                        f"{workers} workers × {WORKER_THREADS} threads")
+
+
+def post_fork(server, worker):
+    """Apply the worker's thread budget, open its onnxruntime sessions and start its snapshot scheduler."""
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(WORKER_THREADS)
+
+    import app
+    model = getattr(app.anomaly_detector, 'model', None)
+    if model is not None:
+        model.set_params(n_jobs=WORKER_THREADS)
+    if preload_app and app.ACTIVE_BACKEND == 'onnx':
+        app.attach_onnx_engine(app._models, app.MODEL_MANIFEST)
+    if app.SNAPSHOT_INTERVAL:
+        app.snapshots.start()
@@ -0,0 +1,254 @@
+"""
+On-disk columnar history store.
+
+Hourly consumption history is kept append-only, partitioned per zone and
+month, with one fixed-width little-endian binary file per column::
+
+    <root>/
+        zones.json                      # zone name → directory
+        <zone>/<YYYY-MM>/timestamp.bin  # int64 epoch seconds
+        <zone>/<YYYY-MM>/energy_kwh.bin # float32
+        ...
+        <zone>/<YYYY-MM>/rows.json      # committed row count
+
+Zone directories are a readable slug plus a hash of the exact zone name, so
+names that slug alike ("Lab - Electronics", "Lab Electronics") never share
+one. An append writes every column and only then commits the partition's
+new row count; readers see committed rows only, and the next append first
+truncates whatever an interrupted one left behind. Partitions are searched
+by timestamp, so an append whose rows are unsorted or start before a
+partition's last stored hour is rejected.
+
+Columns open as read-only ``np.memmap`` arrays, so model training can read
+zero-copy slices of years of data without loading the whole history.
+Single writer; readers may open partitions at any time.
+
+Usage:
+    python history_store.py --root history --days 365 [--seed 42]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from models.schema import COLUMNS, calendar, epoch_seconds, reading_frame
+
+# Stored columns, in the dtypes of the in-memory frame layout (models/schema.py)
+HISTORY_COLUMNS = {
+    name: COLUMNS[name] for name in ('timestamp', 'hour', 'day_of_week', 'month', 'energy_kwh', 'water_kl')
+}
+
+_ZONES_FILE = 'zones.json'
+_ROWS_FILE = 'rows.json'
+
+
+def _zone_dir(zone: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '_', zone.lower()).strip('_')
+    return f"{slug}-{hashlib.sha1(zone.encode()).hexdigest()[:10]}"
+
+
+def _epoch_seconds(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000_000)
+
+
+class HistoryStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._zones = self._read_zones()
+
+    @property
+    def zones(self) -> list[str]:
+        return list(self._zones)
+
+    def append(self, df: pd.DataFrame):
+        """Append rows (generator layout) to their zone/month partitions."""
+        epoch = epoch_seconds(df['timestamp'].to_numpy())
+        month_key = np.datetime_as_string(epoch.astype('datetime64[s]'), unit='M')
+
+        columns = {
+            'timestamp': epoch,
+            'hour': df['hour'].to_numpy(),
+            'day_of_week': df['day_of_week'].to_numpy(),
+            'month': df['month'].to_numpy() if 'month' in df else calendar(epoch)['month'],
+            'energy_kwh': df['energy_kwh'].to_numpy(),
+            'water_kl': df['water_kl'].to_numpy() if 'water_kl' in df else np.full(len(df), np.nan),
+        }
+
+        groups = pd.DataFrame({'zone': df['zone'].to_numpy(), 'month': month_key}).groupby(['zone', 'month'], sort=False).indices
+        # Range reads binary-search each partition: refuse anything that would unsort one, before writing
+        for (zone, month), idx in groups.items():
+            ts = epoch[idx]
+            if np.any(ts[1:] < ts[:-1]):
+                raise ValueError(f"Rows for zone {zone!r} in {month} are not in timestamp order")
+            last = self._last_timestamp(zone, month)
+            if last is not None and ts[0] < last:
+                raise ValueError(f"Rows for zone {zone!r} in {month} start before its last stored hour "
+                                 f"({ts[0]} < {last}); history is append-only")
+
+        for (zone, month), idx in groups.items():
+            if zone not in self._zones:
+                directory = _zone_dir(zone)
+                if directory in self._zones.values():
+                    raise ValueError(f"Zone {zone!r} maps to directory {directory!r}, already used by another zone")
+                self._zones[zone] = directory
+                self._write_zones()
+
+            partition = os.path.join(self.root, self._zones[zone], month)
+            os.makedirs(partition, exist_ok=True)
+            rows = _committed_rows(partition)
+            for name, dtype in HISTORY_COLUMNS.items():
+                with open(os.path.join(partition, f'{name}.bin'), 'ab') as f:
+                    f.truncate(rows * dtype.itemsize)     # drop what an interrupted append left
+                    f.write(np.ascontiguousarray(columns[name][idx], dtype=dtype).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            _commit_rows(partition, rows + len(idx))
+
+    def _last_timestamp(self, zone: str, month: str):
+        """Last committed timestamp of a partition, or None if it holds no rows."""
+        if zone not in self._zones:
+            return None
+        timestamps = self.open_partition(zone, month)['timestamp']
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    def partitions(self, zone: str) -> list[str]:
+        """Month partitions of a zone, oldest first."""
+        if zone not in self._zones:
+            return []
+        zone_path = os.path.join(self.root, self._zones[zone])
+        if not os.path.isdir(zone_path):
+            return []
+        return sorted(d for d in os.listdir(zone_path) if re.fullmatch(r'\d{4}-\d{2}', d))
+
+    def open_partition(self, zone: str, month: str) -> dict[str, np.ndarray]:
+        """Memory-map every column of one zone/month partition (zero-copy, read-only)."""
+        partition = os.path.join(self.root, self._zones[zone], month)
+        rows = _committed_rows(partition)
+        columns = {}
+        for name, dtype in HISTORY_COLUMNS.items():
+            path = os.path.join(partition, f'{name}.bin')
+            columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype)
+        return columns
+
+    def zone_columns(self, zone: str, start=None, end=None) -> dict[str, np.ndarray]:
+        """
+        All columns of a zone for timestamps in [start, end).
+
+        A range inside one month is a zero-copy memmap slice; longer ranges
+        are concatenated per column (one zone at a time).
+        """
+        lo = _epoch_seconds(start) if start is not None else None
+        hi = _epoch_seconds(end) if end is not None else None
+        first_month = pd.Timestamp(lo, unit='s').strftime('%Y-%m') if lo is not None else None
+        last_month = pd.Timestamp(hi, unit='s').strftime('%Y-%m') if hi is not None else None
+
+        parts = []
+        for month in self.partitions(zone):
+            if (first_month and month < first_month) or (last_month and month > last_month):
+                continue
+            columns = self.open_partition(zone, month)
+            ts = columns['timestamp']
+            i = np.searchsorted(ts, lo, 'left') if lo is not None else 0
+            j = np.searchsorted(ts, hi, 'left') if hi is not None else len(ts)
+            if j > i:
+                parts.append({name: col[i:j] for name, col in columns.items()})
+
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {name: np.empty(0, dtype) for name, dtype in HISTORY_COLUMNS.items()}
+        return {name: np.concatenate([p[name] for p in parts]) for name in HISTORY_COLUMNS}
+
+    def window(self, start=None, end=None) -> 'HistoryView':
+        """A read-only view of the store restricted to [start, end)."""
+        return HistoryView(self, start, end)
+
+    def to_frame(self, zone: str, start=None, end=None) -> pd.DataFrame:
+        """Materialize one zone's range in the generator's DataFrame layout."""
+        columns = self.zone_columns(zone, start, end)
+        return reading_frame(
+            columns['timestamp'], np.zeros(len(columns['timestamp']), dtype=np.int8), [zone],
+            **{name: columns[name] for name in HISTORY_COLUMNS if name != 'timestamp'},
+        )
+
+    def __len__(self) -> int:
+        return sum(
+            _committed_rows(os.path.join(self.root, self._zones[zone], month))
+            for zone in self._zones for month in self.partitions(zone)
+        )
+
+    def _read_zones(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.root, _ZONES_FILE)) as f:
+                return json.load(f)['zones']
+        except FileNotFoundError:
+            return {}
+
+    def _write_zones(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f'.{_ZONES_FILE}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'zones': self._zones}, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, _ZONES_FILE))
+
+
+def _committed_rows(partition: str) -> int:
+    """Rows of a partition committed by a completed append."""
+    try:
+        with open(os.path.join(partition, _ROWS_FILE)) as f:
+            return json.load(f)['rows']
+    except FileNotFoundError:
+        return 0
+
+
+def _commit_rows(partition: str, rows: int):
+    tmp_path = os.path.join(partition, f'.{_ROWS_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'rows': rows}, f)
+    os.replace(tmp_path, os.path.join(partition, _ROWS_FILE))
+
+
+class HistoryView:
+    """Time-range view over a HistoryStore with the same read interface."""
+
+    def __init__(self, store: HistoryStore, start=None, end=None):
+        self.store = store
+        self.start = start
+        self.end = end
+
+    @property
+    def zones(self) -> list[str]:
+        return self.store.zones
+
+    def zone_columns(self, zone: str) -> dict[str, np.ndarray]:
+        return self.store.zone_columns(zone, self.start, self.end)
+
+    def __len__(self) -> int:
+        return sum(len(self.zone_columns(zone)['timestamp']) for zone in self.zones)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a columnar history store with synthetic data.')
+    parser.add_argument('--root', required=True, help='store directory')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    from data_generator import generate_historical_data
+
+    store = HistoryStore(args.root)
+    df = generate_historical_data(days=args.days, rng=np.random.default_rng(args.seed), end=datetime.now())
+    store.append(df)
+    print(f"  ✅ Appended {len(df)} rows for {df['zone'].nunique()} zones to {args.root}")
+
+
+if __name__ == '__main__':
+    main()
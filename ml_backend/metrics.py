@@ -0,0 +1,103 @@
+"""
+Prometheus metrics for the API (``GET /api/metrics``, text format 0.0.4).
+
+Per-route request latency and counts are recorded by the app's request
+hooks into ``RequestMetrics``; model stage timings come from
+models/instrumentation.py. Everything is in process memory, so each worker
+process reports its own series — scrape every worker (or run one).
+No client library is needed: the exposition format is rendered here.
+"""
+
+import math
+import threading
+
+from models.instrumentation import Histogram
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._latency: dict = {}        # (route, method) → Histogram
+        self._requests: dict = {}       # (route, method, status) → count
+        self._rate_limited: dict = {}   # route → count
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status: int, seconds: float):
+        """Record one finished request."""
+        key = (route, method)
+        hist = self._latency.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._latency.setdefault(key, Histogram())
+        hist.observe(seconds)
+        with self._lock:
+            counter = (route, method, str(status))
+            self._requests[counter] = self._requests.get(counter, 0) + 1
+
+    def rate_limited(self, route: str):
+        with self._lock:
+            self._rate_limited[route] = self._rate_limited.get(route, 0) + 1
+
+    def families(self) -> list[dict]:
+        with self._lock:
+            latency = list(self._latency.items())
+            requests = list(self._requests.items())
+            rate_limited = list(self._rate_limited.items())
+        return [
+            histogram('ecowatch_http_request_duration_seconds', 'Request latency by route.',
+                      {(('route', r), ('method', m)): h.snapshot() for (r, m), h in sorted(latency)}),
+            counter('ecowatch_http_requests_total', 'Finished requests by route and status.',
+                    [({'route': r, 'method': m, 'status': s}, n) for (r, m, s), n in sorted(requests)]),
+            counter('ecowatch_rate_limited_total', 'Requests rejected by the rate limiter.',
+                    [({'route': r}, n) for r, n in sorted(rate_limited)]),
+        ]
+
+
+# ─── Metric families: {'name', 'type', 'help', 'samples': [(suffix, labels, value)]} ───
+def counter(name: str, help_text: str, samples: list[tuple[dict, float]]) -> dict:
+    return {'name': name, 'type': 'counter', 'help': help_text,
+            'samples': [('', labels, value) for labels, value in samples]}
+
+
+def gauge(name: str, help_text: str, samples: list[tuple[dict, float]]) -> dict:
+    return {'name': name, 'type': 'gauge', 'help': help_text,
+            'samples': [('', labels, value) for labels, value in samples]}
+
+
+def histogram(name: str, help_text: str, snapshots: dict) -> dict:
+    """``snapshots`` maps a tuple of (label, value) pairs to a Histogram.snapshot()."""
+    samples = []
+    for label_pairs, snap in snapshots.items():
+        labels = dict(label_pairs)
+        for bound, count in snap['buckets'].items():
+            samples.append(('_bucket', {**labels, 'le': _format_value(bound)}, count))
+        samples.append(('_sum', labels, snap['sum']))
+        samples.append(('_count', labels, snap['count']))
+    return {'name': name, 'type': 'histogram', 'help': help_text, 'samples': samples}
+
+
+def render(families: list[dict]) -> str:
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family['name']} {family['help']}")
+        lines.append(f"# TYPE {family['name']} {family['type']}")
+        for suffix, labels, value in family['samples']:
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{family['name']}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{family['name']}{suffix} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
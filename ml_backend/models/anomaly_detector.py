@@ -5,12 +5,33 @@ Detects unusual spikes/drops in energy & water consumption.
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
+
+from models.instrumentation import stage, timed
+from models.isolation_forest import CompiledForest, resolve_threads
+from models.schema import format_timestamps
+from models.zone_data import hourly_means, iter_zones
+
+SEVERITY_LEVELS = ('high', 'medium', 'low')
+# Scratch memory (MiB) for IsolationForest's chunked scoring during fit
+FIT_WORKING_MEMORY_MB = 64
 
 
 class AnomalyDetector:
+    # Fitted sklearn objects; everything else is plain per-zone state
+    _ESTIMATOR_ATTRS = ('model', 'scaler')
+    # Per-zone state, saved one file per zone and loadable lazily (see zone_registry.py)
+    zone_registry = None
+    _ZONE_ATTRS = {'_zone_stats': 'stats'}
+
+    # Optional inference engine (see models/inference.py); None → sklearn
+    engine = None
+    # Flat-array form of the fitted forest, built on first use (see isolation_forest.py)
+    _compiled = None
+
     def __init__(self, contamination: float = 0.05):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
         self.model = IsolationForest(
             contamination=contamination,
             n_estimators=200,
@@ -19,82 +40,230 @@ class AnomalyDetector:
         )
         self.scaler = StandardScaler()
         self._zone_stats: dict = {}
+        self._expected = None  # (zones × 24) lookup, see _expected_lookup
+
+    @timed('anomaly_detector', 'fit')
+    def fit(self, df):
+        """
+        Train on historical data to learn normal consumption patterns.
+        ``df`` is a DataFrame or a HistoryStore / HistoryView.
+        """
+        if isinstance(df, pd.DataFrame):
+            features = self._extract_features(df)
+        else:
+            features = np.concatenate([
+                self._feature_matrix(cols['hour'], cols['day_of_week'], cols['energy_kwh'])
+                for _, cols in iter_zones(df)
+            ])
+        # Scale in place, and bound sklearn's scratch space while it scores the
+        # training rows for the contamination threshold (by default all at once)
+        from sklearn import config_context
 
-    def fit(self, df: pd.DataFrame):
-        """Train on historical data to learn normal consumption patterns."""
-        features = self._extract_features(df)
-        scaled = self.scaler.fit_transform(features)
-        self.model.fit(scaled)
+        scaled = self.scaler.fit(features).transform(features, copy=False)
+        with config_context(working_memory=FIT_WORKING_MEMORY_MB):
+            self.model.fit(scaled)
+        self._compiled = None
 
         # Store per-zone statistics for deviation calculation
-        for zone in df['zone'].unique():
-            zone_data = df[df['zone'] == zone]
+        self._zone_stats = {}
+        for zone, cols in iter_zones(df):
+            energy = np.asarray(cols['energy_kwh'], dtype=np.float64)
             self._zone_stats[zone] = {
-                'mean': zone_data['energy_kwh'].mean(),
-                'std': zone_data['energy_kwh'].std(),
-                'hourly_means': zone_data.groupby('hour')['energy_kwh'].mean().to_dict(),
+                'mean': float(energy.mean()),
+                'std': float(energy.std(ddof=1)) if len(energy) > 1 else float('nan'),
+                'hourly_means': hourly_means(cols['hour'], energy),
             }
 
-        print(f"  ✅ AnomalyDetector trained on {len(df)} data points")
+        self._expected = None
 
-    def detect(self, df: pd.DataFrame, zone: str = 'all') -> dict:
-        """Detect anomalies in recent data."""
+        print(f"  ✅ AnomalyDetector trained on {len(features)} data points")
+
+    def detect(self, df: pd.DataFrame, zone: str = 'all', top_n: int = 20, columnar: bool = False) -> dict:
+        """
+        Detect anomalies in recent data.
+        With ``columnar`` the top anomalies are a dict of NumPy arrays instead of per-anomaly dicts.
+        """
         if zone != 'all':
-            df = df[df['zone'].str.contains(zone, case=False)]
+            df = df[(df['zone'] == zone).to_numpy()]   # categorical: compares codes, not strings
 
-        features = self._extract_features(df)
-        scaled = self.scaler.transform(features)
+        if df.empty:
+            return self._summarize(df, np.empty(0), np.empty(0), top_n, columnar)
+
+        with stage('anomaly_detector', 'features'):
+            features = self._extract_features(df)
+        with stage('anomaly_detector', 'inference'):
+            predictions, scores = self._score(features)
+        with stage('anomaly_detector', 'build'):
+            return self._summarize(df, predictions, scores, top_n, columnar)
+
+    def detect_batch(self, df: pd.DataFrame, windows: list[tuple], top_n: int = 20,
+                     columnar: bool = False) -> list[dict]:
+        """
+        Detect anomalies in many (zone, start, end) windows of ``df`` with one model call.
+        ``start`` / ``end`` are epoch seconds (end exclusive; None leaves that side open)
+        and ``zone`` may be 'all'. Returns one report per window, as ``detect`` builds them.
+        """
+        timestamps = df['timestamp'].to_numpy()
+        codes = df['zone'].cat.codes.to_numpy()
+        categories = list(df['zone'].cat.categories)
+
+        # Rows of every window, concatenated in window order
+        with stage('anomaly_detector', 'features'):
+            selected = []
+            for zone, start, end in windows:
+                mask = np.ones(len(df), dtype=bool)
+                if zone != 'all':
+                    mask &= codes == (categories.index(zone) if zone in categories else -2)
+                if start is not None:
+                    mask &= timestamps >= start
+                if end is not None:
+                    mask &= timestamps < end
+                selected.append(np.flatnonzero(mask))
+            rows = np.concatenate(selected) if selected else np.empty(0, dtype=np.intp)
+            features = self._feature_matrix(df['hour'].to_numpy()[rows], df['day_of_week'].to_numpy()[rows],
+                                            df['energy_kwh'].to_numpy()[rows])
+
+        with stage('anomaly_detector', 'inference'):
+            predictions, scores = self._score(features) if len(rows) else (np.empty(0), np.empty(0))
+
+        with stage('anomaly_detector', 'build'):
+            bounds = np.cumsum([0] + [len(idx) for idx in selected])
+            return [self._summarize(df.iloc[idx], predictions[a:b], scores[a:b], top_n, columnar)
+                    for idx, a, b in zip(selected, bounds[:-1], bounds[1:])]
+
+    def _summarize(self, df: pd.DataFrame, predictions: np.ndarray, scores: np.ndarray,
+                   top_n: int = 20, columnar: bool = False) -> dict:
+        """Build the anomaly report; only the top N anomalies are materialized."""
+        idx = np.flatnonzero(np.asarray(predictions) == -1)
+        zones = df['zone'].to_numpy()[idx]
+        hours = df['hour'].to_numpy()[idx].astype(np.intp)
+        actual = df['energy_kwh'].to_numpy(dtype=float)[idx]
+        anomaly_scores = np.asarray(scores, dtype=float)[idx]
+
+        # Expected value: zone's hourly mean, else zone mean, else the reading itself
+        table, zone_names = self._expected_lookup()
+        codes = pd.Categorical(zones, categories=zone_names).codes
+        expected = np.where(codes >= 0, table[codes, hours], actual) if len(table) else actual
 
-        predictions = self.model.predict(scaled)
-        scores = self.model.decision_function(scaled)
-
-        anomalies = []
-        for i, (pred, score) in enumerate(zip(predictions, scores)):
-            if pred == -1:  # anomaly
-                row = df.iloc[i]
-                zone_name = row['zone']
-                stats = self._zone_stats.get(zone_name, {})
-                expected = stats.get('hourly_means', {}).get(int(row['hour']), stats.get('mean', row['energy_kwh']))
-
-                deviation = ((row['energy_kwh'] - expected) / max(expected, 0.1)) * 100
-                severity = 'high' if abs(deviation) > 100 else 'medium' if abs(deviation) > 50 else 'low'
-
-                anomalies.append({
-                    'zone': zone_name,
-                    'hour': int(row['hour']),
-                    'timestamp': str(row['timestamp']),
-                    'actual': round(float(row['energy_kwh']), 2),
-                    'expected': round(float(expected), 2),
-                    'deviation': round(float(deviation), 1),
-                    'severity': severity,
-                    'confidence': round(float(min(1.0, abs(score) * 2)), 2),
-                    'anomalyScore': round(float(score), 4),
-                    'estimatedWaste': round(max(0, float(row['energy_kwh'] - expected)) * 8, 0),
-                    'type': 'spike' if deviation > 0 else 'drop',
-                })
+        deviation, severity, waste = self._deviation(actual, expected)
 
         # Sort by severity and deviation
-        severity_order = {'high': 0, 'medium': 1, 'low': 2}
-        anomalies.sort(key=lambda x: (severity_order[x['severity']], -abs(x['deviation'])))
+        top = self._top_anomalies(severity, np.abs(deviation), top_n)
+        timestamps = format_timestamps(df['timestamp'].to_numpy()[idx[top]])
 
+        if columnar:
+            anomalies = {
+                'zone': zones[top],
+                'hour': hours[top],
+                'timestamp': timestamps,
+                'actual': np.round(actual[top], 2),
+                'expected': np.round(expected[top], 2),
+                'deviation': deviation[top],
+                'severity': np.asarray(SEVERITY_LEVELS)[severity[top]],
+                'confidence': np.round(np.minimum(1.0, np.abs(anomaly_scores[top]) * 2), 2),
+                'anomalyScore': np.round(anomaly_scores[top], 4),
+                'estimatedWaste': waste[top],
+                'type': np.where(deviation[top] > 0, 'spike', 'drop'),
+            }
+        else:
+            anomalies = [{
+                'zone': zones[i],
+                'hour': int(hours[i]),
+                'timestamp': ts,
+                'actual': round(float(actual[i]), 2),
+                'expected': round(float(expected[i]), 2),
+                'deviation': float(deviation[i]),
+                'severity': SEVERITY_LEVELS[severity[i]],
+                'confidence': round(float(min(1.0, abs(anomaly_scores[i]) * 2)), 2),
+                'anomalyScore': round(float(anomaly_scores[i]), 4),
+                'estimatedWaste': float(waste[i]),
+                'type': 'spike' if deviation[i] > 0 else 'drop',
+            } for i, ts in zip(top, timestamps.tolist())]
+
+        counts = np.bincount(severity, minlength=3)
         return {
             'totalDataPoints': len(df),
-            'anomalyCount': len(anomalies),
-            'anomalyRate': round(len(anomalies) / max(len(df), 1) * 100, 1),
-            'anomalies': anomalies[:20],  # top 20
+            'anomalyCount': len(idx),
+            'anomalyRate': round(len(idx) / max(len(df), 1) * 100, 1),
+            'anomalies': anomalies,  # top N
+            'inferenceBackend': self.engine.name if self.engine is not None else 'sklearn',
             'summary': {
-                'highCount': sum(1 for a in anomalies if a['severity'] == 'high'),
-                'mediumCount': sum(1 for a in anomalies if a['severity'] == 'medium'),
-                'lowCount': sum(1 for a in anomalies if a['severity'] == 'low'),
-                'totalEstimatedWaste': round(sum(a['estimatedWaste'] for a in anomalies), 0),
+                'highCount': int(counts[0]),
+                'mediumCount': int(counts[1]),
+                'lowCount': int(counts[2]),
+                'totalEstimatedWaste': round(float(waste.sum()), 0),
             }
         }
 
-    def _extract_features(self, df: pd.DataFrame) -> np.ndarray:
-        """Extract features for the model."""
-        features = df[['hour', 'day_of_week', 'energy_kwh']].copy()
-        features['hour_sin'] = np.sin(2 * np.pi * features['hour'] / 24)
-        features['hour_cos'] = np.cos(2 * np.pi * features['hour'] / 24)
-        features['is_weekend'] = (features['day_of_week'] >= 5).astype(int)
+    @staticmethod
+    def _deviation(actual: np.ndarray, expected: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(deviation %, severity index into SEVERITY_LEVELS, estimated waste) per reading."""
+        deviation = ((actual - expected) / np.maximum(expected, 0.1)) * 100
+        abs_deviation = np.abs(deviation)
+        severity = np.where(abs_deviation > 100, 0, np.where(abs_deviation > 50, 1, 2))
+        waste = np.round(np.maximum(0, actual - expected) * 8, 0)
+        return np.round(deviation, 1), severity, waste
+
+    @staticmethod
+    def _top_anomalies(severity: np.ndarray, abs_deviation: np.ndarray, n: int) -> np.ndarray:
+        """Indices of the n most severe anomalies (severity, then |deviation| desc; ties keep input order)."""
+        # One sortable key: severity bands never overlap, larger deviation sorts first
+        key = severity * (abs_deviation.max(initial=0.0) + 1) - abs_deviation
+        if len(key) > n:
+            kth = np.partition(key, n - 1)[n - 1]
+            candidates = np.flatnonzero(key <= kth)
+        else:
+            candidates = np.arange(len(key))
+
+        return candidates[np.lexsort((candidates, key[candidates]))][:n]
+
+    def _expected_lookup(self) -> tuple[np.ndarray, list]:
+        """(zones × 24) table of expected consumption, built once from _zone_stats."""
+        if getattr(self, '_expected', None) is None:
+            zone_names = list(self._zone_stats)
+            table = np.empty((len(zone_names), 24))
+            for i, zone in enumerate(zone_names):
+                stats = self._zone_stats[zone]
+                hourly = stats.get('hourly_means', {})
+                table[i] = [hourly.get(h, stats['mean']) for h in range(24)]
+            self._expected = (table, zone_names)
+
+        return self._expected
 
-        return features[['hour_sin', 'hour_cos', 'is_weekend', 'energy_kwh']].values
+    def _score(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (labels, decision scores); labels are -1 for anomalies."""
+        if self.engine is not None:
+            return self.engine.score_anomalies(features)
+
+        scaled = self.scaler.transform(features)
+        return self.compiled_forest().score(scaled, threads=resolve_threads(self.model.n_jobs))
+
+    def compiled_forest(self) -> CompiledForest:
+        """The fitted IsolationForest compiled to flat node arrays (labels and scores match sklearn exactly)."""
+        if self._compiled is None:
+            self._compiled = CompiledForest(self.model)
+        return self._compiled
+
+    def __getstate__(self):
+        self._expected_lookup()   # saved with the state: serving never needs the per-zone stats
+        state = self.__dict__.copy()
+        state.pop('engine', None)
+        state.pop('zone_registry', None)
+        state.pop('_compiled', None)
+        return state
+
+    def _feature_matrix(self, hours: np.ndarray, dows: np.ndarray, energy: np.ndarray) -> np.ndarray:
+        """Build the (n, 4) feature matrix from column arrays, computing each column in place."""
+        X = np.empty((len(hours), 4))
+        angle = np.multiply(hours, 2 * np.pi, out=X[:, 0])
+        np.divide(angle, 24, out=angle)
+        np.cos(angle, out=X[:, 1])
+        np.sin(angle, out=X[:, 0])
+        np.greater_equal(dows, 5, out=X[:, 2])
+        X[:, 3] = energy
+        return X
+
+    def _extract_features(self, df: pd.DataFrame) -> np.ndarray:
+        """Extract features for the model (straight from the frame's column arrays)."""
+        return self._feature_matrix(df['hour'].to_numpy(), df['day_of_week'].to_numpy(),
+                                    df['energy_kwh'].to_numpy())
@@ -0,0 +1,251 @@
+"""
+Versioned artifact store for fitted models.
+Persists trained models together with their per-zone statistics so the API
+can start warm instead of re-training at import.
+
+Layout::
+
+    <root>/
+        LATEST                          # name of the newest version
+        <version>/
+            manifest.json               # version, training params, zones, library versions
+            <model>.state.joblib        # per-zone stats, mappings (no sklearn objects)
+            <model>.estimators.joblib   # fitted sklearn estimators
+            zones/<model>/<n>.joblib    # per-zone state (models with _ZONE_ATTRS), one file per zone
+            zones/<model>/<n>.estimators.joblib  # per-zone sklearn estimators, loaded only with estimators
+            onnx/                       # optional ONNX exports (train.py --onnx)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+
+from models.anomaly_detector import AnomalyDetector
+from models.forecaster import ConsumptionForecaster
+from models.pattern_classifier import PatternClassifier
+from models.zone_registry import ZoneFieldMap, ZoneRegistry
+
+DEFAULT_ARTIFACT_DIR = os.environ.get(
+    'MODEL_ARTIFACT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'artifacts'),
+)
+
+MODEL_CLASSES = {
+    'anomaly_detector': AnomalyDetector,
+    'forecaster': ConsumptionForecaster,
+    'pattern_classifier': PatternClassifier,
+}
+
+_LATEST = 'LATEST'
+_MANIFEST = 'manifest.json'
+
+
+def _split_state(obj) -> tuple[dict, dict, dict, dict]:
+    """
+    Split a model's attributes into plain state, sklearn estimators and per-zone
+    records: plain ones and those holding estimators (e.g. each zone's pipeline).
+    """
+    state = dict(obj.__getstate__())
+    zone_attrs = {attr: state.pop(attr) for attr in getattr(obj, '_ZONE_ATTRS', {}) if attr in state}
+    estimators = {k: state.pop(k) for k in obj._ESTIMATOR_ATTRS if k in state}
+
+    records: dict = {}
+    estimator_records: dict = {}
+    for attr, values in zone_attrs.items():
+        target = estimator_records if attr in obj._ESTIMATOR_ATTRS else records
+        for zone, value in values.items():
+            target.setdefault(zone, {})[obj._ZONE_ATTRS[attr]] = value
+    return state, estimators, records, estimator_records
+
+
+def _restore(cls, state: dict):
+    """Rebuild a model instance from saved attributes without re-running __init__."""
+    obj = cls.__new__(cls)
+    if hasattr(obj, '__setstate__'):
+        obj.__setstate__(state)
+    else:
+        obj.__dict__.update(state)
+    return obj
+
+
+class ArtifactStore:
+    def __init__(self, root: str | None = None):
+        self.root = root or DEFAULT_ARTIFACT_DIR
+
+    def save(self, models: dict, metadata: dict | None = None, exporters=()) -> str:
+        """
+        Persist fitted models as a new version and mark it as latest.
+
+        Each exporter is called as ``exporter(models, version_dir)`` before the
+        version is published and returns extra manifest entries.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        version = self._new_version()
+        tmp_dir = tempfile.mkdtemp(prefix=f'.{version}-', dir=self.root)
+        os.chmod(tmp_dir, 0o755)
+
+        try:
+            files = {}
+            zone_files = {}
+            zone_estimator_files = {}
+            for name, obj in models.items():
+                state, estimators, records, estimator_records = _split_state(obj)
+                state_file = f'{name}.state.joblib'
+                estimators_file = f'{name}.estimators.joblib'
+                joblib.dump(state, os.path.join(tmp_dir, state_file))
+                joblib.dump(estimators, os.path.join(tmp_dir, estimators_file))
+                files[name] = {'state': state_file, 'estimators': estimators_file}
+                if hasattr(obj, '_ZONE_ATTRS'):
+                    zone_files[name], zone_estimator_files[name] = self._save_zones(
+                        tmp_dir, name, records, estimator_records)
+
+            manifest = {
+                'version': version,
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'models': files,
+                'zone_files': zone_files,
+                'zone_estimator_files': zone_estimator_files,
+                'libraries': self._library_versions(),
+                **(metadata or {}),
+            }
+            for exporter in exporters:
+                manifest.update(exporter(models, tmp_dir))
+            with open(os.path.join(tmp_dir, _MANIFEST), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            os.replace(tmp_dir, os.path.join(self.root, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self._write_latest(version)
+        return version
+
+    def load(self, version: str | None = None, estimators: bool = True,
+             lazy_zones: bool = False, zone_budget_bytes: int = 256 * 2**20) -> tuple[dict, dict]:
+        """
+        Load every model of a version (default: latest).
+
+        With ``estimators=False`` only the plain (per-zone) state is restored,
+        which does not require unpickling any sklearn objects: per-zone
+        estimators live in their own files and are not read, and estimator
+        attributes are left empty for the inference engine to serve. With
+        ``lazy_zones`` per-zone state is read on first use through a
+        ZoneRegistry bounded by ``zone_budget_bytes`` (per model); otherwise
+        every zone is loaded up front.
+        Raises FileNotFoundError if no artifacts exist.
+        """
+        manifest = self.manifest(version)
+        version_dir = self.version_dir(manifest['version'])
+
+        models = {}
+        for name, files in manifest['models'].items():
+            state = joblib.load(os.path.join(version_dir, files['state']))
+            if estimators:
+                state.update(joblib.load(os.path.join(version_dir, files['estimators'])))
+            obj = _restore(MODEL_CLASSES[name], state)
+
+            zone_files = manifest['zone_files'].get(name)
+            if zone_files is not None:
+                estimator_files = manifest['zone_estimator_files'][name] if estimators else {}
+                registry = self._zone_registry(version_dir, zone_files, estimator_files, zone_budget_bytes)
+                for attr, field in obj._ZONE_ATTRS.items():
+                    if not estimators and attr in obj._ESTIMATOR_ATTRS:
+                        setattr(obj, attr, {})
+                    elif lazy_zones:
+                        setattr(obj, attr, ZoneFieldMap(registry, field))
+                    else:
+                        setattr(obj, attr, {zone: registry.get(zone)[field] for zone in zone_files})
+                if lazy_zones:
+                    obj.zone_registry = registry
+            models[name] = obj
+
+        return models, manifest
+
+    def version_dir(self, version: str) -> str:
+        """Directory holding a version's files."""
+        return os.path.join(self.root, version)
+
+    def manifest(self, version: str | None = None) -> dict:
+        """Read the manifest of a version (default: latest)."""
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f'No model artifacts in {self.root}')
+
+        path = os.path.join(self.root, version, _MANIFEST)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'Model artifact version not found: {version}')
+        with open(path) as f:
+            return json.load(f)
+
+    def latest_version(self) -> str | None:
+        """Return the newest saved version, or None if the store is empty."""
+        try:
+            with open(os.path.join(self.root, _LATEST)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self) -> list[str]:
+        """Return all saved versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            d for d in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, d, _MANIFEST))
+        )
+
+    @staticmethod
+    def _save_zones(version_dir: str, name: str, records: dict, estimator_records: dict) -> tuple[dict, dict]:
+        """
+        Write one plain file per zone, plus one estimator file per zone that has estimators;
+        returns ({zone: path}, {zone: estimator path}), relative to the version directory.
+        """
+        os.makedirs(os.path.join(version_dir, 'zones', name))
+        paths, estimator_paths = {}, {}
+        for i, zone in enumerate(dict.fromkeys([*records, *estimator_records])):
+            paths[zone] = os.path.join('zones', name, f'{i:05d}.joblib')
+            joblib.dump(records.get(zone, {}), os.path.join(version_dir, paths[zone]))
+            if zone in estimator_records:
+                estimator_paths[zone] = os.path.join('zones', name, f'{i:05d}.estimators.joblib')
+                joblib.dump(estimator_records[zone], os.path.join(version_dir, estimator_paths[zone]))
+        return paths, estimator_paths
+
+    @staticmethod
+    def _zone_registry(version_dir: str, zone_files: dict, estimator_files: dict, budget_bytes: int) -> ZoneRegistry:
+        def load(zone):
+            # File sizes approximate the in-memory size
+            path = os.path.join(version_dir, zone_files[zone])
+            record, size = joblib.load(path), os.path.getsize(path)
+            if zone in estimator_files:
+                path = os.path.join(version_dir, estimator_files[zone])
+                record = {**record, **joblib.load(path)}
+                size += os.path.getsize(path)
+            return record, size
+        return ZoneRegistry(load, zone_files, budget_bytes)
+
+    def _new_version(self) -> str:
+        version = datetime.now(timezone.utc).strftime('v%Y%m%d-%H%M%S')
+        existing = set(self.list_versions())
+        suffix = 1
+        candidate = version
+        while candidate in existing:
+            suffix += 1
+            candidate = f'{version}-{suffix}'
+        return candidate
+
+    def _write_latest(self, version: str):
+        tmp_path = os.path.join(self.root, f'.{_LATEST}.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, _LATEST))
+
+    @staticmethod
+    def _library_versions() -> dict:
+        import numpy
+        import sklearn
+        return {'numpy': numpy.__version__, 'scikit-learn': sklearn.__version__}
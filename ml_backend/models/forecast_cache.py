@@ -0,0 +1,90 @@
+"""
+Bounded LRU cache for forecast results.
+Entries expire at the end of the local hour they were computed in, since
+a forecast only changes when the hour rolls over or the models are refit.
+Hours are local wall-clock hours (the forecast horizon starts at the local
+hour), so with a +05:30 offset they roll over at :00 local time, not :30.
+The offset is looked up per timestamp, so buckets stay aligned across DST
+changes; pass ``utc_offset_s`` to pin a fixed offset instead.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ForecastCache:
+    def __init__(self, max_size: int = 256, utc_offset_s: int | None = None):
+        self.max_size = max_size
+        # Fixed local time offset from UTC, as in SensorStore; None follows this host's time zone
+        self.utc_offset_s = utc_offset_s
+        self._entries: OrderedDict = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def utc_offset(self, ts: float) -> int:
+        """Local time offset from UTC in effect at epoch seconds ``ts``."""
+        return time.localtime(ts).tm_gmtoff if self.utc_offset_s is None else self.utc_offset_s
+
+    def hour_bucket(self, now: float | None = None) -> int:
+        """Local hour (hours since the local epoch) the given (or current) time falls in."""
+        now = time.time() if now is None else now
+        return int((now + self.utc_offset(now)) // 3600)
+
+    def hour_end(self, now: float | None = None) -> float:
+        """Epoch seconds at which the local hour containing the given (or current) time ends."""
+        now = time.time() if now is None else now
+        return now - (now + self.utc_offset(now)) % 3600 + 3600
+
+    def get(self, key, now: float | None = None):
+        """Return the cached value for key, or None on a miss or expiry."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, expires_at: float):
+        """Store a value until expires_at (epoch seconds), evicting the LRU entry if full."""
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (called when the models are refit)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxSize': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -3,94 +3,236 @@ Consumption Forecaster using Ridge Regression with polynomial features.
 Predicts future energy/water usage by zone.
 """
 
+import time
+from functools import partial
+
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import Ridge
-from sklearn.preprocessing import PolynomialFeatures, StandardScaler
-from sklearn.pipeline import Pipeline
+
+from models.forecast_cache import ForecastCache
+from models.instrumentation import stage, timed
+from models.zone_data import hourly_means, iter_zones, map_zones
 
 
 class ConsumptionForecaster:
+    # Fitted sklearn objects; everything else is plain per-zone state
+    _ESTIMATOR_ATTRS = ('_models',)
+    # Per-zone state, saved one file per zone and loadable lazily (see zone_registry.py)
+    zone_registry = None
+    _ZONE_ATTRS = {'_models': 'model', '_baselines': 'baselines', '_stats': 'stats'}
+
+    # Optional inference engine (see models/inference.py); None → sklearn
+    engine = None
+
+    DEGREE = 3
+    ALPHA = 1.0
+
     def __init__(self):
         self._models: dict = {}       # per-zone models
         self._baselines: dict = {}    # per-zone hourly baselines
+        self._stats: dict = {}        # per-zone sufficient statistics for partial_fit
+        self.cache = ForecastCache()
 
-    def fit(self, df: pd.DataFrame):
-        """Train a forecasting model for each zone."""
-        for zone in df['zone'].unique():
-            zone_df = df[df['zone'] == zone].copy()
-
-            # Features: hour, day_of_week, sine/cosine transforms
-            X = self._build_features(zone_df)
-            y = zone_df['energy_kwh'].values
-
-            pipeline = Pipeline([
-                ('poly', PolynomialFeatures(degree=3, include_bias=False)),
-                ('scaler', StandardScaler()),
-                ('ridge', Ridge(alpha=1.0)),
-            ])
-            pipeline.fit(X, y)
+    @timed('forecaster', 'fit')
+    def fit(self, df, workers: int | None = None):
+        """
+        Train a forecasting model for each zone (from a DataFrame or HistoryStore).
+        Zones are independent and are fitted on ``workers`` processes (default $TRAIN_WORKERS).
+        """
+        fitted = map_zones(partial(self._fit_zone, degree=self.DEGREE, alpha=self.ALPHA), df, workers)
+
+        self._stats = {}
+        for zone, (pipeline, baselines, stats) in fitted:
             self._models[zone] = pipeline
+            self._baselines[zone] = baselines
+            self._stats[zone] = stats
 
-            # Compute hourly baselines (rolling 30-day avg)
-            self._baselines[zone] = zone_df.groupby('hour')['energy_kwh'].mean().to_dict()
+        # Cached forecasts came from the previous models
+        self.cache.clear()
 
         print(f"  ✅ Forecaster trained for {len(self._models)} zones")
 
-    def predict(self, zone: str = 'campus', hours: int = 48, resource_type: str = 'energy') -> dict:
-        """Predict consumption for the next N hours."""
-        from datetime import datetime, timedelta
+    @staticmethod
+    def _fit_zone(cols: dict, degree: int, alpha: float) -> tuple:
+        """Fit one zone: (pipeline, hourly baselines, sufficient statistics)."""
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import PolynomialFeatures, StandardScaler
 
-        now = datetime.now()
-        predictions = []
+        # Features: hour, day_of_week, sine/cosine transforms
+        X = ConsumptionForecaster._feature_matrix(cols['hour'], cols['day_of_week'])
+        y = np.asarray(cols['energy_kwh'], dtype=np.float64)
 
-        # If zone is 'campus', aggregate
-        target_zones = list(self._models.keys()) if zone == 'campus' else [zone]
+        pipeline = Pipeline([
+            ('poly', PolynomialFeatures(degree=degree, include_bias=False)),
+            ('scaler', StandardScaler()),
+            ('ridge', Ridge(alpha=alpha)),
+        ])
+        pipeline.fit(X, y)
 
-        for h in range(hours):
-            future_time = now + timedelta(hours=h)
-            hour = future_time.hour
-            dow = future_time.weekday()
+        # Hourly baselines, plus sufficient statistics so later data can be folded in with partial_fit
+        stats = ConsumptionForecaster._accumulate(None, pipeline.named_steps['poly'].transform(X), y, cols['hour'])
+        return pipeline, hourly_means(cols['hour'], y), stats
 
-            total_predicted = 0
-            total_baseline = 0
+    @timed('forecaster', 'partial_fit')
+    def partial_fit(self, df):
+        """
+        Fold new data into each zone's model without revisiting old rows.
 
-            for z in target_zones:
-                model = self._models.get(z)
-                baseline_map = self._baselines.get(z, {})
+        Costs O(new rows): the polynomial-feature Gram matrix XᵀX, Xᵀy and
+        hourly sums are accumulated per zone, and the scaler + Ridge solution
+        is recomputed from them in closed form (same result as a full refit
+        on all rows seen so far, up to floating-point error).
+        """
+        from sklearn.preprocessing import PolynomialFeatures
+
+        poly = PolynomialFeatures(degree=self.DEGREE, include_bias=False).fit(np.zeros((1, 5)))
+        for zone, cols in iter_zones(df):
+            if zone in self._models and zone not in self._stats:
+                raise ValueError(f'No sufficient statistics for zone {zone!r}; run fit() on full history first')
+
+            X = self._feature_matrix(cols['hour'], cols['day_of_week'])
+            y = np.asarray(cols['energy_kwh'], dtype=np.float64)
+            stats = self._accumulate(self._stats.get(zone), poly.transform(X), y, cols['hour'])
+
+            self._stats[zone] = stats
+            self._models[zone] = self._solve(stats, poly)
+            counts = stats['hour_count']
+            self._baselines[zone] = {
+                int(h): float(stats['hour_sum'][h] / counts[h]) for h in np.flatnonzero(counts)
+            }
+
+        self.cache.clear()
+
+    @staticmethod
+    def _accumulate(stats: dict | None, P: np.ndarray, y: np.ndarray, hours: np.ndarray) -> dict:
+        """Add rows (polynomial features P, targets y) to a zone's sufficient statistics."""
+        if stats is None:
+            n_features = P.shape[1]
+            stats = {
+                'n': 0, 'y_sum': 0.0,
+                'p_sum': np.zeros(n_features), 'gram': np.zeros((n_features, n_features)),
+                'xty': np.zeros(n_features),
+                'hour_sum': np.zeros(24), 'hour_count': np.zeros(24, dtype=np.int64),
+            }
+        hours = np.asarray(hours, dtype=np.intp)
+        return {
+            'n': stats['n'] + len(y),
+            'y_sum': stats['y_sum'] + float(y.sum()),
+            'p_sum': stats['p_sum'] + P.sum(axis=0),
+            'gram': stats['gram'] + P.T @ P,
+            'xty': stats['xty'] + P.T @ y,
+            'hour_sum': stats['hour_sum'] + np.bincount(hours, weights=y, minlength=24),
+            'hour_count': stats['hour_count'] + np.bincount(hours, minlength=24),
+        }
+
+    def _solve(self, stats: dict, poly):
+        """Closed-form StandardScaler + Ridge fit from sufficient statistics, as a fitted Pipeline."""
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        n = stats['n']
+        mean = stats['p_sum'] / n
+        centered_gram = stats['gram'] - n * np.outer(mean, mean)
+        var = np.maximum(np.diag(centered_gram) / n, 0.0)
+        # Constant features keep unit scale, as in StandardScaler
+        scale = np.where(var <= 1e-12 * np.maximum(1.0, mean ** 2), 1.0, np.sqrt(var))
 
-                if model:
-                    features = self._build_single_feature(hour, dow)
-                    pred = float(model.predict(features)[0])
-                    pred = max(0.5, pred)  # floor at 0.5
+        # Scaled features are centered, so Ridge's intercept is just mean(y)
+        y_mean = stats['y_sum'] / n
+        A = centered_gram / np.outer(scale, scale) + self.ALPHA * np.eye(len(mean))
+        b = (stats['xty'] - mean * stats['y_sum']) / scale
+        coef = np.linalg.solve(A, b)
+
+        scaler = StandardScaler()
+        scaler.mean_, scaler.var_, scaler.scale_ = mean, var, scale
+        scaler.n_samples_seen_ = n
+        scaler.n_features_in_ = len(mean)
+
+        ridge = Ridge(alpha=self.ALPHA)
+        ridge.coef_, ridge.intercept_ = coef, y_mean
+        ridge.n_features_in_ = len(mean)
+
+        return Pipeline([('poly', poly), ('scaler', scaler), ('ridge', ridge)])
+
+    def predict(self, zone: str = 'campus', hours: int = 48, resource_type: str = 'energy',
+                columnar: bool = False) -> dict:
+        """
+        Predict consumption for the next N hours.
+
+        With ``columnar`` the predictions are a dict of NumPy arrays (one per
+        field) instead of a list of per-hour dicts (see serialization.py).
+        Results are cached per (zone, resource type, horizon, start hour) until
+        the hour rolls over or the models are refit; treat them as read-only.
+        """
+        now = time.time()
+        key = (zone, resource_type, hours, self.cache.hour_bucket(now), columnar)
+        result = self.cache.get(key, now)
+        if result is None:
+            result = self._predict(zone, hours, resource_type, columnar)
+            self.cache.put(key, result, expires_at=self.cache.hour_end(now))
+        return result
+
+    def _predict(self, zone: str, hours: int, resource_type: str, columnar: bool = False) -> dict:
+        """Compute a forecast (uncached)."""
+        from datetime import datetime
+
+        now = datetime.now()
+        future = np.datetime64(now, 'us') + np.arange(hours) * np.timedelta64(1, 'h')
+        hour = future.astype('datetime64[h]').astype(np.int64) % 24
+        dow = (future.astype('datetime64[D]').astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+
+        # One feature matrix for the whole horizon, one model call per zone
+        with stage('forecaster', 'features'):
+            X = self._feature_matrix(hour, dow)
+
+        # If zone is 'campus', aggregate
+        target_zones = self.zones if zone == 'campus' else [zone]
+        total_predicted = np.zeros(hours)
+        total_baseline = np.zeros(hours)
+
+        with stage('forecaster', 'inference'):
+            for z in target_zones:
+                zone_pred = self._predict_zone(z, X)
+                if zone_pred is not None:
+                    pred = np.maximum(0.5, zone_pred)  # floor at 0.5
                 else:
-                    pred = 10.0  # fallback
+                    pred = np.full(hours, 10.0)  # fallback
 
-                baseline = baseline_map.get(hour, pred)
+                baseline_map = self._baselines.get(z, {})
+                baseline_by_hour = np.array([baseline_map.get(h, np.nan) for h in range(24)])[hour]
                 total_predicted += pred
-                total_baseline += baseline
+                total_baseline += np.where(np.isnan(baseline_by_hour), pred, baseline_by_hour)
 
-            # Add slight randomness for realism
-            noise = 1 + np.random.normal(0, 0.03)
-            total_predicted *= noise
+        # Add slight randomness for realism
+        total_predicted *= 1 + np.random.normal(0, 0.03, hours)
 
-            if resource_type == 'water':
-                total_predicted *= 0.02
-                total_baseline *= 0.02
+        if resource_type == 'water':
+            total_predicted *= 0.02
+            total_baseline *= 0.02
 
-            predictions.append({
+        predicted = np.round(total_predicted, 2)
+        with stage('forecaster', 'build'):
+            columns = {
                 'hour': hour,
-                'timestamp': future_time.strftime('%Y-%m-%d %H:%M'),
-                'predicted': round(float(total_predicted), 2),
-                'baseline': round(float(total_baseline), 2),
-                'lowerBound': round(float(total_predicted * 0.85), 2),
-                'upperBound': round(float(total_predicted * 1.15), 2),
-            })
+                'timestamp': np.char.replace(np.datetime_as_string(future, unit='m'), 'T', ' '),
+                'predicted': predicted,
+                'baseline': np.round(total_baseline, 2),
+                'lowerBound': np.round(total_predicted * 0.85, 2),
+                'upperBound': np.round(total_predicted * 1.15, 2),
+            }
+            predictions = columns if columnar else [
+                dict(zip(columns, row)) for row in zip(*(col.tolist() for col in columns.values()))
+            ]
 
         # Determine trend
-        first_half = np.mean([p['predicted'] for p in predictions[:hours // 2]])
-        second_half = np.mean([p['predicted'] for p in predictions[hours // 2:]])
-        trend_pct = ((second_half - first_half) / max(first_half, 1)) * 100
+        if hours >= 2:
+            first_half = predicted[:hours // 2].mean()
+            second_half = predicted[hours // 2:].mean()
+            trend_pct = ((second_half - first_half) / max(first_half, 1)) * 100
+        else:
+            trend_pct = 0.0
 
         return {
             'zone': zone,
@@ -101,27 +243,45 @@ class ConsumptionForecaster:
             'trendPercent': round(float(trend_pct), 1),
             'confidence': round(0.72 + np.random.random() * 0.18, 2),
             'modelType': 'Ridge Regression (Poly-3)',
+            'inferenceBackend': self.engine.name if self.engine is not None else 'sklearn',
         }
 
+    @property
+    def zones(self) -> list[str]:
+        """Zones with a fitted model."""
+        return list(self._baselines.keys())
+
+    def _predict_zone(self, zone: str, X: np.ndarray) -> np.ndarray | None:
+        """Run one zone's model on a feature matrix; None if the zone is unknown."""
+        if self.engine is not None:
+            return self.engine.predict_zone(zone, X)
+
+        model = self._models.get(zone)
+        return model.predict(X) if model is not None else None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('engine', None)
+        state.pop('zone_registry', None)
+        state.pop('cache', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = ForecastCache()
+
     def _build_features(self, df: pd.DataFrame) -> np.ndarray:
         """Build feature matrix from dataframe."""
-        hours = df['hour'].values
-        dows = df['day_of_week'].values
-
-        return np.column_stack([
-            np.sin(2 * np.pi * hours / 24),
-            np.cos(2 * np.pi * hours / 24),
-            np.sin(2 * np.pi * dows / 7),
-            np.cos(2 * np.pi * dows / 7),
-            (dows >= 5).astype(float),
-        ])
+        return self._feature_matrix(df['hour'].to_numpy(), df['day_of_week'].to_numpy())
 
-    def _build_single_feature(self, hour: int, dow: int) -> np.ndarray:
-        """Build features for a single prediction."""
-        return np.array([[
-            np.sin(2 * np.pi * hour / 24),
-            np.cos(2 * np.pi * hour / 24),
-            np.sin(2 * np.pi * dow / 7),
-            np.cos(2 * np.pi * dow / 7),
-            float(dow >= 5),
-        ]])
+    @staticmethod
+    def _feature_matrix(hours: np.ndarray, dows: np.ndarray) -> np.ndarray:
+        """Build the (n, 5) feature matrix for arrays of hours and days of week, one column at a time in place."""
+        X = np.empty((len(hours), 5))
+        for angle_col, values, period in ((0, hours, 24), (2, dows, 7)):
+            angle = np.multiply(values, 2 * np.pi, out=X[:, angle_col])
+            np.divide(angle, period, out=angle)
+            np.cos(angle, out=X[:, angle_col + 1])
+            np.sin(angle, out=angle)
+        np.greater_equal(dows, 5, out=X[:, 4])
+        return X
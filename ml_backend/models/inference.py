@@ -0,0 +1,126 @@
+"""
+Pluggable inference engines for serving.
+
+By default the models run their fitted scikit-learn estimators in-process.
+Attaching an ``OnnxEngine`` (``model.engine = engine``) routes
+``AnomalyDetector.detect``, ``ConsumptionForecaster.predict`` and
+``PatternClassifier.classify`` through preloaded onnxruntime sessions instead, so the serving path never imports
+scikit-learn. The ONNX graphs are exported per artifact version by
+``train.py --onnx`` (see ``convert_to_onnx.export_onnx``).
+"""
+
+import os
+
+import numpy as np
+
+from models.zone_registry import ZoneRegistry
+
+INFERENCE_BACKENDS = ['sklearn', 'onnx']
+
+# Maximum tolerated sklearn ↔ ONNX differences (ONNX runs in float32)
+PARITY_TOLERANCE = {
+    'anomaly_label_agreement': 0.99,
+    'anomaly_score_max_abs_diff': 1e-4,
+    'forecast_max_abs_diff': 1e-3,
+}
+
+
+class OnnxEngine:
+    """onnxruntime sessions: the detector preloaded, per-zone forecasters opened on first use (LRU)."""
+
+    name = 'onnx'
+
+    def __init__(self, anomaly_model: str, forecaster_models: dict[str, str],
+                 intra_op_threads: int = 1, zone_budget_bytes: int = 256 * 2**20,
+                 pattern_model: str | None = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        def _open(path):
+            session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+            return session, session.get_inputs()[0].name
+
+        self.intra_op_threads = intra_op_threads
+        self._anomaly = _open(anomaly_model)
+        self._patterns = _open(pattern_model) if pattern_model else None
+        self.zone_registry = ZoneRegistry(
+            lambda zone: (_open(forecaster_models[zone]), os.path.getsize(forecaster_models[zone])),
+            forecaster_models, zone_budget_bytes,
+        )
+
+    @classmethod
+    def from_manifest(cls, version_dir: str, manifest: dict, intra_op_threads: int = 1,
+                      zone_budget_bytes: int = 256 * 2**20) -> 'OnnxEngine':
+        """Build an engine from the ONNX section of an artifact manifest."""
+        onnx_files = manifest.get('onnx')
+        if not onnx_files:
+            raise FileNotFoundError(
+                f"Artifact version {manifest.get('version')} has no ONNX models (train with --onnx)"
+            )
+
+        return cls(
+            anomaly_model=os.path.join(version_dir, onnx_files['anomaly_detector']),
+            forecaster_models={
+                zone: os.path.join(version_dir, path)
+                for zone, path in onnx_files['forecaster'].items()
+            },
+            intra_op_threads=intra_op_threads,
+            zone_budget_bytes=zone_budget_bytes,
+            pattern_model=os.path.join(version_dir, onnx_files['pattern_classifier'])
+            if onnx_files.get('pattern_classifier') else None,
+        )
+
+    def score_anomalies(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (labels, decision scores) for raw detector features."""
+        session, input_name = self._anomaly
+        labels, scores = session.run(None, {input_name: np.asarray(features, dtype=np.float32)})
+        return labels.ravel(), scores.ravel().astype(np.float64)
+
+    def predict_patterns(self, features: np.ndarray) -> np.ndarray:
+        """KMeans cluster IDs for raw zone features (scaler + KMeans graph)."""
+        if self._patterns is None:
+            raise FileNotFoundError('Artifact has no ONNX pattern classifier')
+        session, input_name = self._patterns
+        return session.run(None, {input_name: np.asarray(features, dtype=np.float32)})[0].ravel()
+
+    def predict_zone(self, zone: str, X: np.ndarray) -> np.ndarray | None:
+        """Run one zone's forecaster; None if the zone has no exported model."""
+        entry = self.zone_registry.get(zone)
+        if entry is None:
+            return None
+
+        session, input_name = entry
+        return session.run(None, {input_name: np.asarray(X, dtype=np.float32)})[0].ravel().astype(np.float64)
+
+
+def check_parity(detector, forecaster, engine, df) -> dict:
+    """
+    Compare an engine's outputs with the fitted sklearn estimators on ``df``.
+    Returns the measured differences and whether they are within PARITY_TOLERANCE.
+    """
+    features = detector._extract_features(df)
+    scaled = detector.scaler.transform(features)
+    labels, scores = engine.score_anomalies(features)
+
+    forecast_diff = 0.0
+    for zone, model in forecaster._models.items():
+        X = forecaster._build_features(df)
+        forecast_diff = max(forecast_diff, float(np.max(np.abs(engine.predict_zone(zone, X) - model.predict(X)))))
+
+    report = {
+        'rows': len(df),
+        'anomaly_label_agreement': float(np.mean(labels == detector.model.predict(scaled))),
+        'anomaly_score_max_abs_diff': float(np.max(np.abs(scores - detector.model.decision_function(scaled)))),
+        'forecast_max_abs_diff': forecast_diff,
+    }
+    report['passed'] = (
+        report['anomaly_label_agreement'] >= PARITY_TOLERANCE['anomaly_label_agreement']
+        and report['anomaly_score_max_abs_diff'] <= PARITY_TOLERANCE['anomaly_score_max_abs_diff']
+        and report['forecast_max_abs_diff'] <= PARITY_TOLERANCE['forecast_max_abs_diff']
+    )
+    return report
@@ -0,0 +1,118 @@
+"""
+Lightweight timing hooks for the model hot paths.
+
+Models wrap each stage of work (feature extraction, inference, building the
+response) in ``with stage('anomaly_detector', 'features'):`` or decorate a
+whole method with ``@timed('forecaster', 'fit')``. Durations go into
+fixed-bucket, per-process histograms that /api/metrics exports; a stage
+costs about a microsecond, so the hooks stay on in production.
+"""
+
+import bisect
+import threading
+import time
+from functools import wraps
+
+# Seconds; spans sub-millisecond stages up to multi-minute training runs
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Histogram:
+    """Cumulative-on-read histogram: observe() bumps one bucket counter."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds: tuple = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        """Cumulative bucket counts keyed by upper bound (Prometheus ``le``), plus sum and count."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, running = {}, 0
+        for bound, n in zip(self.bounds + (float('inf'),), counts):
+            running += n
+            cumulative[bound] = running
+        return {'buckets': cumulative, 'sum': total, 'count': count}
+
+
+_histograms: dict = {}          # (model, stage) → Histogram
+_histograms_lock = threading.Lock()
+enabled = True
+
+
+def histogram(model: str, name: str) -> Histogram:
+    hist = _histograms.get((model, name))
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault((model, name), Histogram())
+    return hist
+
+
+class _Stage:
+    __slots__ = ('hist', 'start')
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(model: str, name: str):
+    """Context manager timing one stage of ``model``'s work."""
+    if not enabled:
+        return _NO_STAGE
+    return _Stage(histogram(model, name))
+
+
+def timed(model: str, name: str):
+    """Decorator timing every call of a method as one stage."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(model, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    """{(model, stage): histogram snapshot} for every stage seen so far."""
+    with _histograms_lock:
+        items = list(_histograms.items())
+    return {key: hist.snapshot() for key, hist in sorted(items)}
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,208 @@
+"""
+Streaming anomaly scoring on top of a fitted AnomalyDetector.
+
+The unit of scoring is the zone-hour aggregate the sensor store builds from
+the per-second readings, since that is what the model was trained on.
+While an hour is in progress, ``observe_partial`` scores its total so far,
+projected to the full hour, each time new readings arrive (throttled by the
+caller), so a spike is flagged minutes after it starts rather than when the
+hour closes; each zone-hour is flagged provisionally at most once. When the
+hour closes, ``observe`` scores the final aggregate and folds it into
+per-zone, per-hour running statistics (Chan merge, O(1) per zone-hour),
+instead of rescoring the whole window on every poll. ``seed`` initialises
+those statistics from history at startup.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from models.anomaly_detector import SEVERITY_LEVELS
+from models.instrumentation import timed
+from models.schema import format_timestamps
+from models.zone_data import iter_zones
+
+
+class OnlineAnomalyDetector:
+    def __init__(self, detector, zones: list[str], max_events: int = 1000, min_count: int = 4,
+                 min_fraction: float = 1 / 12):
+        self.detector = detector
+        self.zones = list(zones)
+        self.min_count = min_count    # observations before running stats replace the trained baseline
+        self.min_fraction = min_fraction   # part of an hour seen before it is projected and scored
+        self._zone_index = {zone: i for i, zone in enumerate(self.zones)}
+
+        shape = (len(self.zones), 24)
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)     # sum of squared deviations from the mean
+
+        # Trained hourly baseline for zone-hours without enough live history
+        table, trained_zones = detector._expected_lookup()
+        trained = {zone: i for i, zone in enumerate(trained_zones)}
+        self._baseline = np.array([
+            table[trained[zone]] if zone in trained else np.full(24, np.nan) for zone in self.zones
+        ]).reshape(shape)
+
+        self._flagged = np.full(len(self.zones), -1, dtype=np.int64)   # hour last flagged provisionally
+
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.observations = 0
+        self.partial_observations = 0
+        self.seeded = 0
+
+    def seed(self, data):
+        """Initialise running statistics from history (DataFrame or HistoryStore) without scoring."""
+        for zone, cols in iter_zones(data):
+            if zone in self._zone_index:
+                hours = np.asarray(cols['hour'], dtype=np.intp)
+                with self._lock:
+                    self._merge(np.full(len(hours), self._zone_index[zone]), hours,
+                                np.asarray(cols['energy_kwh'], dtype=np.float64))
+                    self.seeded += len(hours)
+
+    @timed('online_detector', 'observe')
+    def observe(self, df: pd.DataFrame) -> list[dict]:
+        """
+        Score closed hourly aggregates (sensor-store layout) and fold them into
+        the running statistics. Returns the anomalies emitted for this batch.
+        """
+        df, codes = self._known(df)
+        if df.empty:
+            return []
+
+        hours = df['hour'].to_numpy(dtype=np.intp)
+        energy = df['energy_kwh'].to_numpy(dtype=np.float64)
+        labels, scores = self.detector._score(
+            self.detector._feature_matrix(hours, df['day_of_week'].to_numpy(), energy))
+
+        with self._lock:
+            emitted = self._emit(df, codes, hours, energy, labels, scores, provisional=False)
+            self._merge(codes, hours, energy)
+            self.observations += len(energy)
+        return emitted
+
+    @timed('online_detector', 'observe_partial')
+    def observe_partial(self, df: pd.DataFrame, fraction: float) -> list[dict]:
+        """
+        Score the in-progress hour's aggregates (sensor-store layout), ``fraction``
+        of the way through the hour, projected to a full hour. Statistics are not
+        updated; a zone-hour already flagged is not emitted again.
+        """
+        if fraction < self.min_fraction:
+            return []
+        df, codes = self._known(df)
+        with self._lock:
+            fresh = self._flagged[codes] != df['timestamp'].to_numpy()
+        df, codes = df[fresh], codes[fresh]
+        if df.empty:
+            return []
+
+        hours = df['hour'].to_numpy(dtype=np.intp)
+        energy = df['energy_kwh'].to_numpy(dtype=np.float64) / min(fraction, 1.0)
+        labels, scores = self.detector._score(
+            self.detector._feature_matrix(hours, df['day_of_week'].to_numpy(), energy))
+
+        with self._lock:
+            self.partial_observations += len(energy)
+            flagged = np.asarray(labels) == -1
+            self._flagged[codes[flagged]] = df['timestamp'].to_numpy()[flagged]
+            return self._emit(df, codes, hours, energy, labels, scores, provisional=True)
+
+    def _known(self, df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+        """Rows of known zones and their zone indices."""
+        # Map each zone category once, then every row by its category code (-1 → unknown)
+        zone = df['zone'].astype('category')
+        lookup = np.array([self._zone_index.get(z, -1) for z in zone.cat.categories] + [-1], dtype=np.intp)
+        codes = lookup[zone.cat.codes.to_numpy()]
+        known = codes >= 0
+        return df[known], codes[known]
+
+    def _emit(self, df: pd.DataFrame, codes: np.ndarray, hours: np.ndarray, energy: np.ndarray,
+              labels: np.ndarray, scores: np.ndarray, provisional: bool) -> list[dict]:
+        """Build and buffer the anomaly events for scored rows (lock held)."""
+        # Score against the statistics as they were before these readings
+        count = self._count[codes, hours]
+        mean = self._mean[codes, hours]
+        std = np.sqrt(self._m2[codes, hours] / np.maximum(count - 1, 1))
+        # Running mean once warm, else the trained baseline, else whatever we have
+        expected = np.where(count >= self.min_count, mean, self._baseline[codes, hours])
+        expected = np.where(np.isnan(expected), np.where(count > 0, mean, energy), expected)
+        z_score = np.where(count > 1, (energy - mean) / np.maximum(std, 1e-9), 0.0)
+
+        deviation, severity, waste = self.detector._deviation(energy, expected)
+        timestamps = format_timestamps(df['timestamp'].to_numpy()).tolist()
+        emitted = []
+        for i in np.flatnonzero(np.asarray(labels) == -1):
+            self._seq += 1
+            emitted.append({
+                'seq': self._seq,
+                'zone': self.zones[codes[i]],
+                'hour': int(hours[i]),
+                'timestamp': timestamps[i],
+                'actual': round(float(energy[i]), 2),
+                'expected': round(float(expected[i]), 2),
+                'deviation': float(deviation[i]),
+                'zScore': round(float(z_score[i]), 2),
+                'severity': SEVERITY_LEVELS[severity[i]],
+                'confidence': round(float(min(1.0, abs(scores[i]) * 2)), 2),
+                'anomalyScore': round(float(scores[i]), 4),
+                'estimatedWaste': float(waste[i]),
+                'type': 'spike' if deviation[i] > 0 else 'drop',
+                'provisional': provisional,
+            })
+        self._events.extend(emitted)
+
+        return emitted
+
+    def events(self, since: int = 0, limit: int = 100) -> list[dict]:
+        """Anomalies with a sequence number above ``since``, oldest first."""
+        with self._lock:
+            # Sequence numbers are contiguous, so the offset into the deque is direct
+            first_seq = self._seq - len(self._events) + 1
+            start = max(0, since + 1 - first_seq)
+            return list(self._events)[start:start + limit]
+
+    def zone_stats(self, zone: str) -> dict:
+        """Running per-hour count, mean and std for one zone."""
+        i = self._zone_index[zone]
+        with self._lock:
+            count = self._count[i].copy()
+            mean = self._mean[i].copy()
+            m2 = self._m2[i].copy()
+        std = np.where(count > 1, np.sqrt(m2 / np.maximum(count - 1, 1)), np.nan)
+        return {h: {'count': int(count[h]), 'mean': float(mean[h]), 'std': float(std[h])} for h in range(24)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'zones': len(self.zones),
+                'observations': self.observations,
+                'partialObservations': self.partial_observations,
+                'seeded': self.seeded,
+                'lastSeq': self._seq,
+                'eventsBuffered': len(self._events),
+                'bytesPerZone': (self._count.nbytes + self._mean.nbytes + self._m2.nbytes) // max(len(self.zones), 1),
+            }
+
+    def _merge(self, codes: np.ndarray, hours: np.ndarray, values: np.ndarray):
+        """Fold observations into the running moments (Chan et al. parallel update; lock held)."""
+        flat = codes * 24 + hours
+        slots, inverse = np.unique(flat, return_inverse=True)
+        n_b = np.bincount(inverse, minlength=len(slots))
+        mean_b = np.bincount(inverse, weights=values, minlength=len(slots)) / n_b
+        m2_b = np.bincount(inverse, weights=(values - mean_b[inverse]) ** 2, minlength=len(slots))
+
+        count = self._count.reshape(-1)
+        mean = self._mean.reshape(-1)
+        m2 = self._m2.reshape(-1)
+        n_a = count[slots]
+        n = n_a + n_b
+        delta = mean_b - mean[slots]
+        mean[slots] += delta * n_b / n
+        m2[slots] += m2_b + delta ** 2 * n_a * n_b / n
+        count[slots] = n
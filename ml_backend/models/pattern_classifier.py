@@ -1,12 +1,16 @@
 """
 Pattern Classifier using K-Means clustering.
 Classifies consumption patterns as: efficient, normal, wasteful, or erratic.
+
+Zone features are computed for all zones in one grouped pass over the
+readings (``zone_features``), so any window — e.g. the last 7 days — can
+be reclassified against the fitted clusters without refitting.
 """
 
 import numpy as np
-import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+
+from models.instrumentation import timed
+from models.zone_data import zone_codes
 
 
 PATTERN_LABELS = {
@@ -20,30 +24,38 @@ PATTERN_LABELS = {
         'description': 'Unpredictable consumption — investigate equipment health'},
 }
 
+# Per-zone features, in the column order of the feature matrix
+FEATURES = (
+    'avg_consumption', 'std_consumption', 'cv', 'peak_trough_ratio',
+    'off_peak_ratio', 'weekend_reduction', 'max_spike', 'q95',
+)
+
 
 class PatternClassifier:
+    # Fitted sklearn objects; everything else is plain per-zone state
+    _ESTIMATOR_ATTRS = ('model', 'scaler')
+
+    # Optional inference engine (see models/inference.py); None → sklearn
+    engine = None
+
     def __init__(self, n_clusters: int = 4):
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+
         self.model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         self.scaler = StandardScaler()
         self._zone_features: dict = {}
         self._cluster_mapping: dict = {}
+        self._feature_means = None   # training mean per feature, stands in for undefined window features
 
-    def fit(self, df: pd.DataFrame):
-        """Extract per-zone features and cluster them."""
-        zone_features = []
-
-        for zone in df['zone'].unique():
-            zone_df = df[df['zone'] == zone]
-            features = self._extract_zone_features(zone_df)
-            features['zone'] = zone
-            zone_features.append(features)
-
-        features_df = pd.DataFrame(zone_features)
-        numeric_cols = [c for c in features_df.columns if c != 'zone']
-        X = features_df[numeric_cols].values
+    @timed('pattern_classifier', 'fit')
+    def fit(self, df):
+        """Compute every zone's features (from a DataFrame or HistoryStore) and cluster them."""
+        zones, X = self.zone_features(df)
 
         scaled = self.scaler.fit_transform(X)
         labels = self.model.fit_predict(scaled)
+        self._feature_means = self.scaler.mean_.tolist()
 
         # Map cluster IDs to pattern labels based on average consumption
         cluster_avgs = {}
@@ -55,34 +67,73 @@ class PatternClassifier:
             sorted_clusters[i]: i for i in range(min(len(sorted_clusters), 4))
         }
 
-        for i, zone in enumerate(features_df['zone']):
-            raw_label = labels[i]
-            mapped = self._cluster_mapping.get(raw_label, 1)
+        self._zone_features = {}
+        for zone, features, label in zip(zones, X.tolist(), labels):
             self._zone_features[zone] = {
-                **features_df.iloc[i].to_dict(),
-                'cluster': int(mapped),
+                **dict(zip(FEATURES, features)),
+                'zone': zone,
+                'cluster': int(self._cluster_mapping.get(label, 1)),
             }
 
-        print(f"  ✅ PatternClassifier trained on {len(zone_features)} zones")
+        print(f"  ✅ PatternClassifier trained on {len(zones)} zones")
 
+    @timed('pattern_classifier', 'classify')
     def classify_all(self) -> dict:
-        """Return classification for all zones."""
-        patterns = []
-        for zone, feat in self._zone_features.items():
-            cluster = feat['cluster']
-            label_info = PATTERN_LABELS.get(cluster, PATTERN_LABELS[1])
+        """Return classification for all zones (as of the training data)."""
+        return self._report([self._pattern(zone, feat, feat['cluster'])
+                             for zone, feat in self._zone_features.items()])
+
+    @timed('pattern_classifier', 'classify_window')
+    def classify(self, data) -> dict:
+        """
+        Classify every zone from its readings in ``data`` (e.g. the last 7
+        days) with the fitted clusters, without refitting. Each pattern also
+        carries the zone's class from training and whether it has changed.
+        Features a window cannot define (no weekend rows, a single reading)
+        count as the training average.
+        """
+        zones, X = self.zone_features(data)
+        if not zones:
+            return {**self._report([]), 'changedCount': 0}
+
+        means = self._feature_means if self._feature_means is not None else self.scaler.mean_
+        X_model = np.where(np.isnan(X), np.asarray(means), X)
+        labels = (self.engine.predict_patterns(X_model) if self.engine is not None
+                  else self.model.predict(self.scaler.transform(X_model)))
+        clusters = [self._cluster_mapping.get(label, 1) for label in labels.tolist()]
 
-            patterns.append({
-                'zone': zone,
-                **label_info,
-                'avgConsumption': round(float(feat.get('avg_consumption', 0)), 2),
-                'peakTroughRatio': round(float(feat.get('peak_trough_ratio', 1)), 2),
-                'offPeakRatio': round(float(feat.get('off_peak_ratio', 0) * 100), 1),
-                'variabilityScore': round(float(feat.get('cv', 0) * 100), 1),
-                'weekendReduction': round(float(feat.get('weekend_reduction', 0) * 100), 1),
-                'confidence': round(0.7 + np.random.random() * 0.25, 2),
-            })
+        patterns = []
+        for zone, features, cluster in zip(zones, X.tolist(), clusters):
+            pattern = self._pattern(zone, dict(zip(FEATURES, features)), cluster)
+            fitted = self._zone_features.get(zone)
+            pattern['fittedClassification'] = (
+                PATTERN_LABELS.get(fitted['cluster'], PATTERN_LABELS[1])['classification'] if fitted else None)
+            pattern['changed'] = fitted is not None and pattern['classification'] != pattern['fittedClassification']
+            patterns.append(pattern)
+
+        return {**self._report(patterns), 'changedCount': sum(p['changed'] for p in patterns)}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('engine', None)
+        return state
+
+    @staticmethod
+    def _pattern(zone: str, feat: dict, cluster: int) -> dict:
+        label_info = PATTERN_LABELS.get(cluster, PATTERN_LABELS[1])
+        return {
+            'zone': zone,
+            **label_info,
+            'avgConsumption': round(float(feat.get('avg_consumption', 0)), 2),
+            'peakTroughRatio': round(float(feat.get('peak_trough_ratio', 1)), 2),
+            'offPeakRatio': round(float(feat.get('off_peak_ratio', 0) * 100), 1),
+            'variabilityScore': round(float(feat.get('cv', 0) * 100), 1),
+            'weekendReduction': round(float(feat.get('weekend_reduction', 0) * 100), 1),
+            'confidence': round(0.7 + np.random.random() * 0.25, 2),
+        }
 
+    @staticmethod
+    def _report(patterns: list[dict]) -> dict:
         return {
             'patterns': patterns,
             'clusterSummary': {
@@ -91,24 +142,80 @@ class PatternClassifier:
             },
         }
 
-    def _extract_zone_features(self, zone_df: pd.DataFrame) -> dict:
-        """Extract statistical features from a zone's consumption data."""
-        energy = zone_df['energy_kwh']
-        hourly_avg = zone_df.groupby('hour')['energy_kwh'].mean()
-
-        peak_hours = hourly_avg.nlargest(6).mean()
-        off_peak_hours = hourly_avg.nsmallest(6).mean()
-
-        weekday = zone_df[zone_df['day_of_week'] < 5]['energy_kwh'].mean()
-        weekend = zone_df[zone_df['day_of_week'] >= 5]['energy_kwh'].mean()
-
-        return {
-            'avg_consumption': energy.mean(),
-            'std_consumption': energy.std(),
-            'cv': energy.std() / max(energy.mean(), 0.1),
-            'peak_trough_ratio': peak_hours / max(off_peak_hours, 0.1),
-            'off_peak_ratio': off_peak_hours / max(peak_hours, 0.1),
-            'weekend_reduction': 1 - (weekend / max(weekday, 0.1)),
-            'max_spike': energy.max() / max(energy.mean(), 0.1),
-            'q95': energy.quantile(0.95),
-        }
+    @staticmethod
+    def zone_features(data) -> tuple[list[str], np.ndarray]:
+        """
+        (zones, features) for every zone with readings in ``data`` (DataFrame or HistoryStore).
+
+        ``features`` is a (zones × FEATURES) matrix computed in one grouped
+        pass: per-zone and per-zone-hour sums via bincount, and one sort by
+        (zone, energy) for the maximum and 95th percentile.
+        """
+        codes, zones, cols = zone_codes(data)
+        codes = np.asarray(codes, dtype=np.intp)
+        hours = np.asarray(cols['hour'], dtype=np.intp)
+        energy = np.asarray(cols['energy_kwh'], dtype=np.float64)
+        weekend = np.asarray(cols['day_of_week']) >= 5
+        n = len(zones)
+        if not len(energy):
+            return [], np.empty((0, len(FEATURES)))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            count = np.bincount(codes, minlength=n)
+            mean = np.bincount(codes, weights=energy, minlength=n) / count
+            deviation = energy - mean[codes]
+            squares = np.bincount(codes, weights=deviation * deviation, minlength=n)
+            std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+            # Hourly averages per zone, sorted ascending; hours without readings sort last (NaN)
+            key = codes * 24 + hours
+            hour_count = np.bincount(key, minlength=n * 24).reshape(n, 24)
+            hour_sum = np.bincount(key, weights=energy, minlength=n * 24).reshape(n, 24)
+            hourly = np.sort(np.where(hour_count > 0, hour_sum / hour_count, np.nan), axis=1)
+            present = (hour_count > 0).sum(axis=1)[:, None]
+            rank = np.arange(24)
+            top = (rank >= present - 6) & (rank < present)
+            bottom = rank < np.minimum(present, 6)
+            peak_hours = np.where(top, hourly, 0.0).sum(axis=1) / top.sum(axis=1)
+            off_peak_hours = np.where(bottom, hourly, 0.0).sum(axis=1) / bottom.sum(axis=1)
+
+            # Weekday vs weekend means (NaN when a zone has none of either)
+            key = codes * 2 + weekend
+            day_count = np.bincount(key, minlength=n * 2).reshape(n, 2)
+            day_sum = np.bincount(key, weights=energy, minlength=n * 2).reshape(n, 2)
+            weekday, weekend_mean = (day_sum / day_count).T
+
+            # Order statistics from one sort: each zone's readings become a contiguous ascending run.
+            # A single float key (zone, then energy) sorts ~5x faster than lexsort on two keys.
+            low = energy.min()
+            ordered = energy[np.argsort(codes * (energy.max() - low + 1.0) + (energy - low))]
+            start = np.concatenate([[0], np.cumsum(count)[:-1]])
+            last = start + np.maximum(count - 1, 0)
+            q95 = PatternClassifier._quantile_sorted(ordered, start, count, 0.95)
+
+            floor_mean = np.maximum(mean, 0.1)
+            X = np.column_stack([
+                mean,
+                std,
+                std / floor_mean,
+                peak_hours / np.maximum(off_peak_hours, 0.1),
+                off_peak_hours / np.maximum(peak_hours, 0.1),
+                1 - weekend_mean / np.maximum(weekday, 0.1),
+                ordered[last] / floor_mean,
+                q95,
+            ])
+
+        keep = count > 0
+        return [zone for zone, k in zip(zones, keep) if k], X[keep]
+
+    @staticmethod
+    def _quantile_sorted(ordered: np.ndarray, start: np.ndarray, count: np.ndarray, q: float) -> np.ndarray:
+        """Linear-interpolated quantile of each ascending run ordered[start:start+count] (as np.quantile)."""
+        position = q * (np.maximum(count, 1) - 1)
+        below = np.floor(position).astype(np.intp)
+        t = position - below
+        a = ordered[np.minimum(start + below, len(ordered) - 1)]
+        b = ordered[np.minimum(start + np.minimum(below + 1, np.maximum(count - 1, 0)), len(ordered) - 1)]
+        diff = b - a
+        # Same interpolation as NumPy's 'linear' method, for identical results
+        return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
@@ -0,0 +1,84 @@
+"""
+Canonical layout of consumption reading frames.
+
+Every frame of readings — generated (data_generator.py), aggregated from
+live sensors (sensor_store.py) or read back from the history store — uses
+these column dtypes, one row per zone-hour:
+
+    timestamp     int64     epoch seconds (local wall-clock time)
+    zone          category  zone names; codes are the zone's index
+    hour          int8
+    day_of_week   int8      Monday = 0; weekends are ``day_of_week >= 5``
+    month         int8      historical frames only
+    energy_kwh    float32
+    water_kl      float32
+    is_anomaly    bool      historical frames only (injected anomalies)
+
+Models read the columns as NumPy views (``df[name].to_numpy()``), so
+building features never copies the frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = {
+    'timestamp': np.dtype('<i8'),
+    'hour': np.dtype('i1'),
+    'day_of_week': np.dtype('i1'),
+    'month': np.dtype('i1'),
+    'energy_kwh': np.dtype('<f4'),
+    'water_kl': np.dtype('<f4'),
+    'is_anomaly': np.dtype('?'),
+}
+
+
+def epoch_seconds(values) -> np.ndarray:
+    """Epoch seconds (int64) from datetime64 / Timestamp / datetime values or ints."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64, copy=False)
+    return np.asarray(values, dtype='datetime64[s]').astype(np.int64)
+
+
+def calendar(epoch: np.ndarray) -> dict[str, np.ndarray]:
+    """hour, day_of_week and month (int8) for epoch seconds."""
+    epoch = np.asarray(epoch, dtype=np.int64)
+    days = epoch // 86400
+    months = epoch.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+    return {
+        'hour': (epoch // 3600 % 24).astype(np.int8),
+        'day_of_week': ((days + 3) % 7).astype(np.int8),   # 1970-01-01 was a Thursday
+        'month': (months % 12 + 1).astype(np.int8),
+    }
+
+
+def reading_frame(timestamp, zone_codes: np.ndarray, zones: list[str], **columns) -> pd.DataFrame:
+    """
+    Build a frame in the canonical layout.
+
+    ``zone_codes`` index into ``zones``; hour and day_of_week are derived
+    from ``timestamp`` unless given. Columns are cast to their COLUMNS dtype
+    when they have one and kept as given otherwise.
+    """
+    epoch = epoch_seconds(timestamp)
+    if 'hour' not in columns or 'day_of_week' not in columns:
+        parts = calendar(epoch)
+        columns = {'hour': parts['hour'], 'day_of_week': parts['day_of_week'], **columns}
+
+    frame = {
+        'timestamp': epoch,
+        'zone': pd.Categorical.from_codes(zone_codes, categories=pd.Index(zones, dtype=object)),
+        'hour': columns.pop('hour'),
+        'day_of_week': columns.pop('day_of_week'),
+        **columns,
+    }
+    for name, values in frame.items():
+        if name in COLUMNS:
+            frame[name] = np.asarray(values, dtype=COLUMNS[name])
+    return pd.DataFrame(frame, copy=False)
+
+
+def format_timestamps(epoch) -> np.ndarray:
+    """'YYYY-MM-DD HH:MM:SS' strings for epoch seconds."""
+    text = np.datetime_as_string(np.asarray(epoch, dtype=np.int64).astype('datetime64[s]'))
+    return np.char.replace(text, 'T', ' ') if text.size else text   # np.char.replace fails on empty input
@@ -0,0 +1,101 @@
+"""
+Per-zone access to training data.
+Models train from either a pandas DataFrame or a columnar HistoryStore
+(see history_store.py); both are read one zone at a time as plain arrays.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ZONE_COLUMNS = ('hour', 'day_of_week', 'energy_kwh')
+
+# Worker processes for per-zone fitting (train.py --workers overrides)
+TRAIN_WORKERS = int(os.environ.get('TRAIN_WORKERS', '1'))
+
+
+def iter_zones(data):
+    """
+    Yield (zone, columns) for every zone in ``data``.
+
+    ``columns`` maps 'hour', 'day_of_week' and 'energy_kwh' to 1-D arrays.
+    A DataFrame is partitioned by zone in one pass (categorical zones in
+    category order, others in order of first appearance; zones without rows
+    are skipped); for a HistoryStore they are zero-copy memory-mapped slices.
+    """
+    if isinstance(data, pd.DataFrame):
+        codes, zones, columns = zone_codes(data)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(zones)))[:-1]
+        columns = {name: np.split(col[order], bounds) for name, col in columns.items()}
+        for i, zone in enumerate(zones):
+            if len(columns['energy_kwh'][i]):
+                yield zone, {name: columns[name][i] for name in ZONE_COLUMNS}
+    else:
+        for zone in data.zones:
+            columns = data.zone_columns(zone)
+            if len(columns['energy_kwh']):
+                yield zone, columns
+
+
+def zone_codes(data) -> tuple[np.ndarray, list, dict]:
+    """
+    (codes, zones, columns) for every row of ``data``, for grouped passes over all zones at once.
+
+    ``codes`` index into ``zones`` and ``columns`` maps ZONE_COLUMNS to
+    aligned arrays: views of a DataFrame's columns, or a HistoryStore's
+    zones concatenated. DataFrame rows without a zone (NaN) are dropped.
+    """
+    if isinstance(data, pd.DataFrame):
+        zone = data['zone']
+        if isinstance(zone.dtype, pd.CategoricalDtype):
+            codes, zones = zone.cat.codes.to_numpy(), zone.cat.categories
+        else:
+            codes, zones = pd.factorize(zone)
+        columns = {name: data[name].to_numpy() for name in ZONE_COLUMNS}
+        if (codes < 0).any():
+            keep = codes >= 0
+            codes, columns = codes[keep], {name: col[keep] for name, col in columns.items()}
+        return codes, list(zones), columns
+
+    parts = list(iter_zones(data))
+    codes = np.repeat(np.arange(len(parts)), [len(cols['energy_kwh']) for _, cols in parts])
+    columns = {name: np.concatenate([cols[name] for _, cols in parts]) if parts else np.empty(0)
+               for name in ZONE_COLUMNS}
+    return codes, [zone for zone, _ in parts], columns
+
+
+def map_zones(fn, data, workers: int | None = None) -> list[tuple[str, object]]:
+    """
+    Apply ``fn(columns)`` to every zone of ``data``; returns [(zone, result)] in zone order.
+
+    With more than one worker the zones are fitted on a process pool. ``fn``
+    must be picklable (a module-level function or staticmethod) and
+    deterministic, so results do not depend on the worker count.
+    """
+    workers = TRAIN_WORKERS if workers is None else workers
+    partitions = list(iter_zones(data))
+    if workers <= 1 or len(partitions) < 2:
+        return [(zone, fn(columns)) for zone, columns in partitions]
+
+    workers = min(workers, len(partitions))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_limit_threads) as pool:
+        results = pool.map(fn, [columns for _, columns in partitions],
+                           chunksize=max(1, len(partitions) // (workers * 4)))
+        return [(zone, result) for (zone, _), result in zip(partitions, results)]
+
+
+def hourly_means(hours: np.ndarray, values: np.ndarray) -> dict:
+    """Mean of ``values`` per hour of day, for the hours present."""
+    hours = np.asarray(hours, dtype=np.intp)
+    sums = np.bincount(hours, weights=values, minlength=24)
+    counts = np.bincount(hours, minlength=24)
+    return {int(h): float(sums[h] / counts[h]) for h in np.flatnonzero(counts)}
+
+
+def _limit_threads():
+    # One BLAS thread per worker process; the pool already uses every core
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
@@ -0,0 +1,135 @@
+"""
+Memory-bounded, lazily loaded per-zone model state.
+
+Artifacts store each zone's fitted state in its own file (see
+artifact_store.py). A ``ZoneRegistry`` knows every zone up front but loads a
+zone's record only on first use, keeps recently used zones in an LRU and
+evicts the least recently used ones once their estimated size exceeds the
+byte budget. ``ZoneFieldMap`` exposes one field of the records as a plain
+mapping, so model code keeps using ``self._models.get(zone)``.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+class ZoneRegistry:
+    def __init__(self, loader, zones, budget_bytes: int = 256 * 2**20):
+        self._loader = loader                 # zone → (record, estimated bytes)
+        self._zones = list(zones)
+        self._known = set(self._zones)
+        self.budget_bytes = budget_bytes
+        self._resident: OrderedDict = OrderedDict()   # zone → (record, bytes)
+        self._pinned: dict = {}                      # zone → record changed in memory; never evicted
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, zone: str):
+        """A zone's record (loading it if needed), or None for an unknown zone."""
+        with self._lock:
+            if zone in self._pinned:
+                self.hits += 1
+                return self._pinned[zone]
+            entry = self._resident.get(zone)
+            if entry is not None:
+                self._resident.move_to_end(zone)
+                self.hits += 1
+                return entry[0]
+        if zone not in self._known:
+            return None
+
+        record, size = self._loader(zone)      # outside the lock: cold loads don't block hot zones
+        with self._lock:
+            if zone not in self._resident:
+                self._resident[zone] = (record, size)
+                self._bytes += size
+                self.loads += 1
+                self._evict()
+            return self._resident[zone][0]
+
+    def put(self, zone: str, record):
+        """Replace a zone's record in memory (e.g. after partial_fit); it stays resident."""
+        with self._lock:
+            entry = self._resident.pop(zone, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            self._pinned[zone] = record
+            if zone not in self._known:
+                self._known.add(zone)
+                self._zones.append(zone)
+
+    def warm(self) -> int:
+        """Load zones in order until the budget is full (e.g. before forking workers); returns the number loaded."""
+        loaded = 0
+        for zone in self:
+            if self._bytes >= self.budget_bytes:
+                break
+            if zone not in self._resident and zone not in self._pinned:
+                self.get(zone)
+                loaded += 1
+        return loaded
+
+    def _evict(self):
+        # Lock held; the most recently loaded zone always stays
+        while self._bytes > self.budget_bytes and len(self._resident) > 1:
+            _, (_, size) = self._resident.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def __contains__(self, zone) -> bool:
+        return zone in self._known
+
+    def __iter__(self):
+        return iter(list(self._zones))
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'zones': len(self._zones),
+                'resident': len(self._resident) + len(self._pinned),
+                'residentBytes': self._bytes,
+                'budgetBytes': self.budget_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'pinned': len(self._pinned),
+            }
+
+
+class ZoneFieldMap(MutableMapping):
+    """One field of every zone's record, as a mapping (zone → value)."""
+
+    def __init__(self, registry: ZoneRegistry, field: str):
+        self.registry = registry
+        self.field = field
+
+    def __getitem__(self, zone):
+        record = self.registry.get(zone)
+        if record is None or self.field not in record:
+            raise KeyError(zone)
+        return record[self.field]
+
+    def __setitem__(self, zone, value):
+        record = dict(self.registry.get(zone) or {})
+        record[self.field] = value
+        self.registry.put(zone, record)
+
+    def __delitem__(self, zone):
+        raise TypeError('Zones cannot be removed from a loaded artifact')
+
+    def __contains__(self, zone) -> bool:
+        return zone in self.registry
+
+    def __iter__(self):
+        return iter(self.registry)
+
+    def __len__(self) -> int:
+        return len(self.registry)
@@ -0,0 +1,136 @@
+"""
+Token-bucket rate limiting for the API's ``rate_limit`` decorator.
+
+Each key (client IP) owns a bucket of ``limit`` tokens refilled at
+``limit / window`` tokens per second; a request spends one token. Checks
+are O(1) and idle keys are evicted, so memory stays bounded.
+
+Backends:
+
+* ``memory`` — per-process LRU of buckets (default; one limit per worker).
+* ``sqlite`` — buckets in a local SQLite file updated with one atomic
+  UPSERT, so every worker process on the host shares the same limit.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_BACKENDS = ['memory', 'sqlite']
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.ratelimit.sqlite3')
+
+
+class MemoryLimiter:
+    def __init__(self, limit: int, window: float, max_keys: int = 100_000):
+        self.capacity = float(limit)
+        self.rate = limit / window
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()   # key → [tokens, updated]
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> tuple[bool, float]:
+        """Spend a token for ``key``; returns (allowed, seconds until a token is available)."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)   # least recently seen
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return True, 0.0
+            return False, (1.0 - bucket[0]) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteLimiter:
+    # Refill and spend in one statement; SQLite's write lock makes it atomic across processes
+    _UPSERT = """
+        INSERT INTO buckets (key, tokens, updated, allowed) VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = MIN(:capacity, tokens + (:now - updated) * :rate)
+                     - (MIN(:capacity, tokens + (:now - updated) * :rate) >= 1),
+            allowed = MIN(:capacity, tokens + (:now - updated) * :rate) >= 1,
+            updated = :now
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, path: str, limit: int, window: float, max_keys: int = 100_000,
+                 evict_every: int = 1000):
+        self.path = path
+        self.capacity = float(limit)
+        self.rate = limit / window
+        self.window = window
+        self.max_keys = max_keys
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._calls = 0
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)')
+
+    def allow(self, key: str) -> tuple[bool, float]:
+        """Spend a token for ``key``; returns (allowed, seconds until a token is available)."""
+        now = time.time()
+        conn = self._connection()
+        tokens, allowed = conn.execute(self._UPSERT, {
+            'key': key, 'capacity': self.capacity, 'rate': self.rate, 'now': now,
+        }).fetchone()
+
+        self._calls += 1
+        if self._calls % self.evict_every == 0:
+            self._evict(conn, now)
+
+        if allowed:
+            return True, 0.0
+        return False, (1.0 - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM buckets').fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        # A bucket idle for a full window has refilled completely: same as a new key
+        conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.window,))
+        conn.execute("""
+            DELETE FROM buckets WHERE key IN (
+                SELECT key FROM buckets ORDER BY updated DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_keys,))
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread; Flask serves requests on many
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')   # limiter state is disposable
+        return conn
+
+
+def create_limiter(backend: str, limit: int, window: float, path: str | None = None,
+                   max_keys: int = 100_000):
+    """Build the configured limiter backend."""
+    if backend == 'sqlite':
+        path = path or DEFAULT_DB_PATH
+        return SQLiteLimiter(path, limit, window, max_keys=max_keys)
+    return MemoryLimiter(limit, window, max_keys=max_keys)
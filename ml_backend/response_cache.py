@@ -0,0 +1,153 @@
+"""
+Server-side response cache with conditional GET for the read-only API.
+
+Endpoints whose payload only changes when the models are refit or a time
+bucket rolls over (e.g. an hour of sensor data closes) are computed once
+per (path, query, model version, bucket). The body is stored serialized and
+pre-compressed (gzip, plus brotli when the ``brotli`` package is
+installed). The ETag derives from the same key, so a revalidation is
+answered with ``304 Not Modified`` before the view runs at all.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from functools import wraps
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class ResponseCache:
+    def __init__(self, version, max_entries: int = 256, min_compress_size: int = 512,
+                 keep_headers: tuple = ()):
+        self._version = version          # callable → current model version string
+        self.max_entries = max_entries
+        self.min_compress_size = min_compress_size
+        self.keep_headers = keep_headers  # view headers stored with the body
+        self._entries: OrderedDict = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def cached(self, ttl: int | None = None, offset: int = 0, max_age: int | None = None):
+        """
+        Cache a JSON view's 200 responses.
+
+        ``ttl`` is the bucket length in seconds (None: until the next
+        invalidate()); ``offset`` shifts bucket boundaries, e.g. to local
+        hours. Clients may reuse a response for ``max_age`` seconds
+        (default: until the bucket ends) and then revalidate.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                now = time.time()
+                bucket = int((now + offset) // ttl) if ttl else 0
+                key = (request.path, tuple(sorted(request.args.items(multi=True))),
+                       self._version(), self._generation, bucket)
+                etag = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+                if ttl:
+                    last_modified = bucket * ttl - offset
+                    fresh_for = max_age if max_age is not None else int(last_modified + ttl - now) + 1
+                else:
+                    last_modified = None
+                    fresh_for = max_age or 0
+                cache_control = f'private, max-age={fresh_for}, must-revalidate'
+
+                if request.if_none_match.contains(etag) or (
+                        not request.if_none_match and last_modified is not None
+                        and request.if_modified_since is not None
+                        and request.if_modified_since.timestamp() >= int(last_modified)):
+                    with self._lock:
+                        self.not_modified += 1
+                    response = Response(status=304)
+                else:
+                    entry = self._get(key)
+                    if entry is None:
+                        result = view(*args, **kwargs)
+                        if not isinstance(result, Response) or result.status_code != 200:
+                            return result
+                        entry = self._build(result.get_data(), result.mimetype, {
+                            name: result.headers[name] for name in self.keep_headers if name in result.headers
+                        })
+                        self._put(key, entry)
+                    response = self._encode(entry)
+
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+                response.headers['Cache-Control'] = cache_control
+                response.vary.add('Accept-Encoding')
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self):
+        """Drop every cached response, e.g. after models are refit in-process."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxSize': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'notModified': self.not_modified,
+                'hitRate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'bytes': sum(sum(len(b) for b in e['bodies'].values()) for e in self._entries.values()),
+                'brotli': brotli is not None,
+            }
+
+    def _build(self, body: bytes, mimetype: str, headers: dict | None = None) -> dict:
+        """Serialize once, compress once per encoding."""
+        bodies = {'identity': body}
+        if len(body) >= self.min_compress_size:
+            bodies['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                bodies['br'] = brotli.compress(body, quality=9)
+        return {'bodies': bodies, 'mimetype': mimetype, 'headers': headers or {}}
+
+    def _encode(self, entry: dict) -> Response:
+        """Pick the smallest encoding the client accepts."""
+        accepted = request.accept_encodings
+        encoding = min(
+            (e for e in entry['bodies'] if e == 'identity' or accepted[e] > 0),
+            key=lambda e: len(entry['bodies'][e]),
+        )
+        response = Response(entry['bodies'][encoding], mimetype=entry['mimetype'])
+        response.headers.update(entry['headers'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
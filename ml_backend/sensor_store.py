@@ -0,0 +1,270 @@
+"""
+In-memory sensor store for live meter readings.
+
+EnergyMonitor devices report a Vrms / current / power reading every second.
+Readings are folded into fixed-size per-zone NumPy ring buffers of hourly
+aggregates, so memory stays constant no matter how long the API runs, and
+the anomaly endpoints can read real windows in the same layout as
+``generate_realtime_stream``.
+
+Waveform-capable devices send raw sample blocks instead (see waveform.py);
+their power factor and current THD are kept as hourly means too.
+
+Two reading formats are accepted by ``/api/ingest``:
+
+* NDJSON — one object per line::
+
+      {"zone": "Gym", "device": "esp32-07", "ts": 1760000000, "vrms": 229.8, "irms": 1.21, "power": 276.4}
+
+  ``zone`` may be a zone name or its index in ``SensorStore.zones``.
+
+* Binary frame — ``b'EWB1'`` + uint32 record count, followed by packed
+  little-endian ``READING_DTYPE`` records (20 bytes each).
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.schema import reading_frame
+
+READING_DTYPE = np.dtype([
+    ('zone', '<u2'),      # index into SensorStore.zones
+    ('device', '<u2'),
+    ('ts', '<u4'),        # epoch seconds
+    ('vrms', '<f4'),
+    ('irms', '<f4'),
+    ('power', '<f4'),     # watts
+])
+FRAME_MAGIC = b'EWB1'
+FRAME_HEADER_SIZE = 8
+
+
+class SensorStore:
+    def __init__(self, zones: list[str], capacity_hours: int = 24 * 14,
+                 reading_interval_s: float = 1.0, utc_offset_s: int | None = None,
+                 max_clock_skew_s: int = 300):
+        self.zones = list(zones)
+        self.capacity = capacity_hours
+        self.reading_interval_s = reading_interval_s
+        # Readings stamped further ahead of the wall clock than this are rejected
+        self.max_clock_skew_s = max_clock_skew_s
+        # Hour buckets follow campus local time (e.g. UTC+5:30 is not hour-aligned in UTC)
+        self.utc_offset_s = time.localtime().tm_gmtoff if utc_offset_s is None else utc_offset_s
+        self._zone_index = {zone: i for i, zone in enumerate(self.zones)}
+
+        shape = (len(self.zones), capacity_hours)
+        self._bucket = np.full(shape, -1, dtype=np.int64)   # local epoch hour held by each slot
+        self._energy_wh = np.zeros(shape)
+        self._vrms_sum = np.zeros(shape)
+        self._irms_sum = np.zeros(shape)
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._pf_sum = np.zeros(shape)           # power quality, from waveform readings only
+        self._thd_sum = np.zeros(shape)
+        self._quality_count = np.zeros(shape, dtype=np.int64)
+        self._lock = threading.Lock()
+
+        # Hours before the current one are closed; subscribers get each closed hour once
+        self._closed_through = self._local_hour(time.time()) - 1
+        self._on_hour_closed = []
+
+        self.readings_accepted = 0
+        self.readings_rejected = 0
+
+    def subscribe(self, callback):
+        """Call ``callback(frame)`` with the hourly aggregates of every hour as it closes."""
+        self._on_hour_closed.append(callback)
+
+    def zone_code(self, zone) -> int:
+        """Resolve a zone name or index to its index; -1 if unknown."""
+        if isinstance(zone, str):
+            return self._zone_index.get(zone, -1)
+        if isinstance(zone, int) and not isinstance(zone, bool) and 0 <= zone < len(self.zones):
+            return zone
+        return -1
+
+    def ingest(self, zone: np.ndarray, ts: np.ndarray, vrms: np.ndarray,
+               irms: np.ndarray, power: np.ndarray, now: float | None = None,
+               power_factor: np.ndarray | None = None, current_thd: np.ndarray | None = None) -> int:
+        """
+        Fold a batch of readings into the hourly ring buffers; returns the number accepted.
+
+        ``power_factor`` and ``current_thd`` come with waveform readings;
+        their hourly means only count readings where both are finite.
+
+        Readings stamped more than ``max_clock_skew_s`` ahead of the wall
+        clock (a device with a wrong clock) or older than the ring's capacity
+        are rejected, so they can never recycle a slot holding a live hour.
+
+        Hours that closed since the last batch (by wall clock) are then passed
+        to subscribers; readings arriving later for a closed hour are stored
+        but not re-published.
+        """
+        now = time.time() if now is None else now
+        zone = np.asarray(zone, dtype=np.int64)
+        ts = np.asarray(ts, dtype=np.int64)
+        bucket = (ts + self.utc_offset_s) // 3600
+        power = np.asarray(power, dtype=np.float64)
+        vrms = np.asarray(vrms, dtype=np.float64)
+        irms = np.asarray(irms, dtype=np.float64)
+
+        valid = (zone >= 0) & (zone < len(self.zones)) & np.isfinite(power) & (power >= 0)
+        valid &= (ts <= now + self.max_clock_skew_s) & (bucket > self._local_hour(now) - self.capacity)
+        flat = np.where(valid, zone * self.capacity + bucket % self.capacity, 0)
+
+        with self._lock:
+            buckets = self._bucket.reshape(-1)
+
+            # Slots still holding an older hour are recycled for the newest hour seen
+            slots, inverse = np.unique(flat[valid], return_inverse=True)
+            newest = np.full(len(slots), -1, dtype=np.int64)
+            np.maximum.at(newest, inverse, bucket[valid])
+            recycle = newest > buckets[slots]
+            if recycle.any():
+                stale = slots[recycle]
+                buckets[stale] = newest[recycle]
+                for arr in self._buffers():
+                    arr.reshape(-1)[stale] = 0
+
+            # Readings older than the hour their slot holds fell off the ring
+            keep = valid & (bucket == buckets[flat])
+            slots, inverse = np.unique(flat[keep], return_inverse=True)
+            n_slots = len(slots)
+            self._energy_wh.reshape(-1)[slots] += np.bincount(
+                inverse, weights=power[keep] * (self.reading_interval_s / 3600), minlength=n_slots)
+            self._vrms_sum.reshape(-1)[slots] += np.bincount(inverse, weights=vrms[keep], minlength=n_slots)
+            self._irms_sum.reshape(-1)[slots] += np.bincount(inverse, weights=irms[keep], minlength=n_slots)
+            self._count.reshape(-1)[slots] += np.bincount(inverse, minlength=n_slots)
+
+            if power_factor is not None:
+                pf = np.asarray(power_factor, dtype=np.float64)[keep]
+                thd = np.asarray(current_thd, dtype=np.float64)[keep]
+                quality = np.isfinite(pf) & np.isfinite(thd)
+                inverse = inverse[quality]
+                self._pf_sum.reshape(-1)[slots] += np.bincount(inverse, weights=pf[quality], minlength=n_slots)
+                self._thd_sum.reshape(-1)[slots] += np.bincount(inverse, weights=thd[quality], minlength=n_slots)
+                self._quality_count.reshape(-1)[slots] += np.bincount(inverse, minlength=n_slots)
+
+            accepted = int(keep.sum())
+            self.readings_accepted += accepted
+            self.readings_rejected += len(keep) - accepted
+
+            closed = None
+            last_closed = self._local_hour(now) - 1
+            if self._on_hour_closed and last_closed > self._closed_through:
+                first = max(self._closed_through + 1, last_closed - self.capacity + 1)
+                closed = self._aggregate(first, last_closed)
+            self._closed_through = max(self._closed_through, last_closed)
+
+        if closed is not None and len(closed):
+            for callback in self._on_hour_closed:
+                callback(closed)
+
+        return accepted
+
+    def window(self, hours: int = 72, zone: str = 'all', now: float | None = None,
+               include_current: bool = False) -> pd.DataFrame:
+        """
+        Hourly aggregates for the last N hours, ordered by hour then zone.
+
+        The in-progress hour is excluded unless ``include_current`` is set,
+        since its energy total is still partial.
+        """
+        current = self._local_hour(time.time() if now is None else now)
+        last = current if include_current else current - 1
+        first = last - min(hours, self.capacity) + 1
+
+        with self._lock:
+            return self._aggregate(first, last, None if zone == 'all' else self.zone_code(zone))
+
+    def _buffers(self) -> tuple[np.ndarray, ...]:
+        """The per-slot accumulators, reset together when a slot is recycled."""
+        return (self._energy_wh, self._vrms_sum, self._irms_sum, self._count,
+                self._pf_sum, self._thd_sum, self._quality_count)
+
+    def _local_hour(self, ts: float) -> int:
+        return (int(ts) + self.utc_offset_s) // 3600
+
+    def _aggregate(self, first: int, last: int, zone_code: int | None = None) -> pd.DataFrame:
+        """Hourly aggregates for local hours first..last, ordered by hour then zone (lock held)."""
+        mask = (self._bucket >= first) & (self._bucket <= last) & (self._count > 0)
+        if zone_code is not None:
+            mask[np.arange(len(self.zones)) != zone_code] = False
+        zone_idx, slot_idx = np.nonzero(mask)
+        bucket = self._bucket[zone_idx, slot_idx]
+        energy_kwh = self._energy_wh[zone_idx, slot_idx] / 1000
+        count = self._count[zone_idx, slot_idx]
+        vrms = self._vrms_sum[zone_idx, slot_idx] / count
+        irms = self._irms_sum[zone_idx, slot_idx] / count
+        quality = self._quality_count[zone_idx, slot_idx]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            power_factor = np.where(quality > 0, self._pf_sum[zone_idx, slot_idx] / quality, np.nan)
+            current_thd = np.where(quality > 0, self._thd_sum[zone_idx, slot_idx] / quality, np.nan)
+
+        order = np.lexsort((zone_idx, bucket))
+        return reading_frame(
+            bucket[order] * 3600,
+            zone_idx[order],
+            self.zones,
+            energy_kwh=np.round(energy_kwh[order], 3),
+            vrms=np.round(vrms[order], 2).astype(np.float32),
+            irms=np.round(irms[order], 3).astype(np.float32),
+            readings=count[order],
+            power_factor=np.round(power_factor[order], 3).astype(np.float32),
+            current_thd=np.round(current_thd[order], 3).astype(np.float32),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'zones': len(self.zones),
+                'capacityHours': self.capacity,
+                'hoursStored': int((self._count > 0).sum()),
+                'readingsAccepted': self.readings_accepted,
+                'readingsRejected': self.readings_rejected,
+                'memoryBytes': int(self._bucket.nbytes + sum(a.nbytes for a in self._buffers())),
+            }
+
+
+def decode_ndjson(body: bytes, store: SensorStore) -> tuple[np.ndarray, ...]:
+    """Parse NDJSON readings into (zone, ts, vrms, irms, power) arrays."""
+    zone, ts, vrms, irms, power = [], [], [], [], []
+    for line_no, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            r = json.loads(line)
+            zone.append(store.zone_code(r['zone']))
+            ts.append(int(r['ts']))
+            if not 0 <= ts[-1] < 2**63:
+                raise ValueError(f"timestamp {ts[-1]} out of range")
+            vrms.append(float(r.get('vrms', 'nan')))
+            irms.append(float(r.get('irms', 'nan')))
+            power.append(float(r['power']))
+        except (ValueError, KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f'Invalid reading on line {line_no}: {e}') from None
+
+    return (np.array(zone, dtype=np.int64), np.array(ts, dtype=np.int64),
+            np.array(vrms), np.array(irms), np.array(power))
+
+
+def decode_binary_frame(body: bytes) -> tuple[np.ndarray, ...]:
+    """Decode a binary frame zero-copy into (zone, ts, vrms, irms, power) arrays."""
+    if len(body) < FRAME_HEADER_SIZE or body[:4] != FRAME_MAGIC:
+        raise ValueError('Invalid frame header')
+
+    count = int(np.frombuffer(body, dtype='<u4', count=1, offset=4)[0])
+    if len(body) != FRAME_HEADER_SIZE + count * READING_DTYPE.itemsize:
+        raise ValueError(f'Frame length does not match record count {count}')
+
+    records = np.frombuffer(body, dtype=READING_DTYPE, count=count, offset=FRAME_HEADER_SIZE)
+    return records['zone'], records['ts'], records['vrms'], records['irms'], records['power']
+
+
+def encode_binary_frame(records: np.ndarray) -> bytes:
+    """Pack READING_DTYPE records into a binary frame (used by devices and benchmarks)."""
+    records = np.ascontiguousarray(records, dtype=READING_DTYPE)
+    return FRAME_MAGIC + np.uint32(len(records)).tobytes() + records.tobytes()
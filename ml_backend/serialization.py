@@ -0,0 +1,79 @@
+"""
+Response encoders for columnar API payloads.
+
+Models can return their per-row results as a dict of NumPy arrays (one per
+field) instead of a list of per-row dicts. Those payloads are encoded here
+straight from the arrays:
+
+* ``columnar`` — JSON with one array per field
+* ``msgpack``  — the same structure as MessagePack (needs ``msgpack``)
+* ``arrow``    — an Arrow IPC stream: the array fields form the record
+  batch, everything else is JSON in the schema metadata (needs ``pyarrow``)
+
+``json`` (the default) keeps the original row-per-dict responses.
+"""
+
+import json
+
+import numpy as np
+
+RESPONSE_FORMATS = ['json', 'columnar', 'msgpack', 'arrow']
+
+MIMETYPES = {
+    'json': 'application/json',
+    'columnar': 'application/json',
+    'msgpack': 'application/msgpack',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def encode(payload: dict, fmt: str) -> bytes:
+    """Encode a columnar payload (dict with at most one dict-of-arrays field)."""
+    if fmt == 'arrow':
+        return _encode_arrow(payload)
+    if fmt == 'msgpack':
+        import msgpack
+        return msgpack.packb(_plain(payload), use_bin_type=True)
+    return json.dumps(_plain(payload), separators=(',', ':')).encode()
+
+
+def _plain(value):
+    """Convert NumPy arrays/scalars to Python values (arrays in one C-level tolist call)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _encode_arrow(payload: dict) -> bytes:
+    import pyarrow as pa
+
+    table_key = next((k for k, v in payload.items()
+                      if isinstance(v, dict) and v and all(isinstance(c, np.ndarray) for c in v.values())), None)
+    columns = payload.get(table_key, {})
+    meta = {k: v for k, v in payload.items() if k != table_key}
+
+    table = pa.table(
+        {name: _arrow_column(pa, col) for name, col in columns.items()},
+        metadata={'table': table_key or '', 'meta': json.dumps(_plain(meta), separators=(',', ':'))},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_column(pa, col: np.ndarray):
+    """Arrow array for a column; repetitive strings (zone, severity, ...) are dictionary-encoded."""
+    if col.dtype.kind not in 'OUS':
+        return pa.array(col)
+    col = col.astype(str)
+    array = pa.array(col)
+    if len(np.unique(col)) * 2 <= len(col):
+        array = array.dictionary_encode()
+    return array
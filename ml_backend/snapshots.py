@@ -0,0 +1,150 @@
+"""
+Background precompute of the API's default views.
+
+A ``SnapshotScheduler`` owns named jobs (a model call each, e.g. one zone's
+anomaly report) and refreshes all of them on a fixed cadence, or early when
+``trigger()`` is called because new sensor data arrived. Jobs whose inputs
+are ready run concurrently on a thread pool; jobs can depend on other jobs'
+results (``needs``). A refresh publishes every new snapshot at once by
+swapping one dict, so endpoints read a consistent generation with a plain
+lookup and never wait on the models.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+
+class Snapshot(NamedTuple):
+    value: object
+    computed_at: float      # epoch seconds
+    generation: int
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.computed_at
+
+
+class SnapshotScheduler:
+    def __init__(self, interval: float = 300, workers: int = 4):
+        self.interval = interval
+        self.workers = workers
+        self._jobs: dict = {}                # name → (fn, needs)
+        self._snapshots: dict = {}           # name → Snapshot; replaced wholesale on publish
+        self._errors: dict = {}              # name → last error message
+        self._listeners: list = []
+        self._wake = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+        self.generation = 0
+        self.refreshes = 0
+        self.last_duration = 0.0
+
+    def add(self, name: str, fn, needs: tuple = ()):
+        """Register a job; ``fn`` is called with the values of ``needs`` (same refresh) as arguments."""
+        self._jobs[name] = (fn, tuple(needs))
+
+    def subscribe(self, callback):
+        """Call ``callback(snapshots)`` after every published refresh."""
+        self._listeners.append(callback)
+
+    def get(self, name: str) -> Snapshot | None:
+        return self._snapshots.get(name)
+
+    def refresh(self):
+        """Run every job once (concurrently where possible) and publish the results together."""
+        with self._refresh_lock:
+            start = time.perf_counter()
+            generation = self.generation + 1
+            values, pending = {}, dict(self._jobs)
+
+            with ThreadPoolExecutor(self.workers, thread_name_prefix='snapshot') as pool:
+                while pending:
+                    ready = {name: job for name, job in pending.items()
+                             if all(n in values or n not in pending for n in job[1])}
+                    if not ready:
+                        raise ValueError(f'Snapshot jobs have a dependency cycle: {sorted(pending)}')
+                    futures = {pool.submit(self._run, name, fn, needs, values): name
+                               for name, (fn, needs) in ready.items()}
+                    wait(futures)
+                    for future, name in futures.items():
+                        del pending[name]
+                        if future.result() is not _FAILED:
+                            values[name] = future.result()
+
+            computed_at = time.time()
+            self._snapshots = {
+                **self._snapshots,
+                **{name: Snapshot(value, computed_at, generation) for name, value in values.items()},
+            }
+            self.generation = generation
+            self.refreshes += 1
+            self.last_duration = time.perf_counter() - start
+
+        for callback in self._listeners:
+            try:
+                callback(self._snapshots)
+            except Exception as e:
+                print(f"⚠️  Snapshot listener failed: {e}")
+
+    def _run(self, name: str, fn, needs: tuple, values: dict):
+        # A failed dependency falls back to its previous snapshot; without one, the job is skipped
+        args = []
+        for need in needs:
+            if need in values:
+                args.append(values[need])
+            elif need in self._snapshots:
+                args.append(self._snapshots[need].value)
+            else:
+                self._errors[name] = f'missing input {need!r}'
+                return _FAILED
+        try:
+            value = fn(*args)
+        except Exception as e:
+            self._errors[name] = str(e) or type(e).__name__
+            print(f"⚠️  Snapshot job {name} failed: {self._errors[name]}")
+            return _FAILED
+        self._errors.pop(name, None)
+        return value
+
+    def trigger(self):
+        """Refresh as soon as possible (e.g. a sensor hour closed); repeated triggers coalesce."""
+        self._wake.set()
+
+    def start(self):
+        """Refresh now and then every ``interval`` seconds (or on trigger) on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='snapshot-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Snapshot refresh failed: {e}")
+            self._wake.wait(self.interval)
+
+    def stats(self) -> dict:
+        snapshots = self._snapshots
+        ages = [s.age for s in snapshots.values()]
+        return {
+            'jobs': len(self._jobs),
+            'snapshots': len(snapshots),
+            'generation': self.generation,
+            'refreshes': self.refreshes,
+            'lastRefreshSeconds': round(self.last_duration, 4),
+            'oldestAgeSeconds': round(max(ages), 1) if ages else None,
+            'errors': dict(self._errors),
+        }
+
+
+_FAILED = object()
@@ -0,0 +1,95 @@
+"""Tests for versioned model artifacts in models/artifact_store.py (run with ``python -m pytest``)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from models.artifact_store import ArtifactStore
+from train import train_models
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def trained():
+    return train_models(days=14, seed=1, workers=1)
+
+
+def test_per_zone_estimators_are_stored_separately(tmp_path, trained):
+    models, metadata = trained
+    store = ArtifactStore(str(tmp_path))
+    manifest = store.manifest(store.save(models, metadata))
+
+    zone_files = manifest['zone_files']['forecaster']
+    estimator_files = manifest['zone_estimator_files']['forecaster']
+    assert set(estimator_files) == set(zone_files) == set(models['forecaster'].zones)
+
+    import joblib
+    version_dir = store.version_dir(manifest['version'])
+    record = joblib.load(os.path.join(version_dir, zone_files['Gym']))
+    assert set(record) == {'baselines', 'stats'}
+    assert set(joblib.load(os.path.join(version_dir, estimator_files['Gym']))) == {'model'}
+
+
+@pytest.mark.parametrize('lazy_zones', [False, True])
+def test_load_round_trips_forecasts(tmp_path, trained, lazy_zones):
+    models, metadata = trained
+    store = ArtifactStore(str(tmp_path))
+    store.save(models, metadata)
+
+    loaded, _ = store.load(lazy_zones=lazy_zones)
+    X = models['forecaster']._feature_matrix(np.arange(24), np.zeros(24, dtype=int))
+    np.testing.assert_array_equal(loaded['forecaster']._predict_zone('Gym', X),
+                                  models['forecaster']._predict_zone('Gym', X))
+
+
+def test_load_without_estimators_reads_no_estimator_files(tmp_path, trained):
+    models, metadata = trained
+    store = ArtifactStore(str(tmp_path))
+    manifest = store.manifest(store.save(models, metadata))
+    # Unreadable estimator files prove they are never opened
+    version_dir = store.version_dir(manifest['version'])
+    for path in manifest['zone_estimator_files']['forecaster'].values():
+        with open(os.path.join(version_dir, path), 'wb') as f:
+            f.write(b'not a pickle')
+
+    loaded, _ = store.load(estimators=False, lazy_zones=True)
+    forecaster = loaded['forecaster']
+    assert forecaster._models.get('Gym') is None
+    assert forecaster.zones == models['forecaster'].zones
+    assert forecaster.zone_registry.get('Gym')['baselines'] == models['forecaster']._baselines['Gym']
+
+
+def test_onnx_serving_never_imports_sklearn(tmp_path, trained):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('skl2onnx')
+    from convert_to_onnx import export_onnx
+
+    models, metadata = trained
+    ArtifactStore(str(tmp_path)).save(models, metadata, exporters=[export_onnx])
+
+    # A fresh interpreter: this one has already imported sklearn to train
+    script = """
+import json, sys
+import app as api
+api._limiter = api.create_limiter('memory', 10**9, 1)
+client = api.app.test_client()
+urls = ['/api/health', '/api/anomalies?hours=72', '/api/forecast?zone=campus', '/api/forecast?zone=Gym&hours=24',
+        '/api/patterns', '/api/recommendations', '/api/savings-potential']
+status = [client.get(url).status_code for url in urls]
+status.append(client.post('/api/anomalies/batch', json={'windows': [{'zone': 'Gym'}]}).status_code)
+print(json.dumps({'status': status, 'backend': api.ACTIVE_BACKEND,
+                  'sklearn': sorted(m for m in sys.modules if m == 'sklearn' or m.startswith('sklearn.'))}))
+"""
+    env = {**os.environ, 'MODEL_ARTIFACT_DIR': str(tmp_path), 'INFERENCE_BACKEND': 'onnx',
+           'SNAPSHOT_INTERVAL_SECONDS': '0', 'REQUIRE_ARTIFACTS': 'true', 'HISTORY_DIR': ''}
+    out = subprocess.run([sys.executable, '-c', script], cwd=HERE, env=env, capture_output=True, text=True,
+                         check=True, timeout=300)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result['backend'] == 'onnx'
+    assert set(result['status']) == {200}
+    assert result['sklearn'] == []
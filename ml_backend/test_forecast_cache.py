@@ -0,0 +1,84 @@
+"""Tests for the forecast LRU cache of models/forecast_cache.py (run with ``python -m pytest``)."""
+
+import calendar
+import time
+
+import pytest
+
+from models.forecast_cache import ForecastCache
+
+OFFSET = 19_800          # UTC+05:30
+LOCAL_HOUR = 1_760_000_400 - (1_760_000_400 + OFFSET) % 3600     # epoch seconds where a local hour starts
+
+
+def test_buckets_follow_local_hours():
+    cache = ForecastCache(utc_offset_s=OFFSET)
+    bucket = cache.hour_bucket(LOCAL_HOUR)
+    assert cache.hour_bucket(LOCAL_HOUR + 3599) == bucket
+    assert cache.hour_bucket(LOCAL_HOUR - 1) == bucket - 1
+    assert cache.hour_end(LOCAL_HOUR) == cache.hour_end(LOCAL_HOUR + 3599) == LOCAL_HOUR + 3600
+
+    utc = ForecastCache(utc_offset_s=0)
+    assert utc.hour_end(1_760_000_400) % 3600 == 0
+
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    """Switch this process's local time zone for one test."""
+    def use(name):
+        monkeypatch.setenv('TZ', name)
+        time.tzset()
+    yield use
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _utc(*fields) -> int:
+    return calendar.timegm((*fields, 0, 0, 0))
+
+
+def test_buckets_follow_dst_changes(local_zone):
+    local_zone('America/New_York')
+    cache = ForecastCache()
+    # 2026-03-08: clocks go from 02:00 EST to 03:00 EDT at 07:00 UTC
+    before, after = _utc(2026, 3, 8, 6, 30, 0), _utc(2026, 3, 8, 7, 30, 0)
+    assert cache.hour_bucket(before) % 24 == 1 and cache.hour_bucket(after) % 24 == 3
+    assert cache.hour_end(before) == _utc(2026, 3, 8, 7, 0, 0)
+
+    # Lord Howe Island shifts by 30 minutes (+10:30 → +11:00 at 15:30 UTC on 2026-10-03),
+    # which moves every local hour boundary from :30 to :00 UTC
+    local_zone('Australia/Lord_Howe')
+    cache = ForecastCache()
+    assert cache.hour_end(_utc(2026, 10, 3, 15, 0, 0)) == _utc(2026, 10, 3, 15, 30, 0)
+    assert cache.hour_end(_utc(2026, 10, 3, 15, 45, 0)) == _utc(2026, 10, 3, 16, 0, 0)
+
+
+def test_entries_expire_at_the_end_of_the_local_hour():
+    cache = ForecastCache(utc_offset_s=OFFSET)
+    cache.put('k', 'v', expires_at=cache.hour_end(LOCAL_HOUR + 10))
+    assert cache.get('k', now=LOCAL_HOUR + 3599) == 'v'
+    assert cache.get('k', now=LOCAL_HOUR + 3600) is None
+    assert cache.expirations == 1
+    assert 'k' not in cache._entries
+
+
+def test_lru_eviction_and_stats():
+    cache = ForecastCache(max_size=2)
+    cache.put('a', 1, expires_at=float('inf'))
+    cache.put('b', 2, expires_at=float('inf'))
+    assert cache.get('a') == 1                 # 'b' is now least recently used
+    cache.put('c', 3, expires_at=float('inf'))
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    stats = cache.stats()
+    assert stats['size'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_clear_invalidates_everything():
+    cache = ForecastCache()
+    cache.put('a', 1, expires_at=float('inf'))
+    cache.clear()
+    assert cache.get('a') is None
+    assert cache.stats()['invalidations'] == 1
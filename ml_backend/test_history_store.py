@@ -0,0 +1,142 @@
+"""Tests for the on-disk columnar history store of history_store.py (run with ``python -m pytest``)."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import generate_historical_data
+from history_store import HistoryStore
+
+END = datetime(2026, 3, 10)
+
+
+@pytest.fixture
+def history():
+    return generate_historical_data(days=45, zones=['Gym', 'Library'], rng=np.random.default_rng(3), end=END)
+
+
+def test_append_partitions_by_zone_and_month(tmp_path, history):
+    store = HistoryStore(str(tmp_path))
+    store.append(history)
+
+    assert sorted(store.zones) == ['Gym', 'Library']
+    assert store.partitions('Gym') == ['2026-01', '2026-02', '2026-03']
+    assert len(store) == len(history)
+
+
+def test_zone_columns_round_trip(tmp_path, history):
+    store = HistoryStore(str(tmp_path))
+    store.append(history)
+
+    gym = history[(history['zone'] == 'Gym').to_numpy()]
+    columns = store.zone_columns('Gym')
+    np.testing.assert_array_equal(columns['timestamp'], gym['timestamp'].to_numpy())
+    np.testing.assert_array_equal(columns['energy_kwh'], gym['energy_kwh'].to_numpy())
+    np.testing.assert_array_equal(columns['hour'], gym['hour'].to_numpy())
+
+
+def test_range_reads(tmp_path, history):
+    store = HistoryStore(str(tmp_path))
+    store.append(history)
+
+    start, end = pd.Timestamp('2026-02-10'), pd.Timestamp('2026-02-12')
+    columns = store.zone_columns('Gym', start, end)
+    ts = columns['timestamp']
+    assert len(ts) == 48
+    assert ts[0] == start.value // 10**9 and ts[-1] < end.value // 10**9
+    assert isinstance(ts.base, np.memmap) or isinstance(ts, np.memmap)   # one month: zero-copy slice
+
+    across = store.zone_columns('Gym', pd.Timestamp('2026-01-31'), pd.Timestamp('2026-02-02'))
+    assert len(across['timestamp']) == 48
+    assert len(store.window(start, end)) == 96
+
+
+def test_appends_extend_partitions_and_reopen(tmp_path, history):
+    first, second = history.iloc[:1000], history.iloc[1000:]
+    store = HistoryStore(str(tmp_path))
+    store.append(first)
+    store.append(second)
+
+    reopened = HistoryStore(str(tmp_path))
+    assert sorted(reopened.zones) == ['Gym', 'Library']
+    assert len(reopened) == len(history)
+    frame = reopened.to_frame('Library')
+    assert frame['zone'].unique().tolist() == ['Library']
+    assert len(frame) == (history['zone'] == 'Library').sum()
+
+
+def test_unknown_zone_is_empty(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    assert store.partitions('Nowhere') == []
+    assert len(store.zone_columns('Nowhere')['timestamp']) == 0
+
+
+def test_zones_that_slug_alike_keep_separate_histories(tmp_path, history):
+    frame = history[(history['zone'] == 'Gym').to_numpy()].iloc[:24]
+    a = frame.assign(zone=pd.Categorical(['Lab - Electronics'] * len(frame)))
+    b = frame.assign(zone=pd.Categorical(['Lab Electronics'] * len(frame)), energy_kwh=frame['energy_kwh'] + 1)
+
+    store = HistoryStore(str(tmp_path))
+    store.append(a)
+    store.append(b)
+    assert store._zones['Lab - Electronics'] != store._zones['Lab Electronics']
+    assert len(store.zone_columns('Lab - Electronics')['timestamp']) == 24
+    np.testing.assert_array_equal(store.zone_columns('Lab Electronics')['energy_kwh'], b['energy_kwh'].to_numpy())
+
+
+def test_directory_collision_is_an_error(tmp_path, history, monkeypatch):
+    import history_store
+    store = HistoryStore(str(tmp_path))
+    store.append(history.iloc[:10])
+    monkeypatch.setattr(history_store, '_zone_dir', lambda zone: store._zones['Gym'])
+    other = history.iloc[:10].assign(zone=pd.Categorical(['Pool'] * 10))
+    with pytest.raises(ValueError, match='already used'):
+        store.append(other)
+
+
+def test_interrupted_append_is_invisible_and_truncated(tmp_path, history):
+    import os
+    store = HistoryStore(str(tmp_path))
+    store.append(history.iloc[:100])
+    partition = os.path.join(str(tmp_path), store._zones['Gym'], store.partitions('Gym')[0])
+    committed = len(store.zone_columns('Gym')['timestamp'])
+
+    # A crash after some columns were written: only timestamp.bin grew
+    with open(os.path.join(partition, 'timestamp.bin'), 'ab') as f:
+        f.write(np.arange(7, dtype='<i8').tobytes())
+    columns = store.zone_columns('Gym')
+    assert {len(c) for c in columns.values()} == {committed}
+
+    store.append(history.iloc[100:200])
+    gym = history.iloc[:200]
+    gym = gym[(gym['zone'] == 'Gym').to_numpy()]
+    np.testing.assert_array_equal(store.zone_columns('Gym')['timestamp'], gym['timestamp'].to_numpy())
+
+
+def test_out_of_order_appends_are_rejected(tmp_path, history):
+    store = HistoryStore(str(tmp_path))
+    store.append(history.iloc[100:200])
+    before = len(store)
+
+    # A backfill into a partition that already holds later hours, and a batch that is itself unsorted
+    with pytest.raises(ValueError, match='append-only'):
+        store.append(history.iloc[:300])
+    with pytest.raises(ValueError, match='timestamp order'):
+        store.append(history.iloc[200:300].iloc[::-1])
+    assert len(store) == before
+
+    # Rows at or after the last stored hour are accepted
+    store.append(history.iloc[200:300])
+    ts = store.zone_columns('Gym')['timestamp']
+    assert np.all(np.diff(ts) > 0)
+
+
+def test_partition_without_row_count_is_empty(tmp_path, history):
+    import os
+    store = HistoryStore(str(tmp_path))
+    store.append(history.iloc[:100])
+    partition = os.path.join(str(tmp_path), store._zones['Gym'], store.partitions('Gym')[0])
+    os.remove(os.path.join(partition, 'rows.json'))
+    assert len(store.zone_columns('Gym')['timestamp']) == 0
@@ -0,0 +1,77 @@
+"""Tests for streaming anomaly scoring in models/online_detector.py (run with ``python -m pytest``)."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from data_generator import generate_historical_data, generate_realtime_stream
+from history_store import HistoryStore
+from models.anomaly_detector import AnomalyDetector
+from models.online_detector import OnlineAnomalyDetector
+
+ZONES = ['Gym', 'Library']
+END = datetime(2026, 3, 10)
+
+
+@pytest.fixture(scope='module')
+def detector():
+    detector = AnomalyDetector()
+    detector.fit(generate_historical_data(days=14, zones=ZONES, rng=np.random.default_rng(1), end=END))
+    return detector
+
+
+@pytest.fixture
+def hour():
+    """One closed hour of aggregates for both zones, with a large spike in the Gym."""
+    frame = generate_realtime_stream(hours=1, zones=ZONES, rng=np.random.default_rng(2), end=END)
+    energy = frame['energy_kwh'].to_numpy().copy()
+    energy[(frame['zone'] == 'Gym').to_numpy()] *= 20
+    return frame.assign(energy_kwh=energy.astype(np.float32))
+
+
+def test_closed_hours_update_running_statistics(detector):
+    online = OnlineAnomalyDetector(detector, ZONES)
+    stream = generate_realtime_stream(hours=48, zones=ZONES, rng=np.random.default_rng(3), end=END)
+    for _, frame in stream.groupby('timestamp', sort=True):
+        online.observe(frame)
+
+    gym = stream[(stream['zone'] == 'Gym').to_numpy()]
+    values = gym[gym['hour'] == 9]['energy_kwh'].to_numpy(dtype=np.float64)
+    stats = online.zone_stats('Gym')[9]
+    assert stats['count'] == len(values) == 2
+    assert stats['mean'] == pytest.approx(values.mean())
+    assert stats['std'] == pytest.approx(values.std(ddof=1))
+    assert online.stats()['observations'] == len(stream)
+
+
+def test_in_progress_hour_is_flagged_once_and_projected(detector, hour):
+    online = OnlineAnomalyDetector(detector, ZONES)
+    half = hour.assign(energy_kwh=hour['energy_kwh'] / 2)
+
+    assert online.observe_partial(half, fraction=0.01) == []          # too early in the hour
+    emitted = online.observe_partial(half, fraction=0.5)
+    gym = [e for e in emitted if e['zone'] == 'Gym']
+    assert len(gym) == 1 and gym[0]['provisional']
+    expected_actual = float(hour[(hour['zone'] == 'Gym').to_numpy()]['energy_kwh'].iloc[0])
+    assert gym[0]['actual'] == pytest.approx(expected_actual, abs=0.01)
+
+    # Later batches of the same hour do not repeat the event, and statistics are untouched
+    assert [e for e in online.observe_partial(half, fraction=0.6) if e['zone'] == 'Gym'] == []
+    assert online.stats()['observations'] == 0
+
+    # The closed hour is still scored (and confirmed) on its own
+    closed = [e for e in online.observe(hour) if e['zone'] == 'Gym']
+    assert len(closed) == 1 and not closed[0]['provisional']
+
+
+def test_seed_from_history_store(tmp_path, detector):
+    history = generate_historical_data(days=7, zones=ZONES, rng=np.random.default_rng(4), end=END)
+    store = HistoryStore(str(tmp_path))
+    store.append(history)
+
+    online = OnlineAnomalyDetector(detector, ZONES)
+    online.seed(store.window())
+    assert online.seeded == len(history)
+    assert online.zone_stats('Library')[0]['count'] == 7
+    assert online.stats()['observations'] == 0       # seeding scores nothing
@@ -7,7 +7,7 @@ def run_test():
     model_dir = "onnx_models"
     models = {
         "anomaly_detector.onnx": 4,
-        "forecaster_main_building.onnx": 5,
+        "forecaster_00005.onnx": 5,    # Main Building
         "pattern_classifier.onnx": 8
     }
     
@@ -0,0 +1,67 @@
+"""Tests for the token-bucket limiters of ratelimit.py (run with ``python -m pytest``)."""
+
+import pytest
+
+from ratelimit import MemoryLimiter, SQLiteLimiter, create_limiter
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_limiter(request, tmp_path):
+    def make(limit, window, max_keys=100_000):
+        if request.param == 'sqlite':
+            return SQLiteLimiter(str(tmp_path / 'limits.sqlite3'), limit, window, max_keys=max_keys)
+        return MemoryLimiter(limit, window, max_keys=max_keys)
+    return make
+
+
+def test_bucket_allows_limit_then_rejects(make_limiter):
+    limiter = make_limiter(3, 60)
+    assert [limiter.allow('10.0.0.1')[0] for _ in range(4)] == [True, True, True, False]
+
+    allowed, retry_after = limiter.allow('10.0.0.1')
+    assert not allowed
+    assert 0 < retry_after <= 20          # one token refills every 60 / 3 seconds
+
+
+def test_keys_have_separate_buckets(make_limiter):
+    limiter = make_limiter(1, 60)
+    assert limiter.allow('a')[0]
+    assert not limiter.allow('a')[0]
+    assert limiter.allow('b')[0]
+
+
+def test_tokens_refill_over_time(make_limiter, monkeypatch):
+    import ratelimit
+    clock = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: clock[0])
+
+    limiter = make_limiter(2, 10)          # one token every 5 s
+    assert limiter.allow('k')[0] and limiter.allow('k')[0]
+    assert not limiter.allow('k')[0]
+    clock[0] += 5.0
+    assert limiter.allow('k')[0]
+    assert not limiter.allow('k')[0]
+    clock[0] += 100.0                      # refills to capacity, not beyond
+    assert [limiter.allow('k')[0] for _ in range(3)] == [True, True, False]
+
+
+def test_memory_limiter_evicts_least_recently_seen():
+    limiter = MemoryLimiter(1, 60, max_keys=2)
+    limiter.allow('a')
+    limiter.allow('b')
+    limiter.allow('c')
+    assert len(limiter) == 2
+    assert limiter.allow('a')[0]           # evicted, so a fresh bucket
+
+
+def test_sqlite_limiter_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'shared.sqlite3')
+    first, second = SQLiteLimiter(path, 2, 60), SQLiteLimiter(path, 2, 60)
+    assert first.allow('k')[0] and second.allow('k')[0]
+    assert not first.allow('k')[0]
+
+
+def test_create_limiter_backends(tmp_path):
+    assert isinstance(create_limiter('memory', 1, 1), MemoryLimiter)
+    assert isinstance(create_limiter('sqlite', 1, 1, path=str(tmp_path / 'l.sqlite3')), SQLiteLimiter)
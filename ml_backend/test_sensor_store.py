@@ -0,0 +1,142 @@
+"""Tests for the hourly ring buffers of sensor_store.py (run with ``python -m pytest``)."""
+
+import time
+
+import numpy as np
+import pytest
+
+from sensor_store import READING_DTYPE, SensorStore, decode_binary_frame, decode_ndjson, encode_binary_frame
+
+ZONES = ['Gym', 'Library']
+OFFSET = 19_800          # UTC+05:30: local hours are not hour-aligned in UTC
+
+
+def _hour_start(store: SensorStore) -> int:
+    """Epoch seconds at which the current local hour began."""
+    return store._local_hour(time.time()) * 3600 - store.utc_offset_s
+
+
+def _ingest(store: SensorStore, ts, zone=0, power=3600.0, now=None) -> int:
+    ts = np.atleast_1d(np.asarray(ts, dtype=np.int64))
+    n = len(ts)
+    return store.ingest(np.full(n, zone), ts, np.full(n, 230.0), np.full(n, 1.0), np.full(n, power), now=now)
+
+
+@pytest.fixture
+def store():
+    return SensorStore(ZONES, capacity_hours=24, utc_offset_s=OFFSET)
+
+
+def test_readings_fold_into_local_hours(store):
+    start = _hour_start(store) - 3600
+    # One reading at the start and one at the end of the previous local hour, one in the current hour
+    assert _ingest(store, [start, start + 3599, start + 3600]) == 3
+
+    window = store.window(hours=2)
+    assert len(window) == 1
+    assert window['timestamp'].iloc[0] == start + OFFSET            # local wall-clock epoch
+    assert window['readings'].iloc[0] == 2
+    assert window['energy_kwh'].iloc[0] == pytest.approx(2 * 3600 / 3600 / 1000)
+
+    current = store.window(hours=1, include_current=True)
+    assert current['readings'].tolist() == [1]
+
+
+def test_ring_wraps_and_recycles_slots(store):
+    now = _hour_start(store) + 60
+    old = now - 20 * 3600
+    assert _ingest(store, old, now=now) == 1
+
+    # 24 hours later the same slot holds the new hour; the old aggregate is gone
+    later = now + 24 * 3600
+    assert _ingest(store, old + 24 * 3600, power=7200.0, now=later) == 1
+    slot = store._local_hour(old) % store.capacity
+    assert store._bucket[0, slot] == store._local_hour(old) + 24
+    assert store._count[0, slot] == 1
+    assert store._energy_wh[0, slot] == pytest.approx(2.0)
+
+
+def test_late_reading_for_a_recycled_slot_is_rejected(store):
+    now = _hour_start(store) + 60
+    newer = now - 3600
+    assert _ingest(store, newer, now=now) == 1
+    # Same slot, one lap of the ring earlier: it fell off the ring
+    assert _ingest(store, newer - 24 * 3600, now=now) == 0
+    assert store.readings_rejected == 1
+    assert store.window(hours=2, now=now)['readings'].tolist() == [1]
+
+
+def test_future_readings_do_not_recycle_live_hours(store):
+    now = _hour_start(store) + 60
+    assert _ingest(store, now, now=now) == 1
+
+    # A device with a wrong clock: one lap ahead, and the largest uint32 timestamp
+    assert _ingest(store, [now + 24 * 3600, 2**32 - 1], now=now) == 0
+    assert store.readings_rejected == 2
+
+    # The live hour is intact and later readings for it are still accepted
+    assert _ingest(store, now + 1, now=now) == 1
+    assert store.window(hours=1, now=now, include_current=True)['readings'].tolist() == [2]
+
+
+def test_small_clock_skew_is_accepted(store):
+    now = _hour_start(store) + 60
+    assert _ingest(store, now + store.max_clock_skew_s, now=now) == 1
+    assert _ingest(store, now + store.max_clock_skew_s + 1, now=now) == 0
+
+
+def test_invalid_readings_are_rejected(store):
+    now = _hour_start(store) + 60
+    n = 4
+    accepted = store.ingest(np.array([0, 5, 1, 1]), np.full(n, now), np.full(n, 230.0), np.full(n, 1.0),
+                            np.array([100.0, 100.0, np.nan, -1.0]), now=now)
+    assert accepted == 1
+    assert store.readings_rejected == 3
+
+
+def test_closed_hours_are_published_once(store):
+    closed = []
+    store.subscribe(closed.append)
+    now = _hour_start(store) + 60
+    _ingest(store, now, now=now)
+    assert closed == []
+
+    next_hour = now + 3600
+    _ingest(store, next_hour, now=next_hour)
+    _ingest(store, next_hour + 1, now=next_hour + 1)
+    assert len(closed) == 1
+    assert closed[0]['readings'].tolist() == [1]
+
+
+def test_binary_frame_and_ndjson_round_trip(store):
+    records = np.zeros(2, dtype=READING_DTYPE)
+    records['zone'] = [0, 1]
+    records['ts'] = [1_760_000_000, 1_760_000_001]
+    records['power'] = [276.4, 100.0]
+    zone, ts, vrms, irms, power = decode_binary_frame(encode_binary_frame(records))
+    assert zone.tolist() == [0, 1] and ts.tolist() == [1_760_000_000, 1_760_000_001]
+    np.testing.assert_allclose(power, [276.4, 100.0], rtol=1e-6)
+
+    body = b'{"zone": "Library", "ts": 1760000000, "vrms": 229.8, "irms": 1.21, "power": 276.4}\n'
+    zone, ts, *_ = decode_ndjson(body, store)
+    assert zone.tolist() == [1] and ts.tolist() == [1_760_000_000]
+
+    with pytest.raises(ValueError):
+        decode_binary_frame(b'EWB1' + b'\xff' * 4)
+
+
+@pytest.mark.parametrize('line', [
+    b'{"zone": "Gym", "ts": 1e23, "power": 1}',
+    b'{"zone": "Gym", "ts": 100000000000000000000000, "power": 1}',
+    b'{"zone": "Gym", "ts": -5, "power": 1}',
+    b'{"zone": "Gym", "ts": Infinity, "power": 1}',
+])
+def test_ndjson_rejects_out_of_range_timestamps(store, line):
+    with pytest.raises(ValueError):
+        decode_ndjson(line, store)
+
+
+def test_boolean_zones_are_unknown(store):
+    assert store.zone_code(True) == -1 and store.zone_code(False) == -1
+    zone, *_ = decode_ndjson(b'{"zone": true, "ts": 1760000000, "power": 1}', store)
+    assert zone.tolist() == [-1]
@@ -0,0 +1,56 @@
+"""Tests for incremental training of models/forecaster.py (run with ``python -m pytest``)."""
+
+import numpy as np
+import pytest
+
+from data_generator import generate_historical_data
+from models.forecaster import ConsumptionForecaster
+
+
+@pytest.fixture(scope='module')
+def split():
+    """(a ∪ b, a, b): history of three zones split by day; 'Pool' only has readings in b."""
+    df = generate_historical_data(days=30, zones=['Gym', 'Library', 'Pool'], rng=np.random.default_rng(5))
+    day = (df['timestamp'] // 86400).to_numpy()
+    first = day < np.unique(day)[20]
+    pool = (df['zone'] == 'Pool').to_numpy()
+    return df[~(first & pool)], df[first & ~pool], df[~first]
+
+
+def _coefficients(pipeline) -> np.ndarray:
+    """Ridge coefficients and intercept in the unscaled polynomial-feature space."""
+    scaler, ridge = pipeline.named_steps['scaler'], pipeline.named_steps['ridge']
+    coef = ridge.coef_ / scaler.scale_
+    return np.append(coef, ridge.intercept_ - coef @ scaler.mean_)
+
+
+def test_partial_fit_matches_full_refit(split):
+    full_df, a, b = split
+    full = ConsumptionForecaster()
+    full.fit(full_df, workers=1)
+
+    incremental = ConsumptionForecaster()
+    incremental.fit(a, workers=1)
+    assert 'Pool' not in incremental.zones
+    incremental.partial_fit(b)
+
+    assert sorted(incremental.zones) == sorted(full.zones) == ['Gym', 'Library', 'Pool']
+    for zone in full.zones:
+        np.testing.assert_allclose(_coefficients(incremental._models[zone]), _coefficients(full._models[zone]),
+                                   rtol=1e-6, atol=1e-8)
+        assert incremental._baselines[zone].keys() == full._baselines[zone].keys()
+        np.testing.assert_allclose(list(incremental._baselines[zone].values()),
+                                   list(full._baselines[zone].values()), rtol=1e-9)
+
+
+def test_restored_forecaster_without_statistics_fails_loudly(split):
+    _, a, _ = split
+    forecaster = ConsumptionForecaster()
+    forecaster.fit(a, workers=1)
+    state = forecaster.__getstate__()
+    del state['_stats']
+
+    restored = ConsumptionForecaster.__new__(ConsumptionForecaster)
+    restored.__setstate__(state)
+    with pytest.raises(AttributeError):
+        restored.partial_fit(a)
@@ -0,0 +1,28 @@
+"""Tests for per-zone access to training data in models/zone_data.py (run with ``python -m pytest``)."""
+
+import numpy as np
+import pytest
+
+from data_generator import generate_historical_data
+from models.pattern_classifier import PatternClassifier
+from models.zone_data import iter_zones
+
+
+@pytest.mark.parametrize('categorical', [True, False])
+def test_rows_without_a_zone_are_skipped(categorical):
+    df = generate_historical_data(days=3, zones=['Gym', 'Library'], rng=np.random.default_rng(1))
+    zone = df['zone'].copy()
+    zone.iloc[::5] = np.nan
+    df = df.assign(zone=zone if categorical else zone.astype(object))
+    named = df['zone'].notna().to_numpy()
+
+    partitions = dict(iter_zones(df))
+    assert sorted(partitions) == ['Gym', 'Library']
+    for name, columns in partitions.items():
+        rows = named & (df['zone'] == name).to_numpy()
+        np.testing.assert_array_equal(columns['energy_kwh'], df['energy_kwh'].to_numpy()[rows])
+
+    zones, features = PatternClassifier.zone_features(df)
+    expected_zones, expected = PatternClassifier.zone_features(df[named])
+    assert zones == expected_zones
+    np.testing.assert_allclose(features, expected)
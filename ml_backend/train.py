@@ -0,0 +1,90 @@
+"""
+Offline training command.
+Fits all models on historical data and saves them as a new artifact version,
+which the API loads on startup.
+
+Usage:
+    python train.py [--days 90] [--seed 42] [--artifact-dir artifacts] [--onnx] [--workers 8]
+    python train.py --history history --days 365   # train from a HistoryStore
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_generator import generate_historical_data
+from history_store import HistoryStore
+from models.anomaly_detector import AnomalyDetector
+from models.artifact_store import ArtifactStore
+from models.forecaster import ConsumptionForecaster
+from models.pattern_classifier import PatternClassifier
+
+
+def train_models(days: int = 90, seed: int | None = None, history: str | None = None,
+                 workers: int | None = None) -> tuple[dict, dict]:
+    """
+    Fit every model on the last ``days`` of history; returns (models, metadata).
+    History comes from a HistoryStore directory if given, else it is generated.
+    Per-zone forecasters are fitted on ``workers`` processes (default $TRAIN_WORKERS).
+    """
+    if history:
+        historical = HistoryStore(history).window(start=pd.Timestamp.now().floor('h') - pd.Timedelta(days=days))
+        zones = [zone for zone in historical.zones if len(historical.zone_columns(zone)['timestamp'])]
+    else:
+        historical = generate_historical_data(days=days, rng=np.random.default_rng(seed))
+        zones = historical['zone'].unique().tolist()
+
+    anomaly_detector = AnomalyDetector()
+    forecaster = ConsumptionForecaster()
+    pattern_classifier = PatternClassifier()
+
+    seconds = {}
+    for name, fit in [
+        ('anomaly_detector', lambda: anomaly_detector.fit(historical)),
+        ('forecaster', lambda: forecaster.fit(historical, workers=workers)),
+        ('pattern_classifier', lambda: pattern_classifier.fit(historical)),
+    ]:
+        start = time.perf_counter()
+        fit()
+        seconds[name] = round(time.perf_counter() - start, 3)
+
+    models = {
+        'anomaly_detector': anomaly_detector,
+        'forecaster': forecaster,
+        'pattern_classifier': pattern_classifier,
+    }
+    metadata = {
+        'training': {'days': days, 'seed': seed, 'rows': len(historical), 'history': history, 'seconds': seconds},
+        'zones': sorted(zones),
+    }
+    return models, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train EcoWatch models and save an artifact version.')
+    parser.add_argument('--days', type=int, default=90, help='days of history to train on')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for the data generator')
+    parser.add_argument('--history', default=None, help='train from this HistoryStore directory instead of generated data')
+    parser.add_argument('--artifact-dir', default=None, help='artifact store root (default: $MODEL_ARTIFACT_DIR)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes for per-zone fitting (default: $TRAIN_WORKERS, else 1)')
+    parser.add_argument('--onnx', action='store_true', help='also export parity-checked ONNX models for INFERENCE_BACKEND=onnx')
+    args = parser.parse_args()
+
+    print(f"Training models on {args.days} days of historical data...")
+    models, metadata = train_models(days=args.days, seed=args.seed, history=args.history, workers=args.workers)
+
+    exporters = []
+    if args.onnx:
+        from convert_to_onnx import export_onnx
+        exporters.append(export_onnx)
+
+    store = ArtifactStore(args.artifact_dir)
+    version = store.save(models, metadata, exporters=exporters)
+    print(f"\n🚀 Saved artifact version {version} to {store.root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Raw-waveform processing for EnergyMonitor sample blocks.
+
+Instead of reducing each ~5 kHz burst to one Vrms / current / power line on
+the ESP32, a device can send the raw ADC samples of both channels and let the
+backend do the analysis. Blocks from many devices are decoded zero-copy from
+one binary frame and analysed together in batched NumPy:
+
+* Vrms, Irms, real power (mean of v·i), apparent power (Vrms·Irms) and
+  power factor (real / apparent, including distortion), over the whole
+  mains cycles in the block
+* voltage and current harmonics up to ``HARMONICS`` × the mains frequency
+  (RMS per order), THD and the displacement power factor of the fundamental
+
+The per-block results are then folded into the sensor store's hourly
+aggregates like any other reading (see ``ingest_readings`` in app.py), so the
+online anomaly detector sees them as each hour closes.
+
+Frame layout (little-endian), accepted by ``/api/ingest`` as
+``application/octet-stream``::
+
+    b'EWW1' | uint32 block count | uint32 samples per block | float32 sample rate (Hz)
+    then per block:
+    uint16 zone | uint16 device | uint32 ts | float32 v_scale | float32 i_scale
+    | uint16 voltage[samples] | uint16 current[samples]
+
+Samples are raw ADC counts (12-bit on the ESP32, centred on mid-scale);
+``v_scale`` / ``i_scale`` convert counts to volts / amps and carry each
+device's calibration (e.g. ``3.3 / 4095 * 312`` for the ZMPT101B channel).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+WAVEFORM_MAGIC = b'EWW1'
+WAVEFORM_HEADER_SIZE = 16
+MAINS_HZ = 50
+HARMONICS = 15            # orders 1..15 (750 Hz at 50 Hz mains)
+CHUNK_BLOCKS = 4096       # blocks converted to float32 at a time (~16 MiB for 500-sample blocks)
+
+SCALAR_FIELDS = ('vrms', 'irms', 'real_power', 'apparent_power', 'power_factor',
+                 'displacement_pf', 'voltage_thd', 'current_thd')
+
+
+def block_dtype(samples: int) -> np.dtype:
+    """Record layout of one sample block with ``samples`` samples per channel."""
+    return np.dtype([
+        ('zone', '<u2'),      # index into SensorStore.zones
+        ('device', '<u2'),
+        ('ts', '<u4'),        # epoch seconds at the start of the burst
+        ('v_scale', '<f4'),   # volts per ADC count
+        ('i_scale', '<f4'),   # amps per ADC count
+        ('voltage', '<u2', (samples,)),
+        ('current', '<u2', (samples,)),
+    ])
+
+
+def decode_waveform_frame(body: bytes) -> tuple[np.ndarray, float]:
+    """Decode a waveform frame zero-copy into (blocks, sample rate)."""
+    if len(body) < WAVEFORM_HEADER_SIZE or body[:4] != WAVEFORM_MAGIC:
+        raise ValueError('Invalid waveform frame header')
+
+    count, samples = (int(x) for x in np.frombuffer(body, dtype='<u4', count=2, offset=4))
+    sample_rate = float(np.frombuffer(body, dtype='<f4', count=1, offset=12)[0])
+    if samples < 8 or not 0 < sample_rate < 1e6:
+        raise ValueError(f'Invalid block shape: {samples} samples at {sample_rate} Hz')
+
+    dtype = block_dtype(samples)
+    if len(body) != WAVEFORM_HEADER_SIZE + count * dtype.itemsize:
+        raise ValueError(f'Frame length does not match block count {count}')
+    return np.frombuffer(body, dtype=dtype, count=count, offset=WAVEFORM_HEADER_SIZE), sample_rate
+
+
+def encode_waveform_frame(blocks: np.ndarray, sample_rate: float) -> bytes:
+    """Pack sample blocks into a waveform frame (used by device gateways and the replay benchmark)."""
+    blocks = np.ascontiguousarray(blocks)
+    samples = blocks.dtype['voltage'].shape[0]
+    header = np.array([len(blocks), samples], dtype='<u4').tobytes() + np.float32(sample_rate).tobytes()
+    return WAVEFORM_MAGIC + header + blocks.astype(block_dtype(samples), copy=False).tobytes()
+
+
+def analyze(blocks: np.ndarray, sample_rate: float, mains_hz: float = MAINS_HZ,
+            harmonics: int = HARMONICS) -> dict[str, np.ndarray]:
+    """
+    Power and harmonic analysis of every block, as float32 columns.
+
+    Besides ``SCALAR_FIELDS`` the result holds ``voltage_harmonics`` and
+    ``current_harmonics`` (blocks × harmonics, RMS per order; NaN above
+    Nyquist). Ratios are NaN for blocks without signal (e.g. no load).
+    """
+    n_blocks = len(blocks)
+    samples = blocks.dtype['voltage'].shape[0]
+    basis, orders = _harmonic_basis(samples, float(sample_rate), float(mains_hz), harmonics)
+    if not orders:
+        raise ValueError(f'Sample rate {sample_rate} Hz is too low for {mains_hz} Hz mains')
+    # A partial cycle would bias RMS and mean power, so those use the whole cycles only
+    cycles = int(samples * mains_hz // sample_rate)
+    whole = round(cycles * sample_rate / mains_hz) if cycles else samples
+
+    out = {name: np.empty(n_blocks, dtype=np.float32) for name in SCALAR_FIELDS}
+    out['voltage_harmonics'] = np.full((n_blocks, harmonics), np.nan, dtype=np.float32)
+    out['current_harmonics'] = np.full((n_blocks, harmonics), np.nan, dtype=np.float32)
+
+    for start in range(0, n_blocks, CHUNK_BLOCKS):
+        part = blocks[start:start + CHUNK_BLOCKS]
+        rows = slice(start, start + len(part))
+        v = _centered(part['voltage'], part['v_scale'], whole)
+        i = _centered(part['current'], part['i_scale'], whole)
+
+        vw, iw = v[:, :whole], i[:, :whole]
+        vrms = np.sqrt(np.einsum('ij,ij->i', vw, vw) / whole)
+        irms = np.sqrt(np.einsum('ij,ij->i', iw, iw) / whole)
+        real = np.einsum('ij,ij->i', vw, iw) / whole
+        apparent = vrms * irms
+
+        # Only the harmonic bins are needed, so one windowed DFT matmul replaces a full FFT
+        v_spec = _complex(v @ basis, orders)
+        i_spec = _complex(i @ basis, orders)
+        v1, i1 = v_spec[:, 0], i_spec[:, 0]
+        fundamental = np.abs(v1) * np.abs(i1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['power_factor'][rows] = np.where(apparent > 0, real / apparent, np.nan)
+            out['displacement_pf'][rows] = np.where(fundamental > 0, (v1 * i1.conj()).real / fundamental, np.nan)
+            out['voltage_thd'][rows] = _thd(v_spec)
+            out['current_thd'][rows] = _thd(i_spec)
+        out['vrms'][rows] = vrms
+        out['irms'][rows] = irms
+        out['real_power'][rows] = real
+        out['apparent_power'][rows] = apparent
+        out['voltage_harmonics'][rows, :orders] = np.abs(v_spec)
+        out['current_harmonics'][rows, :orders] = np.abs(i_spec)
+
+    return out
+
+
+def _centered(counts: np.ndarray, scale: np.ndarray, whole: int) -> np.ndarray:
+    """ADC counts → calibrated float32 signal, minus the DC offset (mid-scale bias) over the first ``whole`` samples."""
+    x = counts.astype(np.float32)
+    x -= x[:, :whole].mean(axis=1, keepdims=True)
+    x *= scale.astype(np.float32)[:, None]
+    return x
+
+
+def _complex(spec: np.ndarray, orders: int) -> np.ndarray:
+    return spec[:, :orders] + 1j * spec[:, orders:]
+
+
+def _thd(spec: np.ndarray) -> np.ndarray:
+    """sqrt(sum of squared harmonic RMS, orders ≥ 2) / fundamental RMS."""
+    power = spec.real ** 2 + spec.imag ** 2
+    return np.sqrt(power[:, 1:].sum(axis=1) / power[:, 0])
+
+
+@lru_cache(maxsize=16)
+def _harmonic_basis(samples: int, sample_rate: float, mains_hz: float, harmonics: int) -> tuple[np.ndarray, int]:
+    """
+    (samples × 2·orders) float32 matrix whose product with a signal gives the
+    real and imaginary parts of each harmonic, scaled to RMS amplitude.
+
+    Harmonics are evaluated at their exact frequency under a Hann window, so a
+    burst that does not span a whole number of mains cycles (the sample rate
+    of an ESP32 burst is only approximately 5 kHz) still reads correctly.
+    """
+    orders = min(harmonics, int((sample_rate / 2) // mains_hz))
+    window = np.hanning(samples)
+    t = np.arange(samples) / sample_rate
+    phase = 2 * np.pi * np.outer(t, mains_hz * np.arange(1, orders + 1))
+    scale = np.sqrt(2) / window.sum()     # peak amplitude → RMS, corrected for the window's coherent gain
+    basis = np.concatenate([np.cos(phase), -np.sin(phase)], axis=1) * (window * scale)[:, None]
+    return basis.astype(np.float32), orders
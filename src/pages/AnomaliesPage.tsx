@@ -1,6 +1,7 @@
-import React, { useEffect, useState } from 'react';
+import React from 'react';
 import { ShieldAlert, AlertTriangle, Loader2, Zap, Clock } from 'lucide-react';
-import { getAnomalies, type AnomalyResponse, type AnomalyItem } from '../services/mlApi';
+import { type AnomalyItem } from '../services/mlApi';
+import { useAnomalies } from '../services/useMLData';
 import {
     BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip,
     ResponsiveContainer, Cell,
@@ -8,15 +9,7 @@ import {
 import StatNumber from '../components/ui/StatNumber';
 
 export default function AnomaliesPage() {
-    const [data, setData] = useState<AnomalyResponse | null>(null);
-    const [loading, setLoading] = useState(true);
-
-    useEffect(() => {
-        getAnomalies('all', 72).then((d) => {
-            setData(d);
-            setLoading(false);
-        });
-    }, []);
+    const { data, loading } = useAnomalies('all', 72);
 
     if (loading) {
         return (
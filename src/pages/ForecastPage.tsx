@@ -1,26 +1,18 @@
-import React, { useEffect, useState } from 'react';
+import React, { useState } from 'react';
 import {
     AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip,
     ResponsiveContainer, ReferenceLine,
 } from 'recharts';
 import { Brain, TrendingUp, TrendingDown, Minus, Loader2, Cpu } from 'lucide-react';
 import StatNumber from '../components/ui/StatNumber';
-import { getForecast, type ForecastResponse, type ForecastPoint } from '../services/mlApi';
+import { type ForecastPoint } from '../services/mlApi';
+import { useForecast } from '../services/useMLData';
 
 export default function ForecastPage() {
-    const [data, setData] = useState<ForecastResponse | null>(null);
-    const [loading, setLoading] = useState(true);
     const [zone, setZone] = useState('campus');
     const [hours, setHours] = useState(48);
     const [resource, setResource] = useState<'energy' | 'water'>('energy');
-
-    useEffect(() => {
-        setLoading(true);
-        getForecast(zone, hours, resource).then((d) => {
-            setData(d);
-            setLoading(false);
-        });
-    }, [zone, hours, resource]);
+    const { data, loading } = useForecast(zone, hours, resource);
 
     const trendIcon = data?.trend === 'increasing'
         ? <TrendingUp className="w-5 h-5 text-rag-red" />
@@ -1,23 +1,16 @@
-import React, { useEffect, useState } from 'react';
+import React, { useState } from 'react';
 import { Layers, Loader2 } from 'lucide-react';
-import { getPatterns, type PatternResponse, type PatternItem } from '../services/mlApi';
+import { type PatternItem } from '../services/mlApi';
+import { usePatterns } from '../services/useMLData';
 import {
     RadarChart, PolarGrid, PolarAngleAxis, PolarRadiusAxis,
     Radar, ResponsiveContainer, Tooltip,
 } from 'recharts';
 
 export default function PatternsPage() {
-    const [data, setData] = useState<PatternResponse | null>(null);
-    const [loading, setLoading] = useState(true);
+    const { data, loading } = usePatterns();
     const [selected, setSelected] = useState<PatternItem | null>(null);
 
-    useEffect(() => {
-        getPatterns().then((d) => {
-            setData(d);
-            setLoading(false);
-        });
-    }, []);
-
     if (loading) {
         return (
             <div className="flex flex-col items-center justify-center h-[60vh] gap-3">
@@ -102,6 +102,49 @@ export async function getSavingsPotential() {
     return fetchML<SavingsResponse>('/savings-potential');
 }
 
+export interface MLStreamHandlers {
+    onAnomalies?: (anomalies: AnomalyItem[]) => void;
+    onAnomalyReport?: (report: AnomalyResponse) => void;
+    onForecast?: (forecast: ForecastResponse) => void;
+    onPatterns?: (patterns: PatternResponse) => void;
+    /** Called with true when the stream opens and false when it drops or cannot connect */
+    onStatus?: (connected: boolean) => void;
+}
+
+/**
+ * Subscribe to server-pushed updates (backend served with `uvicorn asgi:application`).
+ * Returns an unsubscribe function. EventSource reconnects on its own; without
+ * an ASGI backend the stream simply never opens, and callers keep polling
+ * until onStatus reports it connected (see useMLData).
+ */
+export function subscribeMLStream(handlers: MLStreamHandlers): () => void {
+    if (typeof EventSource === 'undefined') return () => {};
+
+    const source = new EventSource(`${ML_API_BASE}/stream`);
+    source.onopen = () => handlers.onStatus?.(true);
+    source.onerror = () => handlers.onStatus?.(false);
+    const listen = <T>(event: string, handler?: (data: T) => void) => {
+        if (!handler) return;
+        source.addEventListener(event, (e) => {
+            const text = (e as MessageEvent<string>).data;
+            // Security: same size cap as fetchML responses
+            if (text.length > MAX_RESPONSE_SIZE) return;
+            try {
+                handler(JSON.parse(text) as T);
+            } catch {
+                console.warn(`ML stream: invalid ${event} event`);
+            }
+        });
+    };
+
+    listen<{ anomalies: AnomalyItem[] }>('anomalies', handlers.onAnomalies && ((d) => handlers.onAnomalies!(d.anomalies)));
+    listen<AnomalyResponse>('anomalyReport', handlers.onAnomalyReport);
+    listen<ForecastResponse>('forecast', handlers.onForecast);
+    listen<PatternResponse>('patterns', handlers.onPatterns);
+
+    return () => source.close();
+}
+
 // ─── Types ───
 
 export interface AnomalyItem {
@@ -0,0 +1,81 @@
+import { useEffect, useState } from 'react';
+import {
+    getAnomalies, getForecast, getPatterns, subscribeMLStream,
+    type AnomalyResponse, type ForecastResponse, type MLStreamHandlers, type PatternResponse,
+} from './mlApi';
+
+const POLL_INTERVAL = 60_000; // only while the /api/stream push is unavailable
+
+/**
+ * Load an ML view, then keep it current from /api/stream.
+ * `stream` maps a setter to the stream handlers that deliver this view;
+ * while the stream is not connected (or the view is not pushed at all)
+ * the view is refetched every POLL_INTERVAL instead.
+ */
+export function useMLData<T>(
+    fetcher: () => Promise<T>,
+    deps: unknown[],
+    stream?: (set: (data: T) => void) => MLStreamHandlers,
+): { data: T | null; loading: boolean } {
+    const [data, setData] = useState<T | null>(null);
+    const [loading, setLoading] = useState(true);
+
+    useEffect(() => {
+        let active = true;
+        const set = (d: T) => {
+            if (!active) return;
+            setData(d);
+            setLoading(false);
+        };
+        const load = () => { fetcher().then(set); };
+
+        let timer: ReturnType<typeof setInterval> | null = null;
+        const poll = (on: boolean) => {
+            if (on && !timer) {
+                timer = setInterval(load, POLL_INTERVAL);
+            } else if (!on && timer) {
+                clearInterval(timer);
+                timer = null;
+            }
+        };
+
+        setLoading(true);
+        load();
+        poll(true);
+        const unsubscribe = stream
+            ? subscribeMLStream({ ...stream(set), onStatus: (connected) => poll(!connected) })
+            : () => {};
+
+        return () => {
+            active = false;
+            poll(false);
+            unsubscribe();
+        };
+    }, deps);
+
+    return { data, loading };
+}
+
+export function useAnomalies(zone = 'all', hours = 72) {
+    // The stream pushes the default report (all zones, 72 hours)
+    const pushed = zone === 'all' && hours === 72;
+    return useMLData<AnomalyResponse>(
+        () => getAnomalies(zone, hours),
+        [zone, hours],
+        pushed ? (set) => ({ onAnomalyReport: set }) : undefined,
+    );
+}
+
+export function useForecast(zone = 'campus', hours = 48, type = 'energy') {
+    // The stream pushes the 48-hour campus energy forecast
+    const pushed = zone === 'campus' && hours === 48 && type === 'energy';
+    return useMLData<ForecastResponse>(
+        () => getForecast(zone, hours, type),
+        [zone, hours, type],
+        pushed ? (set) => ({ onForecast: set }) : undefined,
+    );
+}
+
+export function usePatterns() {
+    return useMLData<PatternResponse>(getPatterns, [], (set) => ({ onPatterns: set }));
+}